@@ -1,18 +1,20 @@
 """FastAPI server for Cofi Dashboard with SSE support."""
 import asyncio
+import hmac
 import json
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
 import structlog
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import HTMLResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
 from sse_starlette.sse import EventSourceResponse
 
 from .config import get_settings
-from .database import get_database, BatchStatusRepo, BatchExecutionLogRepo
+from .database import get_database, decode_events, BatchStatusRepo, BatchExecutionLogRepo
+from .event_hub import EventHub
 
 # Configure structured logging
 structlog.configure(
@@ -35,6 +37,15 @@ settings = get_settings()
 db = get_database()
 batch_repo = BatchStatusRepo(db)
 log_repo = BatchExecutionLogRepo(db)
+# One event channel per monitored batch, shared by all SSE clients
+event_hub = EventHub(
+    log_repo,
+    poll_interval=settings.sse_poll_interval,
+    queue_size=settings.sse_client_queue_size,
+    replay_size=settings.sse_replay_size,
+    push_enabled=settings.sse_push_enabled,
+    fallback_interval=settings.sse_push_fallback_interval
+)
 
 # Get static directory path
 STATIC_DIR = Path(__file__).parent / "static"
@@ -50,6 +61,7 @@ async def startup_event():
 async def shutdown_event():
     """Application shutdown event."""
     logger.info("dashboard_shutting_down")
+    await event_hub.close()
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -83,7 +95,7 @@ async def serve_js():
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "service": "cofi-dashboard"}
+    return {"status": "healthy", "service": "cofi-dashboard", "sse_channels": event_hub.stats()}
 
 
 @app.get("/api/current-batch")
@@ -237,6 +249,33 @@ async def get_batch_stats(batch_id: int):
         return {"error": str(e)}
 
 
+@app.post("/api/events/push")
+async def push_events(request: Request):
+    """
+    Receive events from cofi-service as it writes them (EVENT_PUSH_MODE=http).
+
+    Body: {"events": [batchExecutionLog rows], "gaps": [batch IDs]}, events
+    ordered by ID. The events go straight to the SSE clients of their
+    batch; MySQL remains the source for history and reconnects, and the
+    batches in "gaps" (pushes cofi-service dropped) are re-read from it.
+    Only accepted with SSE_PUSH_ENABLED and a matching EVENT_PUSH_TOKEN.
+
+    Returns:
+        Number of events received and delivered to a watched batch
+    """
+    if not settings.sse_push_enabled:
+        raise HTTPException(status_code=404, detail="Event push is disabled")
+    if not settings.event_push_token:
+        raise HTTPException(status_code=403, detail="Event push requires EVENT_PUSH_TOKEN")
+    token = request.headers.get("x-event-push-token", "")
+    if not hmac.compare_digest(token.encode(), settings.event_push_token.encode()):
+        raise HTTPException(status_code=401, detail="Invalid event push token")
+    body = await request.json()
+    events = decode_events(body.get("events", []))
+    delivered = event_hub.push(events, gaps=body.get("gaps"))
+    return {"received": len(events), "delivered": delivered}
+
+
 @app.get("/api/stream")
 async def event_stream(request: Request, batch_id: Optional[int] = None):
     """
@@ -246,7 +285,10 @@ async def event_stream(request: Request, batch_id: Optional[int] = None):
         batch_id: Optional specific batch ID to stream. If not provided,
                   streams events for the currently processing batch.
 
-    Streams new batch execution events as they occur.
+    Streams new batch execution events as they occur. All clients of a
+    batch share one channel, fed by a database poller or by pushes from
+    cofi-service (see EventHub); a reconnecting client resumes after its
+    Last-Event-ID.
     """
     async def event_generator():
         # Get batch to monitor
@@ -263,55 +305,37 @@ async def event_stream(request: Request, batch_id: Optional[int] = None):
             return
 
         monitoring_batch_id = current_batch['id']
-        last_event_id = 0
+        last_event_id = request.headers.get("last-event-id")
+        last_event_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
 
-        logger.info("sse_stream_started", batch_id=monitoring_batch_id)
+        subscription, backlog = await event_hub.subscribe(monitoring_batch_id, last_event_id)
+        logger.info("sse_stream_started", batch_id=monitoring_batch_id, last_event_id=last_event_id)
 
         try:
+            for message in backlog:
+                if subscription.mark_sent(message):
+                    yield message
+
             while True:
                 # Check if client disconnected
                 if await request.is_disconnected():
                     logger.info("sse_client_disconnected", batch_id=monitoring_batch_id)
                     break
 
-                # Query new events since last_event_id
-                events = log_repo.get_latest_events(
-                    monitoring_batch_id,
-                    since_id=last_event_id,
-                    limit=50
-                )
-
-                for event in events:
-                    # Convert datetime to ISO string
-                    if 'timestamp' in event and event['timestamp']:
-                        event['timestamp'] = event['timestamp'].isoformat()
-
-                    event_data = {
-                        "id": event['id'],
-                        "stage": event['stage'],
-                        "eventType": event['eventType'],
-                        "fileName": event.get('fileName'),
-                        "gpuIp": event.get('gpuIp'),
-                        "status": event['status'],
-                        "payload": event.get('payload'),
-                        "response": event.get('response'),
-                        "errorMessage": event.get('errorMessage'),
-                        "totalFiles": event.get('totalFiles'),
-                        "processedFiles": event.get('processedFiles'),
-                        "timestamp": event['timestamp']
-                    }
-
-                    yield {
-                        "event": event['eventType'],
-                        "id": str(event['id']),
-                        "data": json.dumps(event_data)
-                    }
-
-                    last_event_id = event['id']
-
-                # Wait before polling again (configurable via SSE_POLL_INTERVAL env var)
-                # Options: 1s (real-time), 2s (balanced), 5s (less frequent), 10s (minimal)
-                await asyncio.sleep(settings.sse_poll_interval)
+                try:
+                    message = await asyncio.wait_for(subscription.get(), timeout=settings.sse_poll_interval)
+                except asyncio.TimeoutError:
+                    continue
+
+                if message is None:
+                    # Evicted for falling behind: end the stream so the
+                    # browser reconnects and resumes from its Last-Event-ID
+                    logger.info("sse_client_evicted", batch_id=monitoring_batch_id)
+                    break
+                # Skip events already sent from the backlog (IDs may arrive
+                # out of order after a resync, so no high-water mark)
+                if subscription.mark_sent(message):
+                    yield message
 
         except asyncio.CancelledError:
             logger.info("sse_stream_cancelled", batch_id=monitoring_batch_id)
@@ -321,6 +345,8 @@ async def event_stream(request: Request, batch_id: Optional[int] = None):
                 "event": "error",
                 "data": json.dumps({"message": str(e)})
             }
+        finally:
+            await event_hub.unsubscribe(subscription)
 
     return EventSourceResponse(event_generator())
 
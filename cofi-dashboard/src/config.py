@@ -16,6 +16,11 @@ class Settings(BaseSettings):
 
     # SSE Configuration
     sse_poll_interval: int = 2  # Seconds between database polls (1-10)
+    sse_client_queue_size: int = 1000  # Events a client may fall behind before it is evicted
+    sse_replay_size: int = 500  # Recent events sent to a newly connected client
+    sse_push_enabled: bool = False  # Events are pushed by cofi-service (EVENT_PUSH_MODE=http)
+    sse_push_fallback_interval: int = 30  # Confirm pushed events against the database every N seconds (0 = only on gaps)
+    event_push_token: str = ""  # Shared secret required in X-Event-Push-Token (pushes are rejected while empty)
 
     class Config:
         env_file = ".env"
@@ -1,4 +1,6 @@
 """Database operations for cofi-dashboard (read-only)."""
+import base64
+import zlib
 import mysql.connector
 from mysql.connector import pooling
 from typing import Optional, List, Dict, Any
@@ -8,6 +10,29 @@ from .config import get_settings
 
 logger = structlog.get_logger()
 
+# cofi-service stores large payload/response values as "zlib:<base64>"
+COMPRESSED_PREFIX = "zlib:"
+
+
+def decode_blob(value: Optional[str]) -> Optional[str]:
+    """Decompress a payload/response value written by cofi-service (others pass through)."""
+    if not isinstance(value, str) or not value.startswith(COMPRESSED_PREFIX):
+        return value
+    try:
+        return zlib.decompress(base64.b64decode(value[len(COMPRESSED_PREFIX):])).decode('utf-8')
+    except Exception as e:
+        logger.warning("event_blob_decode_failed", error=str(e))
+        return value
+
+
+def decode_events(events: List[Dict]) -> List[Dict]:
+    """Decompress payload/response of batchExecutionLog rows in place."""
+    for event in events:
+        for field in ('payload', 'response'):
+            if event.get(field):
+                event[field] = decode_blob(event[field])
+    return events
+
 
 class Database:
     """Database connection manager with connection pooling."""
@@ -144,6 +169,9 @@ class BatchStatusRepo:
 class BatchExecutionLogRepo:
     """Repository for reading batchExecutionLog table."""
 
+    # Cleared if batchStageCounters does not exist (migration not run)
+    counters_available = True
+
     def __init__(self, db: Database):
         self.db = db
 
@@ -164,7 +192,7 @@ class BatchExecutionLogRepo:
             ORDER BY timestamp DESC
             LIMIT %s
         """
-        return self.db.execute_query(query, (batch_id, limit))
+        return decode_events(self.db.execute_query(query, (batch_id, limit)))
 
     def get_latest_events(
         self,
@@ -191,7 +219,7 @@ class BatchExecutionLogRepo:
                 ORDER BY id ASC
                 LIMIT %s
             """
-            return self.db.execute_query(query, (batch_id, since_id, limit))
+            return decode_events(self.db.execute_query(query, (batch_id, since_id, limit)))
         else:
             query = """
                 SELECT * FROM batchExecutionLog
@@ -201,29 +229,53 @@ class BatchExecutionLogRepo:
             """
             results = self.db.execute_query(query, (batch_id, limit))
             # Reverse to get chronological order
-            return list(reversed(results))
+            return decode_events(list(reversed(results)))
 
     def get_stage_stats(self, batch_id: int) -> Dict[str, Dict[str, int]]:
         """
         Get aggregated statistics for all stages in a batch.
 
+        Reads the batchStageCounters rows maintained by cofi-service (one
+        row per stage); falls back to aggregating batchExecutionLog if that
+        table has not been created yet.
+
         Args:
             batch_id: Batch ID
 
         Returns:
             Dictionary mapping stage name to stats (total, processed, errors)
         """
-        query = """
-            SELECT
-                stage,
-                MAX(totalFiles) as total_files,
-                MAX(processedFiles) as processed_files,
-                SUM(CASE WHEN eventType = 'error' THEN 1 ELSE 0 END) as error_count
-            FROM batchExecutionLog
-            WHERE batchId = %s
-            GROUP BY stage
-        """
-        results = self.db.execute_query(query, (batch_id,))
+        results = None
+        if BatchExecutionLogRepo.counters_available:
+            query = """
+                SELECT
+                    stage,
+                    totalFiles as total_files,
+                    processedFiles as processed_files,
+                    errorCount as error_count
+                FROM batchStageCounters
+                WHERE batchId = %s
+            """
+            try:
+                results = self.db.execute_query(query, (batch_id,))
+            except mysql.connector.errors.ProgrammingError as e:
+                if e.errno != 1146:  # ER_NO_SUCH_TABLE
+                    raise
+                BatchExecutionLogRepo.counters_available = False
+                logger.warning("stage_counters_unavailable", error=str(e))
+
+        if results is None:
+            query = """
+                SELECT
+                    stage,
+                    MAX(totalFiles) as total_files,
+                    MAX(processedFiles) as processed_files,
+                    SUM(CASE WHEN eventType = 'error' THEN 1 ELSE 0 END) as error_count
+                FROM batchExecutionLog
+                WHERE batchId = %s
+                GROUP BY stage
+            """
+            results = self.db.execute_query(query, (batch_id,))
 
         stats = {}
         for row in results:
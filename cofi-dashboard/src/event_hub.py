@@ -0,0 +1,389 @@
+"""Per-batch fan-out of batchExecutionLog events to SSE clients."""
+import asyncio
+import json
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set
+
+import structlog
+
+from .database import BatchExecutionLogRepo
+
+logger = structlog.get_logger()
+
+# Put on a subscriber's queue when it is evicted for falling behind
+_EVICTED = object()
+
+
+def format_event(event: Dict[str, Any]) -> Dict[str, str]:
+    """Turn a batchExecutionLog row into an SSE message."""
+    timestamp = event.get('timestamp')
+    event_data = {
+        "id": event['id'],
+        "stage": event['stage'],
+        "eventType": event['eventType'],
+        "fileName": event.get('fileName'),
+        "gpuIp": event.get('gpuIp'),
+        "status": event['status'],
+        "payload": event.get('payload'),
+        "response": event.get('response'),
+        "errorMessage": event.get('errorMessage'),
+        "totalFiles": event.get('totalFiles'),
+        "processedFiles": event.get('processedFiles'),
+        "timestamp": timestamp.isoformat() if hasattr(timestamp, 'isoformat') else timestamp
+    }
+    return {
+        "event": event['eventType'],
+        "id": str(event['id']),
+        "data": json.dumps(event_data)
+    }
+
+
+class Subscription:
+    """
+    One SSE client's bounded queue of messages from a batch channel.
+
+    Events can arrive out of ID order (a resync reads events a push
+    missed after newer ones were pushed), so what was sent is tracked as
+    a bounded set of recent IDs rather than a high-water mark.
+    """
+
+    def __init__(self, batch_id: int, queue_size: int, sent_size: Optional[int] = None):
+        self.batch_id = batch_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.evicted = False
+        self._sent: Set[int] = set()
+        self._sent_order: Deque[int] = deque()
+        self._sent_size = sent_size or queue_size
+
+    def mark_sent(self, message: Dict[str, str]) -> bool:
+        """Record a message as sent; False if it was sent already."""
+        event_id = int(message['id'])
+        if event_id in self._sent:
+            return False
+        self._sent.add(event_id)
+        self._sent_order.append(event_id)
+        if len(self._sent_order) > self._sent_size:
+            self._sent.discard(self._sent_order.popleft())
+        return True
+
+    def offer(self, message: Dict[str, str]) -> bool:
+        """Queue a message without waiting; False if the client is too far behind."""
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def evict(self):
+        """Drop everything queued and tell the client to reconnect."""
+        self.evicted = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(_EVICTED)
+
+    async def get(self) -> Optional[Dict[str, str]]:
+        """Next message, or None once the subscription was evicted."""
+        message = await self.queue.get()
+        return None if message is _EVICTED else message
+
+
+class BatchChannel:
+    """
+    Fans one batch's new events out to its subscribers.
+
+    Events come from polling the database, or, with push enabled, from
+    cofi-service via EventHub.push. `last_id` only moves with what was read
+    from MySQL: pushed events are delivered at once but kept in `unconfirmed`
+    until a database read passes them, so a bogus or out-of-order push
+    cannot hide real events. With push, the database is read every
+    `fallback_interval` seconds (only on demand if 0), when cofi-service
+    reports dropped pushes (resync) and once `replay_size` pushed events
+    wait for confirmation. Recent messages are kept in a replay buffer so a
+    (re)connecting client gets the latest history without a query of its own.
+    """
+
+    def __init__(self, batch_id: int, log_repo: BatchExecutionLogRepo,
+                 poll_interval: float, replay_size: int, poll_limit: int = 200,
+                 push_enabled: bool = False, fallback_interval: float = 30):
+        self.batch_id = batch_id
+        self.log_repo = log_repo
+        self.poll_interval = fallback_interval if push_enabled else poll_interval
+        self.poll_limit = poll_limit
+        self.push_enabled = push_enabled
+        self.subscribers: Set[Subscription] = set()
+        self.recent: Deque[Dict[str, str]] = deque(maxlen=replay_size)
+        self.last_id = 0
+        self.unconfirmed: Set[int] = set()
+        self.polls = 0
+        self.pushed = 0
+        self.resyncs = 0
+        self.evictions = 0
+        self.ready = False
+        self._pending: List[Dict[str, Any]] = []
+        self._wake = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def delivered_id(self) -> int:
+        """Highest event ID sent to subscribers (pushed or read)."""
+        return max(self.unconfirmed, default=self.last_id)
+
+    async def start(self):
+        """Seed the replay buffer with the latest events and start polling."""
+        events = await asyncio.to_thread(
+            self.log_repo.get_latest_events, self.batch_id, None, self.recent.maxlen
+        )
+        self._publish(events, confirmed=True)
+        # Events pushed while the seed query ran
+        self.ready = True
+        self._publish(sorted(self._pending, key=lambda event: event['id']))
+        self._pending = []
+        if self.poll_interval > 0 or self.push_enabled:
+            self.task = asyncio.create_task(self._poll())
+
+    def push(self, events: List[Dict[str, Any]]):
+        """Publish events pushed by cofi-service (ordered by ID)."""
+        self.pushed += len(events)
+        if self.ready:
+            self._publish(events)
+        else:
+            self._pending.extend(events)
+        if len(self.unconfirmed) >= self.recent.maxlen:
+            self.resync()
+
+    def resync(self):
+        """Read the database now, e.g. because pushed events were dropped."""
+        self.resyncs += 1
+        self._wake.set()
+
+    def _publish(self, events: List[Dict[str, Any]], confirmed: bool = False):
+        """
+        Deliver events not sent yet.
+
+        Args:
+            events: batchExecutionLog rows ordered by ID
+            confirmed: The rows were read from MySQL, so last_id may move
+                past them (pushed rows are only remembered as delivered)
+        """
+        for event in events:
+            event_id = event['id']
+            if confirmed:
+                self.last_id = max(self.last_id, event_id)
+            # Already delivered by a push or an earlier poll
+            if event_id in self.unconfirmed:
+                continue
+            if not confirmed:
+                if event_id <= self.last_id:
+                    continue
+                self.unconfirmed.add(event_id)
+            message = format_event(event)
+            self._remember(message)
+            for subscription in list(self.subscribers):
+                if not subscription.offer(message):
+                    self.subscribers.discard(subscription)
+                    subscription.evict()
+                    self.evictions += 1
+                    logger.warning("sse_slow_client_evicted", batch_id=self.batch_id,
+                                   queue_size=subscription.queue.maxsize)
+
+        if confirmed:
+            self.unconfirmed = {event_id for event_id in self.unconfirmed if event_id > self.last_id}
+
+    def _remember(self, message: Dict[str, str]):
+        """Add a message to the replay buffer, keeping it ordered by ID."""
+        event_id = int(message['id'])
+        position = len(self.recent)
+        while position and int(self.recent[position - 1]['id']) > event_id:
+            position -= 1
+        if position == len(self.recent):
+            self.recent.append(message)
+            return
+        if len(self.recent) == self.recent.maxlen:
+            if position == 0:
+                # Older than the whole buffer; backlog() reads it from MySQL
+                return
+            self.recent.popleft()
+            position -= 1
+        self.recent.insert(position, message)
+
+    async def _poll(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval or None)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                # Drain everything new, poll_limit rows per query
+                while True:
+                    events = await asyncio.to_thread(
+                        self.log_repo.get_latest_events, self.batch_id, self.last_id, self.poll_limit
+                    )
+                    self.polls += 1
+                    self._publish(events, confirmed=True)
+                    if len(events) < self.poll_limit:
+                        break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("sse_poll_failed", batch_id=self.batch_id, error=str(e))
+
+    def backlog(self, last_event_id: Optional[int]) -> Optional[List[Dict[str, str]]]:
+        """
+        Buffered messages a new subscriber should get first.
+
+        Returns:
+            Messages after last_event_id (the whole buffer if None), or None
+            if last_event_id is older than the buffer reaches back
+        """
+        if last_event_id is None:
+            return list(self.recent)
+        # A full buffer may have dropped events between last_event_id and its start
+        if len(self.recent) == self.recent.maxlen and last_event_id < int(self.recent[0]['id']):
+            return None
+        return [message for message in self.recent if int(message['id']) > last_event_id]
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+
+class EventHub:
+    """
+    One channel per monitored batch, shared by all of that batch's SSE clients.
+
+    Database load depends on the number of batches being watched, not on
+    the number of viewers. With `push_enabled`, cofi-service pushes events
+    as it writes them (POST /api/events/push) and channels only read the
+    database for their initial replay, gap catch-up and to confirm pushed
+    events every `fallback_interval` seconds or when pushes were dropped. Each client has a bounded queue; a client that
+    falls more than `queue_size` messages behind is evicted and reconnects
+    (EventSource resends Last-Event-ID, so it resumes where it left off).
+    A batch's poller stops when its last client disconnects.
+    """
+
+    def __init__(self, log_repo: BatchExecutionLogRepo, poll_interval: float,
+                 queue_size: int = 1000, replay_size: int = 500,
+                 push_enabled: bool = False, fallback_interval: float = 30):
+        self.log_repo = log_repo
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.replay_size = replay_size
+        self.push_enabled = push_enabled
+        self.fallback_interval = fallback_interval
+        self.channels: Dict[int, BatchChannel] = {}
+        self._lock = asyncio.Lock()
+
+    async def subscribe(self, batch_id: int, last_event_id: Optional[int] = None):
+        """
+        Register a client and return (subscription, messages to send first).
+
+        Args:
+            batch_id: Batch to follow
+            last_event_id: Last event the client received (Last-Event-ID)
+        """
+        async with self._lock:
+            channel = self.channels.get(batch_id)
+            if channel is None:
+                channel = BatchChannel(batch_id, self.log_repo, self.poll_interval, self.replay_size,
+                                       push_enabled=self.push_enabled,
+                                       fallback_interval=self.fallback_interval)
+                # Registered before seeding so pushes meanwhile are kept
+                self.channels[batch_id] = channel
+                try:
+                    await channel.start()
+                except Exception:
+                    del self.channels[batch_id]
+                    raise
+
+            subscription = Subscription(batch_id, self.queue_size, sent_size=self.queue_size + self.replay_size)
+            backlog = channel.backlog(last_event_id)
+            channel.subscribers.add(subscription)
+            upto = channel.delivered_id
+
+        if backlog is None:
+            # Resuming from before the replay buffer: read the gap once for
+            # this client; newer events are already queued on its subscription
+            backlog = []
+            since = last_event_id
+            while since < upto:
+                events = await asyncio.to_thread(
+                    self.log_repo.get_latest_events, batch_id, since, self.replay_size
+                )
+                events = [event for event in events if event['id'] <= upto]
+                if not events:
+                    break
+                backlog.extend(format_event(event) for event in events)
+                since = events[-1]['id']
+
+        logger.info("sse_client_subscribed", batch_id=batch_id, clients=len(channel.subscribers),
+                    last_event_id=last_event_id, backlog=len(backlog))
+        return subscription, backlog
+
+    def push(self, events: List[Dict[str, Any]], gaps: Optional[List[int]] = None) -> int:
+        """
+        Deliver pushed batchExecutionLog rows to their batches' channels.
+
+        Events of batches nobody is watching are ignored (they are in MySQL).
+
+        Args:
+            events: batchExecutionLog rows ordered by ID
+            gaps: Batches whose events cofi-service had to drop; their
+                channels re-read the database from their last confirmed ID
+
+        Returns:
+            Number of events handed to a channel
+        """
+        by_batch: Dict[int, List[Dict[str, Any]]] = {}
+        for event in events:
+            by_batch.setdefault(event['batchId'], []).append(event)
+        delivered = 0
+        for batch_id, batch_events in by_batch.items():
+            channel = self.channels.get(batch_id)
+            if channel is not None:
+                channel.push(batch_events)
+                delivered += len(batch_events)
+        for batch_id in gaps or []:
+            channel = self.channels.get(batch_id)
+            if channel is not None:
+                channel.resync()
+        return delivered
+
+    async def unsubscribe(self, subscription: Subscription):
+        """Remove a client; stop the batch's poller if it was the last one."""
+        async with self._lock:
+            channel = self.channels.get(subscription.batch_id)
+            if channel is None:
+                return
+            channel.subscribers.discard(subscription)
+            if channel.subscribers:
+                return
+            del self.channels[subscription.batch_id]
+        await channel.stop()
+        logger.info("sse_channel_closed", batch_id=subscription.batch_id)
+
+    async def close(self):
+        """Stop all pollers (application shutdown)."""
+        async with self._lock:
+            channels, self.channels = list(self.channels.values()), {}
+        for channel in channels:
+            await channel.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        """Subscribers, polls, pushed events and evictions per monitored batch."""
+        return {
+            batch_id: {
+                'clients': len(channel.subscribers),
+                'last_event_id': channel.delivered_id,
+                'confirmed_event_id': channel.last_id,
+                'polls': channel.polls,
+                'pushed': channel.pushed,
+                'resyncs': channel.resyncs,
+                'evictions': channel.evictions
+            }
+            for batch_id, channel in self.channels.items()
+        }
@@ -0,0 +1,143 @@
+"""Tests for the per-batch SSE event hub (push, gaps and resync ordering)."""
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from src.event_hub import EventHub, Subscription
+
+
+def make_event(event_id: int, batch_id: int = 1) -> Dict[str, Any]:
+    return {
+        'id': event_id, 'batchId': batch_id, 'stage': 'stt', 'eventType': 'file_complete',
+        'status': 'success', 'timestamp': None
+    }
+
+
+class FakeLogRepo:
+    """batchExecutionLog stand-in: get_latest_events over an in-memory table."""
+
+    def __init__(self):
+        self.rows: List[Dict[str, Any]] = []
+        self.reads = 0
+
+    def add(self, *event_ids: int):
+        self.rows.extend(make_event(event_id) for event_id in event_ids)
+        self.rows.sort(key=lambda row: row['id'])
+
+    def get_latest_events(self, batch_id: int, since_id: Optional[int] = None, limit: int = 100):
+        self.reads += 1
+        rows = [row for row in self.rows if row['batchId'] == batch_id]
+        if since_id is None:
+            return rows[-limit:]
+        return [row for row in rows if row['id'] > since_id][:limit]
+
+
+def drain(subscription: Subscription) -> List[int]:
+    """IDs of the queued messages the client would actually send."""
+    sent = []
+    while not subscription.queue.empty():
+        message = subscription.queue.get_nowait()
+        if subscription.mark_sent(message):
+            sent.append(int(message['id']))
+    return sent
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_gap_resync_delivers_missing_events_after_newer_pushes():
+    async def scenario():
+        repo = FakeLogRepo()
+        repo.add(100)
+        hub = EventHub(repo, poll_interval=2, replay_size=10, push_enabled=True, fallback_interval=0)
+        subscription, backlog = await hub.subscribe(1)
+        assert [subscription.mark_sent(message) for message in backlog] == [True]
+
+        # 101-104 were written but their pushes dropped by cofi-service
+        repo.add(101, 102, 103, 104, 105, 106)
+        hub.push([make_event(105), make_event(106)], gaps=[1])
+        assert drain(subscription) == [105, 106]
+
+        await asyncio.sleep(0.05)  # resync poll reads 101-104 from MySQL
+        assert drain(subscription) == [101, 102, 103, 104]
+
+        channel = hub.channels[1]
+        assert channel.last_id == 106
+        assert channel.unconfirmed == set()
+        assert [int(message['id']) for message in channel.recent] == list(range(100, 107))
+        await hub.close()
+
+    run(scenario())
+
+
+def test_pushed_ids_do_not_move_confirmed_cursor():
+    async def scenario():
+        repo = FakeLogRepo()
+        repo.add(1)
+        hub = EventHub(repo, poll_interval=2, replay_size=10, push_enabled=True, fallback_interval=0)
+        subscription, _ = await hub.subscribe(1)
+
+        hub.push([make_event(10 ** 9)])
+        repo.add(2)
+        hub.push([make_event(2)])
+        assert drain(subscription) == [10 ** 9, 2]
+        assert hub.channels[1].last_id == 1
+        await hub.close()
+
+    run(scenario())
+
+
+def test_backlog_after_out_of_order_events_is_ordered():
+    async def scenario():
+        repo = FakeLogRepo()
+        repo.add(1, 2)
+        hub = EventHub(repo, poll_interval=2, replay_size=4, push_enabled=True, fallback_interval=0)
+        await hub.subscribe(1)
+        repo.add(3, 4, 5)
+        hub.push([make_event(5)], gaps=[1])
+        await asyncio.sleep(0.05)
+
+        channel = hub.channels[1]
+        assert [int(message['id']) for message in channel.recent] == [2, 3, 4, 5]
+        # Resuming from before the buffer falls back to a database read
+        assert channel.backlog(0) is None
+        assert [int(message['id']) for message in channel.backlog(3)] == [4, 5]
+        await hub.close()
+
+    run(scenario())
+
+
+def test_subscription_sent_ids_are_bounded():
+    subscription = Subscription(1, queue_size=2, sent_size=2)
+    assert subscription.mark_sent({'id': '1'})
+    assert not subscription.mark_sent({'id': '1'})
+    subscription.mark_sent({'id': '2'})
+    subscription.mark_sent({'id': '3'})
+    # 1 fell out of the window
+    assert subscription.mark_sent({'id': '1'})
+
+
+def test_slow_subscriber_is_evicted():
+    async def scenario():
+        repo = FakeLogRepo()
+        hub = EventHub(repo, poll_interval=2, queue_size=2, replay_size=10, push_enabled=True,
+                       fallback_interval=0)
+        subscription, _ = await hub.subscribe(1)
+        repo.add(1, 2, 3)
+        hub.push([make_event(1), make_event(2), make_event(3)])
+
+        assert subscription.evicted
+        assert await subscription.get() is None
+        assert hub.channels[1].subscribers == set()
+        await hub.close()
+
+    run(scenario())
+
+
+def test_events_of_unwatched_batches_are_ignored():
+    async def scenario():
+        hub = EventHub(FakeLogRepo(), poll_interval=2, push_enabled=True, fallback_interval=0)
+        assert hub.push([make_event(1, batch_id=7)], gaps=[7]) == 0
+        await hub.close()
+
+    run(scenario())
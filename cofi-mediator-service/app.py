@@ -1,4 +1,5 @@
 """FastAPI application for cofi-mediator-service."""
+import asyncio
 import os
 import shutil
 from pathlib import Path
@@ -45,6 +46,13 @@ class ContainerStatusRequest(BaseModel):
     container_name: str
 
 
+class ContainerReadyRequest(BaseModel):
+    container_name: str
+    port: int
+    path: str = "/"
+    timeout: float = 5.0
+
+
 # Endpoints
 
 @app.get("/health")
@@ -138,6 +146,27 @@ async def container_status(request: ContainerStatusRequest):
     return docker_service.get_container_status(request.container_name)
 
 
+@app.post("/container_ready")
+async def container_ready(request: ContainerReadyRequest):
+    """
+    Probe a container's model endpoint for readiness.
+    
+    Args:
+        request: ContainerReadyRequest with container_name, port and probe path
+        
+    Returns:
+        Readiness flag with container and probe status
+    """
+    docker_service = get_docker_service()
+    return await asyncio.to_thread(
+        docker_service.probe_container,
+        request.container_name,
+        request.port,
+        request.path,
+        request.timeout
+    )
+
+
 @app.get("/containers")
 async def list_containers():
     """
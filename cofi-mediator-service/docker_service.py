@@ -1,4 +1,7 @@
 """Docker SDK wrapper for container management."""
+import urllib.error
+import urllib.request
+
 import docker
 from docker.errors import NotFound, APIError
 import structlog
@@ -6,6 +9,9 @@ from typing import Dict, Any, Optional
 
 logger = structlog.get_logger()
 
+# Docker network shared by the mediator and the model containers
+PROBE_NETWORK = "auditnex-network"
+
 
 class DockerService:
     """Service for managing Docker containers using docker.from_env()."""
@@ -138,6 +144,95 @@ class DockerService:
                 "message": str(e)
             }
     
+    def probe_container(
+        self,
+        container_name: str,
+        port: int,
+        path: str = "/",
+        timeout: float = 5.0
+    ) -> Dict[str, Any]:
+        """
+        Check whether a container's model endpoint is accepting requests.
+        
+        The container must be running and its HTTP server must answer on
+        the container's address (see _probe_address). Any response below 500 counts as ready - a 404 or 405
+        still proves the model server has finished loading and is listening.
+        
+        Args:
+            container_name: Name of the container
+            port: Port the model server is published on
+            path: HTTP path to probe
+            timeout: Seconds to wait for the probe response
+            
+        Returns:
+            Dict with ready flag, container status and probe result
+        """
+        result = {
+            "ready": False,
+            "container_name": container_name,
+            "status": None,
+            "probe_status": None
+        }
+        
+        try:
+            container = self.client.containers.get(container_name)
+        except NotFound:
+            result["status"] = "not_found"
+            return result
+        except APIError as e:
+            result["status"] = "error"
+            result["message"] = str(e)
+            return result
+        
+        result["status"] = container.status
+        if container.status != "running":
+            return result
+        
+        host, container_port = self._probe_address(container, port)
+        url = f"http://{host}:{container_port}{path}"
+        try:
+            with urllib.request.urlopen(url, timeout=timeout) as resp:
+                result["probe_status"] = resp.status
+        except urllib.error.HTTPError as e:
+            result["probe_status"] = e.code
+        except Exception as e:
+            result["message"] = str(e)
+            return result
+        
+        result["ready"] = result["probe_status"] < 500
+        if result["ready"]:
+            logger.info("container_ready", container=container_name, port=port)
+        return result
+    
+    @staticmethod
+    def _probe_address(container, port: int):
+        """
+        Host and port at which the mediator reaches a container.
+        
+        The mediator runs on the bridge network, so the container is probed
+        at its IP on PROBE_NETWORK (any network it is on otherwise, or its
+        name as a last resort), and a published host port is mapped back to
+        the port the server listens on inside the container.
+        
+        Args:
+            container: Docker container object
+            port: Model server port as published on the GPU machine
+            
+        Returns:
+            Tuple of (host, port)
+        """
+        settings = container.attrs.get("NetworkSettings") or {}
+        networks = settings.get("Networks") or {}
+        host = (networks.get(PROBE_NETWORK) or {}).get("IPAddress")
+        if not host:
+            host = next((net.get("IPAddress") for net in networks.values() if net.get("IPAddress")),
+                        container.name)
+        
+        for container_port, bindings in (settings.get("Ports") or {}).items():
+            if any(str(binding.get("HostPort")) == str(port) for binding in bindings or []):
+                return host, int(container_port.split("/")[0])
+        return host, port
+    
     def list_containers(self, all: bool = True) -> list:
         """List all containers."""
         containers = self.client.containers.list(all=all)
@@ -9,9 +9,15 @@ import shutil
 from pathlib import Path
 
 from .config import get_settings
-from .database import get_database, BatchStatusRepo, FileDistributionRepo, CallRepo
+from .database import get_database, BatchStatusRepo, FileDistributionRepo, CallRepo, ReferenceCacheVersionRepo
 from .file_manager import FileManager
 from .mediator_client import MediatorClient
+from .http_session import close_http_sessions
+from .query_plan import verify_query_plans
+from .ref_cache import get_reference_cache
+from .event_log_writer import get_event_log_writer, close_event_log_writer
+from .event_logger import EventLogger
+from .event_publisher import get_event_publisher
 from .audit_pipeline import AuditPipeline
 from .reaudit_pipeline import ReauditPipeline
 
@@ -57,10 +63,65 @@ class ReauditResponse(BaseModel):
     files_queued: int
 
 
+@app.on_event("startup")
+async def startup_event():
+    """Warn about hot queries that would scan whole tables."""
+    if get_settings().verify_query_plans:
+        db = get_database()
+        await db.run(verify_query_plans, db)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close pooled HTTP connections and write queued events on shutdown."""
+    await close_http_sessions()
+    await get_database().run(close_event_log_writer)
+
+
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
-    return {"status": "healthy"}
+    """Health check endpoint (includes DB connection pool and event queue utilization)."""
+    publisher = get_event_publisher()
+    return {
+        "status": "healthy",
+        "db_pool": get_database().pool_stats(),
+        "event_log": {**get_event_log_writer().stats(), "storage": EventLogger.storage_stats()},
+        "event_push": publisher.stats() if publisher else {"mode": "off"}
+    }
+
+
+@app.get("/cache/reference")
+async def reference_cache_stats():
+    """Reference data cache hit/miss metrics."""
+    return get_reference_cache().stats()
+
+
+@app.post("/cache/reference/invalidate")
+async def invalidate_reference_cache(namespace: Optional[str] = None, key: Optional[str] = None):
+    """
+    Drop cached reference data after languages, processes or audit forms change.
+
+    The API's own cache is cleared at once. The invalidation is also
+    recorded in referenceCacheVersion, and other processes (the orchestrator)
+    drop the whole namespace within REF_CACHE_VERSION_CHECK_INTERVAL seconds.
+
+    Args:
+        namespace: "language", "process" or "audit_form" (all if omitted)
+        key: Language code, process ID or audit form ID (whole namespace if omitted)
+    """
+    if key is not None and namespace in ("process", "audit_form"):
+        if not key.isdigit():
+            raise HTTPException(status_code=400, detail=f"{namespace} key must be an integer ID")
+        key = int(key)
+    dropped = get_reference_cache().invalidate(namespace, key)
+    db = get_database()
+    propagated = await db.run(ReferenceCacheVersionRepo(db).bump, namespace)
+    return {
+        "status": "invalidated" if propagated else "invalidated_locally",
+        "namespace": namespace or "*",
+        "dropped": dropped,
+        "propagated": propagated
+    }
 
 
 @app.post("/audit/upload", response_model=AuditUploadResponse)
@@ -6,9 +6,10 @@ import structlog
 from pathlib import Path
 
 from .config import get_settings
-from .database import get_database, BatchStatusRepo, FileDistributionRepo, CallRepo, LidStatusRepo, LanguageRepo, ProcessRepo
+from .database import get_database, BatchStatusRepo, FileDistributionRepo, CallRepo, LidStatusRepo, LanguageRepo, ProcessRepo, BatchExecutionLogRepo
 from .file_manager import FileManager
 from .mediator_client import MediatorClient
+from .distribution_writer import DistributionRecordWriter
 from .event_logger import EventLogger
 from .pipeline.lid_stage import LIDStage
 from .pipeline.stt_stage import STTStage
@@ -49,6 +50,7 @@ class AuditPipeline:
         self.lid_repo = LidStatusRepo(self.db)
         self.language_repo = LanguageRepo(self.db)
         self.process_repo = ProcessRepo(self.db)
+        self.log_repo = BatchExecutionLogRepo(self.db)
     
     async def process(self, file_names: List[str], upload_dir: str):
         """
@@ -113,9 +115,7 @@ class AuditPipeline:
         return batch_id
     
     async def _distribute_files(self, file_names: List[str], upload_dir: str, batch_id: int):
-        """Distribute files to GPUs using round-robin in parallel."""
-        gpu_list = self.settings.gpu_machine_list
-
+        """Distribute files to GPUs (configured strategy) and upload in parallel."""
         self.batch_repo.update_db_insertion_status(batch_id, "InProgress")
         self.batch_repo.set_stage_start_time(batch_id, "file_distribution")
 
@@ -128,48 +128,61 @@ class AuditPipeline:
         # Get auditFormId once for all calls
         audit_form_id = self.process_repo.get_audit_form_id(self.process_id)
 
+        # fileDistribution and call rows are buffered and written in bulk
+        # (one transaction per chunk) on the DB thread pool as uploads finish
+        writer = DistributionRecordWriter(
+            self.file_dist_repo,
+            batch_id,
+            process_id=self.process_id,
+            category_mapping_id=self.category_mapping_id,
+            audio_endpoint=self.settings.audio_endpoint,
+            audit_form_id=audit_form_id
+        )
+
         async def upload_and_record(file_name: str, gpu_ip: str):
-            """Upload a single file and create records."""
+            """Upload a single file and queue its records."""
             file_path = Path(upload_dir) / file_name
 
             try:
                 # Upload to GPU
-                EventLogger.file_start(batch_id, 'file_distribution', file_name, gpu_ip)
+                await self.db.run(EventLogger.file_start, batch_id, 'file_distribution', file_name, gpu_ip)
                 await self.mediator.upload_file(gpu_ip, str(file_path), file_name)
 
-                # Create file distribution record
-                self.file_dist_repo.insert(file_name, gpu_ip, batch_id)
-
-                # Create call record (language info will be updated after LID stage)
-                self.call_repo.insert_from_distribution(
-                    audio_name=file_name,
-                    batch_id=batch_id,
-                    ip=gpu_ip,
-                    process_id=self.process_id,
-                    category_mapping_id=self.category_mapping_id,
-                    audio_endpoint=self.settings.audio_endpoint,
-                    audit_form_id=audit_form_id
-                )
-
-                EventLogger.file_complete(batch_id, 'file_distribution', file_name, gpu_ip, status='success')
+                await self.db.run(EventLogger.file_complete, batch_id, 'file_distribution', file_name, gpu_ip, status='success')
                 logger.info("file_distributed", file=file_name, gpu=gpu_ip, task_id=self.task_id)
-                return True
             except Exception as e:
                 logger.error("file_distribution_failed", file=file_name, error=str(e), task_id=self.task_id)
-                EventLogger.file_error(batch_id, 'file_distribution', file_name, str(e), gpu_ip,
-                                     payload={"file": file_name, "gpu": gpu_ip, "task_id": self.task_id})
+                await self.db.run(EventLogger.file_error, batch_id, 'file_distribution', file_name, str(e), gpu_ip,
+                                  payload={"file": file_name, "gpu": gpu_ip, "task_id": self.task_id})
                 return False
 
-        # Create upload tasks for all files (round-robin distribution)
+            # Queue file distribution + call records (language info will be
+            # updated after LID stage). A failed flush keeps the rows buffered
+            # for the next one.
+            try:
+                await self.db.run(writer.add, file_name, gpu_ip)
+            except Exception as e:
+                logger.error("distribution_flush_failed", file=file_name, error=str(e), task_id=self.task_id)
+            return True
+
+        # Assign files to GPUs, then create upload tasks for all files
+        distribution = self.file_manager.distribute_files_to_gpus(
+            [str(Path(upload_dir) / file_name) for file_name in file_names],
+            gpu_speeds=self.file_manager.get_relative_gpu_speeds(self.log_repo)
+        )
         upload_tasks = []
-        for idx, file_name in enumerate(file_names):
-            gpu_ip = gpu_list[idx % len(gpu_list)]
-            task = upload_and_record(file_name, gpu_ip)
-            upload_tasks.append(task)
+        for gpu_ip, file_paths in distribution.items():
+            for file_path in file_paths:
+                task = upload_and_record(self.file_manager.get_file_name(file_path), gpu_ip)
+                upload_tasks.append(task)
 
         # Execute all uploads in parallel with error handling
         logger.info("uploading_files_parallel", total_files=len(upload_tasks), task_id=self.task_id)
-        results = await asyncio.gather(*upload_tasks, return_exceptions=True)
+        try:
+            results = await asyncio.gather(*upload_tasks, return_exceptions=True)
+        finally:
+            # Rows of every uploaded file must be written before the stage is marked complete
+            await self.db.run(writer.flush)
 
         # Count successes and failures
         successful = sum(1 for r in results if r is True)
@@ -194,40 +207,20 @@ class AuditPipeline:
         self.batch_repo.update_lid_status(batch_id, "InProgress")
         self.batch_repo.set_stage_start_time(batch_id, "lid")
         lid_stage = LIDStage()
-        await lid_stage.execute(batch_id, None)
+        await lid_stage.execute(batch_id, None, self.settings.stt_container)
         self.batch_repo.update_lid_status(batch_id, "Complete")
         self.batch_repo.set_stage_end_time(batch_id, "lid")
         
         # Update progress with actual completed count
-        completed_files = self.file_dist_repo.get_by_batch(batch_id)
-        completed_count = sum(1 for f in completed_files if f.get('lidDone') == 1)
+        completed_count = self.file_dist_repo.count_stage_done(batch_id, 'lidDone')
         self.task_tracker["progress"]["lid"]["done"] = completed_count
         
         logger.info("lid_stage_completed", task_id=self.task_id, completed=completed_count)
     
     def _update_calls_from_lid(self, batch_id: int):
         """Update Call records with language info from LID results."""
-        lid_records = self.lid_repo.get_by_batch(batch_id)
-
-        updated_count = 0
-        for record in lid_records:
-            # Get language ID
-            lang_code = record.get('language', 'unknown')
-            lang_record = self.language_repo.get_by_code(lang_code)
-            language_id = lang_record['id'] if lang_record else None
-
-            # Update existing call record with language info and duration
-            try:
-                self.call_repo.update_lid_info(
-                    audio_name=record['file'],
-                    batch_id=batch_id,
-                    language_id=language_id,
-                    lang_code=lang_code,
-                    audio_duration=record.get('duration', 0)
-                )
-                updated_count += 1
-            except Exception as e:
-                logger.error("call_lid_update_failed", file=record['file'], error=str(e), task_id=self.task_id)
+        # Single join-update; only calls whose LID values changed are written
+        updated_count = self.call_repo.update_lid_info_for_batch(batch_id)
 
         logger.info("calls_updated_from_lid", count=updated_count, task_id=self.task_id)
     
@@ -243,8 +236,7 @@ class AuditPipeline:
         self.batch_repo.set_stage_end_time(batch_id, "stt")
         
         # Update progress with actual completed count
-        completed_files = self.file_dist_repo.get_by_batch(batch_id)
-        completed_count = sum(1 for f in completed_files if f.get('sttDone') == 1)
+        completed_count = self.file_dist_repo.count_stage_done(batch_id, 'sttDone')
         self.task_tracker["progress"]["stt"]["done"] = completed_count
         
         logger.info("stt_stage_completed", task_id=self.task_id, completed=completed_count)
@@ -261,8 +253,7 @@ class AuditPipeline:
         self.batch_repo.set_stage_end_time(batch_id, "llm1")
         
         # Update progress with actual completed count
-        completed_files = self.file_dist_repo.get_by_batch(batch_id)
-        completed_count = sum(1 for f in completed_files if f.get('llm1Done') == 1)
+        completed_count = self.file_dist_repo.count_stage_done(batch_id, 'llm1Done')
         self.task_tracker["progress"]["llm1"]["done"] = completed_count
         
         logger.info("llm1_stage_completed", task_id=self.task_id, completed=completed_count)
@@ -279,8 +270,7 @@ class AuditPipeline:
         self.batch_repo.set_stage_end_time(batch_id, "llm2")
         
         # Update progress with actual completed count
-        completed_files = self.file_dist_repo.get_by_batch(batch_id)
-        completed_count = sum(1 for f in completed_files if f.get('llm2Done') == 1)
+        completed_count = self.file_dist_repo.count_stage_done(batch_id, 'llm2Done')
         self.task_tracker["progress"]["llm2"]["done"] = completed_count
         
         logger.info("llm2_stage_completed", task_id=self.task_id, completed=completed_count)
@@ -0,0 +1,102 @@
+"""
+Benchmark LOAD DATA LOCAL INFILE against executemany.
+
+Loads synthetic tradeMetadata-shaped rows into a scratch table through both
+paths and reports rows/second. Needs local_infile=ON on the MySQL server.
+
+    python -m src.bench_bulk_load --rows 200000 --chunk 10000
+"""
+import argparse
+import random
+import string
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from .database import get_database
+
+SCRATCH_TABLE = "benchBulkLoad"
+
+COLUMNS = [
+    'orderId', 'clientCode', 'clientName', 'tradeDate', 'orderPlacedTime',
+    'symbol', 'scripName', 'strikePrice', 'tradeQuantity', 'tradePrice',
+    'dealerEmailId', 'dealingCity', 'batchId'
+]
+
+CREATE_SCRATCH = f"""
+    CREATE TABLE IF NOT EXISTS {SCRATCH_TABLE} (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        orderId VARCHAR(64), clientCode VARCHAR(64), clientName VARCHAR(255),
+        tradeDate DATE, orderPlacedTime DATETIME, symbol VARCHAR(64),
+        scripName VARCHAR(255), strikePrice DECIMAL(12, 2), tradeQuantity INT,
+        tradePrice DECIMAL(12, 2), dealerEmailId VARCHAR(255), dealingCity VARCHAR(128),
+        batchId INT
+    )
+"""
+
+
+def make_rows(count: int) -> List[tuple]:
+    """Synthetic rows with realistic widths (including tabs/newlines/NULLs to exercise escaping)."""
+    now = datetime.now()
+    rows = []
+    for i in range(count):
+        name = "".join(random.choices(string.ascii_letters + " ", k=24))
+        rows.append((
+            f"ORD{i:09d}",
+            f"C{random.randint(1, 99999):05d}",
+            name if i % 97 else name + "\t\n",
+            now.date(),
+            now - timedelta(seconds=random.randint(0, 86400)),
+            random.choice(["NIFTY", "BANKNIFTY", "RELIANCE", "TCS", "INFY"]),
+            None if i % 13 == 0 else f"{name[:12]} FUT",
+            round(random.uniform(100, 50000), 2),
+            random.randint(1, 5000),
+            round(random.uniform(1, 5000), 2),
+            f"dealer{random.randint(1, 500)}@example.com",
+            random.choice(["Mumbai", "Pune", "Delhi", "Chennai"]),
+            0
+        ))
+    return rows
+
+
+def time_path(label: str, load, rows: List[tuple], chunk: int) -> float:
+    started = time.perf_counter()
+    loaded = 0
+    for i in range(0, len(rows), chunk):
+        loaded += load(SCRATCH_TABLE, COLUMNS, rows[i:i + chunk])
+    elapsed = time.perf_counter() - started
+    rate = len(rows) / elapsed if elapsed else 0.0
+    print(f"{label:<14} {len(rows):>9} rows  {elapsed:8.2f}s  {rate:12.0f} rows/s  (reported {loaded})")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000, help="Rows loaded per path")
+    parser.add_argument("--chunk", type=int, default=10000, help="Rows per insert call (metadata loaders use 10000)")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch table afterwards")
+    args = parser.parse_args()
+
+    db = get_database()
+    loader = db.bulk_loader
+    rows = make_rows(args.rows)
+
+    db.execute_update(CREATE_SCRATCH)
+    try:
+        db.execute_update(f"TRUNCATE TABLE {SCRATCH_TABLE}")
+        many = time_path("executemany", loader.load_executemany, rows, args.chunk)
+
+        db.execute_update(f"TRUNCATE TABLE {SCRATCH_TABLE}")
+        try:
+            infile = time_path("load_infile", loader.load_infile, rows, args.chunk)
+            print(f"speedup        {many / infile:.1f}x")
+        except Exception as e:
+            print(f"load_infile    not available: {e}")
+            print("Enable local_infile=ON on the server and BULK_LOAD_ENABLED=true to use the fast path.")
+    finally:
+        if not args.keep:
+            db.execute_update(f"DROP TABLE IF EXISTS {SCRATCH_TABLE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""LOAD DATA LOCAL INFILE fast path for high-volume table loads."""
+import os
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, List, Sequence
+from mysql.connector import errors
+import structlog
+
+from .config import get_settings
+
+logger = structlog.get_logger()
+
+# Server/client errors meaning LOAD DATA LOCAL is not permitted here
+# (ER_NOT_ALLOWED_COMMAND, ER_CLIENT_LOCAL_FILES_DISABLED,
+# CR_LOAD_DATA_LOCAL_INFILE_REJECTED)
+LOCAL_INFILE_DENIED = {1148, 3948, 2068}
+
+
+class BulkLoadRejectedError(errors.DatabaseError):
+    """LOAD DATA reported warnings or skipped rows; the load was rolled back."""
+
+
+def _tsv_field(value: Any) -> str:
+    """Encode one value in LOAD DATA's default TSV escaping (NULL = \\N)."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+    if isinstance(value, (date, int, Decimal)):
+        return str(value)
+    if isinstance(value, float):
+        return "\\N" if value != value else repr(value)  # NaN -> NULL
+    if isinstance(value, timedelta):
+        total = int(value.total_seconds())
+        return f"{total // 3600:02d}:{total % 3600 // 60:02d}:{total % 60:02d}"
+    if isinstance(value, bytes):
+        value = value.decode("utf-8", errors="replace")
+    return (str(value)
+            .replace("\\", "\\\\")
+            .replace("\t", "\\t")
+            .replace("\n", "\\n")
+            .replace("\r", "\\r")
+            .replace("\0", "\\0"))
+
+
+class BulkLoader:
+    """
+    Loads rows into a table via LOAD DATA LOCAL INFILE, or executemany.
+
+    Rows are streamed to a temporary TSV file and loaded in one statement
+    inside a transaction, which is far faster than executemany for large
+    metadata files. Needs `local_infile=ON` on the server; if the server or
+    client refuses, the loader switches itself off for the rest of the
+    process and every load goes through executemany instead.
+
+    Unlike INSERT, LOAD DATA LOCAL turns duplicate keys and data
+    conversion errors into warnings and skipped rows. A load with any
+    warning or a row count short of the input is rolled back and the rows
+    go through executemany, which raises on such errors as before.
+    """
+
+    def __init__(self, db):
+        settings = get_settings()
+        self.db = db
+        self.enabled = settings.bulk_load_enabled
+        self.min_rows = settings.bulk_load_min_rows
+
+    @staticmethod
+    def insert_query(table: str, columns: Sequence[str]) -> str:
+        """INSERT statement used by the executemany path."""
+        column_list = ", ".join(columns)
+        placeholders = ", ".join(["%s"] * len(columns))
+        return f"INSERT INTO {table} ({column_list}) VALUES ({placeholders})"
+
+    def load(self, table: str, columns: Sequence[str], rows: List[tuple]) -> int:
+        """
+        Insert rows into a table with the fastest permitted path.
+
+        Args:
+            table: Table name
+            columns: Column names, in row tuple order
+            rows: Row tuples
+
+        Returns:
+            Number of rows inserted
+        """
+        if not rows:
+            return 0
+        if self.enabled and len(rows) >= self.min_rows:
+            try:
+                return self.load_infile(table, columns, rows)
+            except errors.Error as e:
+                if getattr(e, "errno", None) in LOCAL_INFILE_DENIED:
+                    self.enabled = False
+                    logger.warning("bulk_load_not_permitted", table=table, error=str(e))
+                else:
+                    logger.error("bulk_load_failed", table=table, rows=len(rows), error=str(e))
+        return self.load_executemany(table, columns, rows)
+
+    def load_executemany(self, table: str, columns: Sequence[str], rows: List[tuple]) -> int:
+        """Insert rows with executemany."""
+        return self.db.execute_many(self.insert_query(table, columns), rows)
+
+    def load_infile(self, table: str, columns: Sequence[str], rows: List[tuple]) -> int:
+        """
+        Insert rows with LOAD DATA LOCAL INFILE (all or nothing; joins an open unit of work).
+
+        Raises:
+            BulkLoadRejectedError: If the load had warnings or skipped rows
+        """
+        started = time.perf_counter()
+        fd, path = tempfile.mkstemp(prefix=f"cofi_{table}_", suffix=".tsv")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as tsv:
+                for row in rows:
+                    tsv.write("\t".join(_tsv_field(value) for value in row))
+                    tsv.write("\n")
+
+            query = (
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} "
+                "CHARACTER SET utf8mb4 "
+                "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+                "LINES TERMINATED BY '\\n' "
+                f"({', '.join(columns)})"
+            )
+            # One statement in its own unit of work (a savepoint inside an
+            # open one), rolled back unless every row loaded cleanly
+            with self.db.transaction() as conn:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute(query, (path,))
+                    loaded = cursor.rowcount
+                    warnings = conn.warning_count
+                    if warnings or loaded != len(rows):
+                        cursor.execute("SHOW WARNINGS LIMIT 3")
+                        raise BulkLoadRejectedError(
+                            msg=f"LOAD DATA into {table} loaded {loaded} of {len(rows)} rows "
+                                f"with {warnings} warnings: {cursor.fetchall()}"
+                        )
+                finally:
+                    cursor.close()
+        finally:
+            os.unlink(path)
+
+        logger.info("bulk_load_complete", table=table, rows=loaded,
+                    duration_seconds=round(time.perf_counter() - started, 3))
+        return loaded
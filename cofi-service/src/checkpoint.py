@@ -0,0 +1,58 @@
+"""Buffered, incremental persistence of per-file stage completion flags."""
+import threading
+import time
+from typing import List
+import structlog
+
+from .config import get_settings
+from .database import FileDistributionRepo
+
+logger = structlog.get_logger()
+
+
+class CompletionCheckpointer:
+    """
+    Buffers completed files and flushes their fileDistribution flag in chunks.
+
+    A flush happens once `flush_size` files are pending or `flush_interval`
+    seconds have passed since the last flush, so a crash loses at most the
+    current chunk and resume (which selects rows with the flag still 0)
+    only re-sends those files.
+    """
+
+    def __init__(self, file_dist_repo: FileDistributionRepo, batch_id: int, stage_column: str):
+        settings = get_settings()
+        self.file_dist_repo = file_dist_repo
+        self.batch_id = batch_id
+        self.stage_column = stage_column
+        self.flush_size = max(1, settings.checkpoint_flush_size)
+        self.flush_interval = settings.checkpoint_flush_interval
+        self.flushed = 0
+        self._pending: List[str] = []
+        self._last_flush = time.monotonic()
+        # add/flush may be called from DB executor threads
+        self._lock = threading.RLock()
+
+    def add(self, file_name: str):
+        """Record one completed file, flushing if the chunk is full or stale."""
+        with self._lock:
+            self._pending.append(file_name)
+            if (len(self._pending) >= self.flush_size
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self.flush()
+
+    def flush(self):
+        """Persist all pending completion flags."""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._pending:
+                return
+            files, self._pending = self._pending, []
+            try:
+                self.file_dist_repo.mark_stage_done(files, self.batch_id, self.stage_column)
+            except Exception:
+                # Keep the chunk so the next flush retries it
+                self._pending = files + self._pending
+                raise
+            self.flushed += len(files)
+        logger.info("completion_checkpoint", column=self.stage_column, count=len(files), total=self.flushed)
@@ -45,12 +45,60 @@ class Settings(BaseSettings):
     # Event Logging Config (for large batches)
     log_file_start_events: bool = Field(default=False, description="Log file_start events (set False for batches > 5000 files to reduce DB load by 50%)")
     progress_update_interval: int = Field(default=100, description="Log progress every N files (10=frequent, 100=balanced, 250=minimal)")
+    checkpoint_flush_size: int = Field(default=50, description="Persist stage completion flags every N completed files")
+    checkpoint_flush_interval: float = Field(default=10.0, description="Persist stage completion flags at least every N seconds")
 
-    # Wait Times (seconds)
-    ivr_wait: int = Field(default=60, description="Wait after IVR container start")
-    lid_wait: int = Field(default=60, description="Wait after LID container start")
-    stt_wait: int = Field(default=180, description="Wait after STT container start")
-    llm_wait: int = Field(default=300, description="Wait after LLM container start")
+    # File Distribution
+    distribution_strategy: str = Field(default="lpt", description="File-to-GPU assignment: 'lpt' (balance by duration/size) or 'round_robin'")
+    distribution_use_gpu_throughput: bool = Field(default=False, description="LPT: weight GPUs by STT throughput measured in recent batches")
+    distribution_throughput_lookback: int = Field(default=5, description="Number of recent batches used to measure GPU throughput")
+    distribution_flush_size: int = Field(default=200, description="Write fileDistribution/call rows of uploaded files every N files")
+    distribution_flush_interval: float = Field(default=2.0, description="Write buffered distribution rows at least every N seconds")
+
+    # GPU Dispatch Queues
+    gpu_max_inflight: int = Field(default=4, description="Max concurrent processing requests per GPU (initial limit in adaptive mode)")
+    gpu_adaptive_concurrency: bool = Field(default=False, description="Adapt per-GPU concurrency from latency and errors (AIMD)")
+    gpu_min_inflight: int = Field(default=1, description="Lower bound for adaptive per-GPU concurrency")
+    gpu_max_inflight_limit: int = Field(default=16, description="Upper bound for adaptive per-GPU concurrency")
+    gpu_latency_target: float = Field(default=120.0, description="Adaptive mode: request latency (s) above which concurrency is halved")
+    gpu_queue_stats_interval: int = Field(default=30, description="Seconds between per-GPU queue depth/in-flight log lines")
+    stream_result_buffer: int = Field(default=64, description="Completed responses buffered ahead of DB persistence before GPU workers pause")
+
+    # In-stage Retries (transient GPU/API failures: timeouts, connection errors, 429/5xx)
+    retry_max_attempts: int = Field(default=3, description="Attempts per file before it goes to the dead-letter list (1 = no retry)")
+    retry_base_delay: float = Field(default=5.0, description="Backoff before the first retry (seconds), doubled per attempt")
+    retry_max_delay: float = Field(default=120.0, description="Upper bound on retry backoff (seconds)")
+    retry_jitter: float = Field(default=0.5, description="Random fraction (0-1) taken off each backoff")
+    retry_reroute: bool = Field(default=True, description="Retry on a different GPU when audio storage is shared")
+    shared_audio_storage: bool = Field(default=False, description="All GPUs see the same audio files (enables cross-GPU retries)")
+    dead_letter_log_limit: int = Field(default=200, description="Max dead-letter entries included in the stage_complete event")
+
+    # HTTP Connection Pool (shared aiohttp session for mediator and NLP calls)
+    http_pool_limit: int = Field(default=200, description="Max pooled HTTP connections across all hosts (0 = unlimited)")
+    http_pool_limit_per_host: int = Field(default=32, description="Max pooled HTTP connections per host")
+    http_dns_cache_ttl: int = Field(default=300, description="Seconds to cache DNS lookups")
+    http_keepalive_timeout: float = Field(default=30.0, description="Seconds an idle keep-alive connection stays open")
+
+    # Wait Times (seconds) - upper bound on readiness probing after container start
+    ivr_wait: int = Field(default=60, description="Max wait for IVR container readiness")
+    lid_wait: int = Field(default=60, description="Max wait for LID container readiness")
+    stt_wait: int = Field(default=180, description="Max wait for STT container readiness")
+    llm_wait: int = Field(default=300, description="Max wait for LLM container readiness")
+
+    # Stage Scheduling
+    stage_executor_workers: int = Field(default=4, description="Threads for CPU/DB stages (CSV ingestion, rule engine) running alongside GPU stages")
+
+    # GPU Pools
+    gpu_pool_mode: str = Field(default="shared", description="'shared' (all GPUs run each stage in turn) or 'partitioned' (LID and STT run concurrently on separate GPU pools)")
+    partition_lid_share: float = Field(default=0.25, description="Partitioned mode: fraction of GPUs running LID when no throughput history exists")
+    partition_min_files: int = Field(default=1000, description="Partitioned mode: minimum pending LID files before pools are split")
+
+    # Container Switching
+    overlap_container_switch: bool = Field(default=True, description="Switch stage containers per GPU as each GPU drains, instead of a global stop/start barrier")
+
+    # Readiness Probes
+    readiness_probe_path: str = Field(default="/", description="HTTP path probed on the model server to detect readiness")
+    readiness_poll_interval: float = Field(default=5.0, description="Seconds between readiness probes per GPU")
     
     # Container Names
     ivr_container: str = Field(default="auditnex-ivr-1")
@@ -75,6 +123,36 @@ class Settings(BaseSettings):
     mysql_user: str = Field(default="root")
     mysql_password: str = Field(default="password")
     mysql_database: str = Field(default="testDb")
+    db_pool_size: int = Field(default=10, description="MySQL connections kept open in the pool")
+    db_pool_max_overflow: int = Field(default=5, description="Extra connections opened under load, closed when returned")
+    db_pool_timeout: float = Field(default=30.0, description="Seconds a caller waits for a free connection before failing")
+    db_pool_recycle: float = Field(default=3600.0, description="Replace connections older than this many seconds")
+    db_pool_ping_interval: float = Field(default=30.0, description="Ping connections idle longer than this before reuse")
+    ref_cache_enabled: bool = Field(default=True, description="Cache languages, processes and audit forms in memory")
+    ref_cache_ttl: float = Field(default=600.0, description="Seconds before cached reference data is reloaded")
+    ref_cache_version_check_interval: float = Field(default=5.0, description="Seconds between checks for reference cache invalidations made by other processes (0 = never)")
+    verify_query_plans: bool = Field(default=True, description="EXPLAIN hot queries at startup and warn about full table scans")
+    bulk_load_enabled: bool = Field(default=False, description="Load large metadata/transcript inserts with LOAD DATA LOCAL INFILE (server needs local_infile=ON)")
+    bulk_load_min_rows: int = Field(default=1000, description="Use LOAD DATA only for inserts of at least this many rows")
+    db_stream_batch_size: int = Field(default=2000, description="Rows fetched per round trip when streaming large result sets")
+    db_executor_workers: int = Field(default=4, description="Threads running DB calls issued from async code (keep below the connection pool size)")
+    db_group_commit_size: int = Field(default=25, description="Stage results stored per transaction (1 = commit every file)")
+    db_group_commit_interval: float = Field(default=2.0, description="Commit a partial group of stage results after N seconds")
+    file_state_enabled: bool = Field(default=False, description="Track per-file stages in the fileState table (run create_file_state.sql first)")
+    event_log_async: bool = Field(default=True, description="Queue batchExecutionLog events and write them in batches from a background thread")
+    event_log_flush_size: int = Field(default=200, description="Events written per multi-row INSERT")
+    event_log_flush_interval: float = Field(default=1.0, description="Write queued events at least every N seconds")
+    event_log_max_queue: int = Field(default=10000, description="Maximum queued events before the overflow policy applies")
+    event_log_overflow_policy: str = Field(default="block", description="When the event queue is full: block (wait for room) or drop (discard file/progress events)")
+    event_log_block_timeout: float = Field(default=5.0, description="Seconds a caller waits for queue room under the block policy before the event is dropped")
+    event_log_summarize_responses: bool = Field(default=True, description="Store per-stage response summaries (counts, durations, language, status) instead of full API responses")
+    event_log_compress_threshold: int = Field(default=4096, description="zlib-compress stored payloads/responses longer than N characters (0 = never)")
+    stage_counters_enabled: bool = Field(default=True, description="Maintain batchStageCounters with every event write (skipped if the table does not exist)")
+    event_push_mode: str = Field(default="off", description="Publish written events live: off, http (POST to the dashboard) or memory (in-process subscribers)")
+    event_push_url: str = Field(default="http://localhost:5066/api/events/push", description="Dashboard event push endpoint (http mode)")
+    event_push_timeout: float = Field(default=2.0, description="Timeout in seconds of one event push request")
+    event_push_token: str = Field(default="", description="Shared secret sent as X-Event-Push-Token (must match the dashboard's EVENT_PUSH_TOKEN)")
+    event_push_max_queue: int = Field(default=10000, description="Events held for the dashboard while it is unreachable before the oldest are dropped")
 
     # External Audit Server Webhook
     audit_server_url: str = Field(default="http://localhost:8000", description="External audit server URL for webhooks")
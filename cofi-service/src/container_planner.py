@@ -0,0 +1,105 @@
+"""Per-GPU container transitions between pipeline stages."""
+import asyncio
+from typing import Dict, List, Optional
+import structlog
+
+from .mediator_client import MediatorClient
+
+logger = structlog.get_logger()
+
+
+class ContainerTransitionPlanner:
+    """
+    Tracks which stage container runs on each GPU and switches them per GPU.
+
+    Instead of stopping stage N's container on every GPU and starting stage
+    N+1's everywhere at once, a stage hands each GPU over as soon as that GPU
+    has drained its own files: the old container is stopped and the next one
+    started in the background, so warm-up on early GPUs overlaps the tail of
+    slower ones. Transitions on one GPU are serialized and idempotent, so a
+    stage asking for a container that was already pre-started is a no-op.
+    """
+
+    def __init__(self, mediator: Optional[MediatorClient] = None):
+        self.mediator = mediator or MediatorClient()
+        # GPU IP -> container believed to be running (None = none of ours).
+        # GPUs missing from the dict are in an unknown state.
+        self.current: Dict[str, Optional[str]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._pending: Dict[str, asyncio.Task] = {}
+
+    def _lock(self, gpu_ip: str) -> asyncio.Lock:
+        if gpu_ip not in self._locks:
+            self._locks[gpu_ip] = asyncio.Lock()
+        return self._locks[gpu_ip]
+
+    async def transition(self, gpu_ip: str, from_container: Optional[str], to_container: Optional[str]):
+        """
+        Switch one GPU from one container to another.
+
+        Args:
+            gpu_ip: GPU machine IP
+            from_container: Container expected to be running (stopped if the
+                GPU's state is unknown)
+            to_container: Container to start, or None to only stop
+        """
+        async with self._lock(gpu_ip):
+            if gpu_ip in self.current:
+                running = self.current[gpu_ip]
+                if running == to_container:
+                    return
+            else:
+                running = from_container
+
+            if running and running != to_container:
+                try:
+                    await self.mediator.stop_container(gpu_ip, running)
+                except Exception as e:
+                    logger.warning("container_transition_stop_failed", gpu=gpu_ip, container=running, error=str(e))
+            self.current[gpu_ip] = None
+
+            if to_container:
+                try:
+                    await self.mediator.start_container(gpu_ip, to_container)
+                    self.current[gpu_ip] = to_container
+                except Exception as e:
+                    # Unknown state; the next transition stops/starts explicitly
+                    self.current.pop(gpu_ip, None)
+                    logger.error("container_transition_start_failed", gpu=gpu_ip, container=to_container, error=str(e))
+
+            if running or to_container:
+                logger.info("container_transition", gpu=gpu_ip, stopped=running, started=to_container)
+
+    def schedule(self, gpu_ip: str, from_container: Optional[str], to_container: Optional[str]) -> asyncio.Task:
+        """Run a transition in the background (queued behind any pending one on that GPU)."""
+        task = asyncio.create_task(self.transition(gpu_ip, from_container, to_container))
+        self._pending[gpu_ip] = task
+        return task
+
+    async def transition_all(self, gpu_ips: List[str], from_container: Optional[str], to_container: Optional[str]):
+        """Transition several GPUs concurrently."""
+        await asyncio.gather(*[self.transition(ip, from_container, to_container) for ip in gpu_ips])
+
+    async def drain(self):
+        """Wait for all background transitions to finish."""
+        pending = [task for task in self._pending.values() if not task.done()]
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        self._pending.clear()
+
+    async def stop_all(self):
+        """Stop whatever container the planner started on each GPU."""
+        await self.drain()
+        await self.transition_all(list(self.current), None, None)
+
+
+# Planner singleton (shared by all stages in the orchestrator)
+_planner: Optional[ContainerTransitionPlanner] = None
+
+
+def get_container_planner() -> ContainerTransitionPlanner:
+    """Get or create the container transition planner."""
+    global _planner
+    if _planner is None:
+        _planner = ContainerTransitionPlanner()
+    return _planner
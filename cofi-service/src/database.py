@@ -1,95 +1,325 @@
 """MySQL database connection and operations using mysql.connector."""
-import mysql.connector
-from mysql.connector import pooling
-from typing import Optional, List, Dict, Any, Tuple
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import Optional, List, Dict, Any, Tuple, Callable, Iterator
 from datetime import datetime
+from mysql.connector import errors
 import structlog
 
 from .config import get_settings
+from .db_pool import ConnectionPool
+from .bulk_loader import BulkLoader
+from .ref_cache import get_reference_cache
 
 logger = structlog.get_logger()
 
+# fileDistribution completion flags in pipeline order; fileState.stage is
+# the index of the next stage a file needs (len(STAGE_COLUMNS) = all done)
+STAGE_COLUMNS = ["denoiseDone", "ivrDone", "lidDone", "sttDone", "llm1Done", "llm2Done"]
+
 
 class Database:
     """Database connection manager using mysql.connector with connection pooling."""
     
     def __init__(self):
         settings = get_settings()
-        self.pool = pooling.MySQLConnectionPool(
-            pool_name="cofi_pool",
-            pool_size=5,
-            pool_reset_session=True,
+        # Callers wait (bounded by db_pool_timeout) when every connection is
+        # busy instead of failing, which bursts of parallel uploads hit easily
+        self.pool = ConnectionPool(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_pool_max_overflow,
+            timeout=settings.db_pool_timeout,
+            recycle=settings.db_pool_recycle,
+            ping_interval=settings.db_pool_ping_interval,
             host=settings.mysql_host,
             port=settings.mysql_port,
             user=settings.mysql_user,
             password=settings.mysql_password,
-            database=settings.mysql_database
+            database=settings.mysql_database,
+            allow_local_infile=settings.bulk_load_enabled
+        )
+        self.bulk_loader = BulkLoader(self)
+        # Unit-of-work state (open transaction connection) per thread
+        self._local = threading.local()
+        # Dedicated threads for DB work issued from coroutines, so blocking
+        # mysql.connector calls never stall the event loop. Keep it below the
+        # pool size so loop-thread callers can still get a connection.
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.db_executor_workers,
+            thread_name_prefix="db"
         )
-        logger.info("database_pool_created", host=settings.mysql_host, database=settings.mysql_database)
+        logger.info("database_pool_created", host=settings.mysql_host, database=settings.mysql_database,
+                    pool_size=settings.db_pool_size, max_overflow=settings.db_pool_max_overflow)
+    
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking DB function on the DB thread pool and await its result.
+        
+        Args:
+            func: Any callable doing database work (repo method, closure)
+            *args, **kwargs: Passed to func
+        
+        Returns:
+            Whatever func returns
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(func, *args, **kwargs))
     
     def get_connection(self):
-        """Get a connection from the pool."""
+        """Get a connection from the pool (waits up to db_pool_timeout if exhausted)."""
         return self.pool.get_connection()
     
-    def execute_query(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
-        """Execute a SELECT query and return results as list of dicts."""
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool utilization: in-use, waiters, wait times, timeouts."""
+        return self.pool.stats()
+    
+    @contextmanager
+    def connection(self, commit: bool = False) -> Iterator[Any]:
+        """
+        Connection for one operation.
+        
+        Inside a unit of work (see transaction) this is the unit's
+        connection and nothing is committed here; otherwise a pooled
+        connection that is committed (if `commit`) and returned afterwards.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            yield conn
+            return
+        
         conn = self.get_connection()
-        cursor = conn.cursor(dictionary=True)
         try:
-            cursor.execute(query, params)
-            results = cursor.fetchall()
-            return results
+            yield conn
+            if commit:
+                conn.commit()
         finally:
-            cursor.close()
             conn.close()
     
-    def execute_one(self, query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
-        """Execute a SELECT query and return single result."""
+    @contextmanager
+    def transaction(self) -> Iterator[Any]:
+        """
+        Unit of work: every Database/repo call on this thread inside the
+        block shares one connection and is committed once at the end, or
+        rolled back entirely if the block raises.
+        
+        Nested blocks become savepoints, so an outer block can group many
+        files into one commit while a failing file only rolls back its own
+        writes:
+        
+            with db.transaction():
+                for item in items:
+                    try:
+                        with db.transaction():
+                            write(item)
+                    except Exception:
+                        ...  # item's writes rolled back, others kept
+        
+        Yields:
+            The transaction's connection
+        """
+        local = self._local
+        conn = getattr(local, "conn", None)
+        
+        if conn is not None:
+            local.depth += 1
+            savepoint = f"uow_{local.depth}"
+            hooks = len(local.after_commit)
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"SAVEPOINT {savepoint}")
+                try:
+                    yield conn
+                except BaseException:
+                    cursor.execute(f"ROLLBACK TO SAVEPOINT {savepoint}")
+                    # Hooks registered by the rolled-back writes are dropped too
+                    del local.after_commit[hooks:]
+                    raise
+                cursor.execute(f"RELEASE SAVEPOINT {savepoint}")
+            finally:
+                cursor.close()
+                local.depth -= 1
+            return
+        
         conn = self.get_connection()
-        cursor = conn.cursor(dictionary=True)
+        local.conn, local.depth, local.after_commit = conn, 0, []
         try:
-            cursor.execute(query, params)
-            result = cursor.fetchone()
-            return result
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
         finally:
-            cursor.close()
+            hooks, local.after_commit = local.after_commit, []
+            local.conn = None
             conn.close()
+        for callback, args in hooks:
+            self._run_hook(callback, args)
     
-    def execute_update(self, query: str, params: tuple = None) -> int:
-        """Execute an INSERT/UPDATE/DELETE query and return affected rows."""
+    def after_commit(self, callback: Callable[..., Any], *args: Any):
+        """
+        Run a callback once the open unit of work has committed.
+        
+        Dropped if the transaction (or the savepoint it was registered in)
+        rolls back; runs immediately when no unit of work is open. Use it
+        for side effects that must only follow committed writes, such as
+        notifying other services.
+        """
+        if getattr(self._local, "conn", None) is None:
+            self._run_hook(callback, args)
+        else:
+            self._local.after_commit.append((callback, args))
+    
+    @staticmethod
+    def _run_hook(callback: Callable[..., Any], args: tuple):
+        try:
+            callback(*args)
+        except Exception as e:
+            logger.error("after_commit_hook_failed", error=str(e))
+    
+    def execute_query(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
+        """Execute a SELECT query and return results as list of dicts."""
+        with self.connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                cursor.execute(query, params)
+                results = cursor.fetchall()
+                return results
+            finally:
+                cursor.close()
+    
+    def iter_query(
+        self,
+        query: str,
+        params: tuple = None,
+        batch_size: int = None,
+        row_format: str = "dict"
+    ) -> Iterator[Any]:
+        """
+        Stream a SELECT's rows with bounded memory.
+        
+        Uses an unbuffered cursor and fetchmany, so only `batch_size` rows
+        are held client-side at a time. The connection stays checked out
+        until the iterator is exhausted or closed, and the server keeps the
+        result open meanwhile: consume promptly, and don't run other queries
+        on the same connection while iterating.
+        
+        Args:
+            query: SELECT statement
+            params: Query parameters
+            batch_size: Rows per fetchmany round trip (defaults to db_stream_batch_size)
+            row_format: "dict", "tuple" or "namedtuple" (tuples are far
+                smaller than dicts for wide tables)
+        
+        Yields:
+            One row per iteration in the requested format
+        """
+        if row_format not in ("dict", "tuple", "namedtuple"):
+            raise ValueError(f"Unknown row_format: {row_format}")
+        batch_size = batch_size or get_settings().db_stream_batch_size
+        
         conn = self.get_connection()
-        cursor = conn.cursor()
+        cursor = conn.cursor(
+            buffered=False,
+            dictionary=row_format == "dict",
+            named_tuple=row_format == "namedtuple"
+        )
         try:
             cursor.execute(query, params)
-            conn.commit()
-            return cursor.rowcount
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
         finally:
+            # Abandoned early: drain the rest so the connection can be reused
+            try:
+                conn.consume_results()
+            except Exception:
+                pass
             cursor.close()
             conn.close()
     
+    def execute_one(self, query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
+        """Execute a SELECT query and return single result."""
+        with self.connection() as conn:
+            cursor = conn.cursor(dictionary=True, buffered=True)
+            try:
+                cursor.execute(query, params)
+                result = cursor.fetchone()
+                return result
+            finally:
+                cursor.close()
+    
+    def execute_update(self, query: str, params: tuple = None) -> int:
+        """Execute an INSERT/UPDATE/DELETE query and return affected rows."""
+        with self.connection(commit=True) as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, params)
+                return cursor.rowcount
+            finally:
+                cursor.close()
+    
     def execute_insert(self, query: str, params: tuple = None) -> int:
         """Execute an INSERT query and return the last inserted ID."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute(query, params)
-            conn.commit()
-            return cursor.lastrowid
-        finally:
-            cursor.close()
-            conn.close()
+        with self.connection(commit=True) as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, params)
+                return cursor.lastrowid
+            finally:
+                cursor.close()
     
     def execute_many(self, query: str, params_list: List[tuple]) -> int:
         """Execute a query with multiple parameter sets."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.executemany(query, params_list)
-            conn.commit()
-            return cursor.rowcount
-        finally:
-            cursor.close()
-            conn.close()
+        with self.connection(commit=True) as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.executemany(query, params_list)
+                return cursor.rowcount
+            finally:
+                cursor.close()
+    
+    def bulk_insert(self, table: str, columns: List[str], rows: List[tuple]) -> int:
+        """
+        Insert many rows, via LOAD DATA LOCAL INFILE when enabled and permitted.
+        
+        Args:
+            table: Table name
+            columns: Column names, in row tuple order
+            rows: Row tuples
+        
+        Returns:
+            Number of rows inserted
+        """
+        return self.bulk_loader.load(table, columns, rows)
+    
+    def execute_statements(self, statements: List[Tuple[str, tuple]]) -> int:
+        """
+        Execute several write statements in one transaction.
+        
+        Either every statement is committed or none is (inside an open
+        unit of work they become part of it).
+        
+        Args:
+            statements: (query, params) pairs, run in order
+        
+        Returns:
+            Total affected rows
+        """
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            try:
+                affected = 0
+                for query, params in statements:
+                    cursor.execute(query, params)
+                    affected += cursor.rowcount
+                return affected
+            finally:
+                cursor.close()
 
 
 # Database singleton
@@ -182,6 +412,25 @@ class BatchStatusRepo:
         query = "UPDATE batchStatus SET status = %s WHERE id = %s"
         self.db.execute_update(query, (status, batch_id))
     
+    def update_status_unless(self, batch_id: int, status: str, later_statuses: List[str]):
+        """
+        Update batch status unless the batch has already reached a later one.
+        
+        For stages running concurrently with the main pipeline, whose
+        completion must not overwrite the status of a stage that ran after.
+        
+        Args:
+            batch_id: Batch ID
+            status: New status
+            later_statuses: Statuses that are left unchanged
+        """
+        placeholders = ', '.join(['%s'] * len(later_statuses))
+        query = f"""
+            UPDATE batchStatus SET status = %s
+            WHERE id = %s AND (status IS NULL OR status NOT IN ({placeholders}))
+        """
+        self.db.execute_update(query, (status, batch_id) + tuple(later_statuses))
+    
     # Stage-specific status columns (enum: 'Pending', 'InProgress', 'Complete')
     
     def update_db_insertion_status(self, batch_id: int, status: str):
@@ -245,11 +494,125 @@ class BatchStatusRepo:
         self.db.execute_update(query, (total_files, batch_id))
 
 
+class FileStateRepo:
+    """
+    Repository for fileState table operations.
+    
+    One row per file holding the next stage it needs, so pending files for
+    a stage are an index range scan on (batchId, stage). Stages only move
+    forward, so a file skipped past a disabled stage (e.g. denoise) has a
+    stage beyond it without its fileDistribution flag being set; per-stage
+    progress is therefore counted from the flags, not from here.
+    """
+    
+    PENDING_QUERY = """
+        SELECT id, file, ip, batchId, stage FROM fileState
+        WHERE batchId = %s AND stage <= %s
+    """
+    
+    def __init__(self, db: Database):
+        self.db = db
+    
+    @staticmethod
+    def stage_index(stage_column: str) -> int:
+        """Position of a fileDistribution flag (e.g. "lidDone") in the pipeline."""
+        return STAGE_COLUMNS.index(stage_column)
+    
+    def insert_many(self, records: List[Tuple[str, str]], batch_id: int) -> int:
+        """Add newly distributed (file_name, gpu_ip) pairs at the first stage."""
+        if not records:
+            return 0
+        params = []
+        for file_name, ip in records:
+            params.extend((batch_id, file_name, ip))
+        query = f"""
+            INSERT IGNORE INTO fileState (batchId, file, ip)
+            VALUES {', '.join(['(%s, %s, %s)'] * len(records))}
+        """
+        return self.db.execute_update(query, tuple(params))
+    
+    def sync_batch(self, batch_id: int) -> int:
+        """
+        Add fileState rows for files of a batch distributed before fileState
+        was enabled, placing each one past the latest stage it completed.
+        
+        Returns:
+            Number of rows added
+        """
+        query = """
+            INSERT IGNORE INTO fileState (batchId, file, ip, stage)
+            SELECT batchId, file, ip,
+                   CASE
+                       WHEN llm2Done = 1 THEN 6
+                       WHEN llm1Done = 1 THEN 5
+                       WHEN sttDone = 1 THEN 4
+                       WHEN lidDone = 1 THEN 3
+                       WHEN ivrDone = 1 THEN 2
+                       WHEN denoiseDone = 1 THEN 1
+                       ELSE 0
+                   END
+            FROM fileDistribution
+            WHERE batchId = %s
+        """
+        added = self.db.execute_update(query, (batch_id,))
+        if added:
+            logger.info("file_state_synced", batch_id=batch_id, added=added)
+        return added
+    
+    def get_pending(self, batch_id: int, stage_column: str, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Files that have not completed a stage.
+        
+        Args:
+            batch_id: Batch ID
+            stage_column: Stage flag, e.g. "lidDone"
+            limit: Return only the next N files (oldest first)
+        """
+        params: tuple = (batch_id, self.stage_index(stage_column))
+        query = self.PENDING_QUERY
+        if limit is not None:
+            query += " ORDER BY id LIMIT %s"
+            params += (limit,)
+        return self.db.execute_query(query, params)
+    
+    def advance(self, file_names: List[str], batch_id: int, stage_column: str):
+        """Mark files as past a stage."""
+        if not file_names:
+            return
+        placeholders = ', '.join(['%s'] * len(file_names))
+        query = f"""
+            UPDATE fileState
+            SET stage = GREATEST(stage, %s)
+            WHERE batchId = %s AND file IN ({placeholders})
+        """
+        params = (self.stage_index(stage_column) + 1, batch_id) + tuple(file_names)
+        self.db.execute_update(query, params)
+    
+    def reset(self, file_name: str, stage_column: str):
+        """Move a file back to a stage (for reaudit)."""
+        query = "UPDATE fileState SET stage = LEAST(stage, %s) WHERE file = %s"
+        self.db.execute_update(query, (self.stage_index(stage_column), file_name))
+
+
 class FileDistributionRepo:
-    """Repository for fileDistribution table operations."""
+    """
+    Repository for fileDistribution table operations.
+    
+    With FILE_STATE_ENABLED, pending files come from fileState and every
+    flag update is applied to both tables in one transaction.
+    """
+    
+    # Statement templates (also EXPLAINed by query_plan.verify_query_plans)
+    PENDING_QUERY = "SELECT * FROM fileDistribution WHERE batchId = %s AND {stage_column} = 0"
+    MARK_DONE_QUERY = """
+        UPDATE fileDistribution
+        SET {stage_column} = 1
+        WHERE file IN ({placeholders}) AND batchId = %s
+    """
     
     def __init__(self, db: Database):
         self.db = db
+        self.file_state = FileStateRepo(db) if get_settings().file_state_enabled else None
     
     def get_by_batch(self, batch_id: int) -> List[Dict]:
         """Get all file distributions for a batch."""
@@ -258,39 +621,119 @@ class FileDistributionRepo:
     
     def get_pending_for_stage(self, batch_id: int, stage_column: str) -> List[Dict]:
         """Get files pending for a specific stage."""
-        query = f"SELECT * FROM fileDistribution WHERE batchId = %s AND {stage_column} = 0"
+        if self.file_state:
+            return self.file_state.get_pending(batch_id, stage_column)
+        query = self.PENDING_QUERY.format(stage_column=stage_column)
         return self.db.execute_query(query, (batch_id,))
     
+    def count_stage_done(self, batch_id: int, stage_column: str) -> int:
+        """Count files of a batch that completed a stage (from its flag)."""
+        query = f"SELECT COUNT(*) AS files FROM fileDistribution WHERE batchId = %s AND {stage_column} = 1"
+        return self.db.execute_one(query, (batch_id,))['files']
+    
+    def count_stage_pending(self, batch_id: int, stage_column: str) -> int:
+        """Count files of a batch that have not completed a stage (from its flag)."""
+        query = f"SELECT COUNT(*) AS files FROM fileDistribution WHERE batchId = %s AND {stage_column} = 0"
+        return self.db.execute_one(query, (batch_id,))['files']
+    
     def insert(self, file_name: str, ip: str, batch_id: int) -> int:
         """Insert a new file distribution record."""
         query = """
             INSERT INTO fileDistribution (file, ip, batchId, denoiseDone, ivrDone, lidDone, sttDone, llm1Done, llm2Done)
             VALUES (%s, %s, %s, 0, 0, 0, 0, 0, 0)
         """
-        return self.db.execute_insert(query, (file_name, ip, batch_id))
+        with self.db.transaction():
+            record_id = self.db.execute_insert(query, (file_name, ip, batch_id))
+            if self.file_state:
+                self.file_state.insert_many([(file_name, ip)], batch_id)
+        return record_id
+    
+    def insert_distributed(
+        self,
+        records: List[Tuple[str, str]],
+        batch_id: int,
+        process_id: int,
+        category_mapping_id: int,
+        audio_endpoint: str,
+        audit_form_id: Optional[int]
+    ) -> int:
+        """
+        Insert fileDistribution and initial call rows for uploaded files.
+        
+        Both tables are written with one multi-row INSERT each, in a single
+        transaction, so a file never has one row without the other.
+        
+        Args:
+            records: (file_name, gpu_ip) pairs
+            batch_id: Batch ID
+            process_id, category_mapping_id, audio_endpoint, audit_form_id:
+                Call defaults, as in CallRepo.insert_from_distribution
+        
+        Returns:
+            Number of files written
+        """
+        if not records:
+            return 0
+        
+        dist_params = []
+        for file_name, ip in records:
+            dist_params.extend((file_name, ip, batch_id))
+        dist_query = f"""
+            INSERT INTO fileDistribution (file, ip, batchId, denoiseDone, ivrDone, lidDone, sttDone, llm1Done, llm2Done)
+            VALUES {', '.join(['(%s, %s, %s, 0, 0, 0, 0, 0, 0)'] * len(records))}
+        """
+        
+        # Initial call values as in CallRepo.insert_from_distribution
+        call_params = []
+        for file_name, ip in records:
+            call_params.extend((
+                file_name, batch_id, ip, process_id, category_mapping_id,
+                f"{audio_endpoint}/{file_name}", audit_form_id
+            ))
+        call_query = f"""
+            INSERT INTO `call` (
+                audioName, audioDuration, lang, status, batchId, ip,
+                processId, userId, categoryMappingId, audioUrl,
+                auditFormId, languageId, type
+            )
+            VALUES {', '.join(["(%s, 0, 'unknown', 'Pending', %s, %s, %s, 1, %s, %s, %s, NULL, 'Call')"] * len(records))}
+        """
+        
+        with self.db.transaction():
+            self.db.execute_statements([
+                (dist_query, tuple(dist_params)),
+                (call_query, tuple(call_params))
+            ])
+            if self.file_state:
+                self.file_state.insert_many(records, batch_id)
+        return len(records)
     
     def mark_stage_done(self, file_names: List[str], batch_id: int, stage_column: str):
         """Mark multiple files as done for a specific stage."""
         if not file_names:
             return
         placeholders = ', '.join(['%s'] * len(file_names))
-        query = f"""
-            UPDATE fileDistribution 
-            SET {stage_column} = 1 
-            WHERE file IN ({placeholders}) AND batchId = %s
-        """
+        query = self.MARK_DONE_QUERY.format(stage_column=stage_column, placeholders=placeholders)
         params = tuple(file_names) + (batch_id,)
-        self.db.execute_update(query, params)
+        with self.db.transaction():
+            self.db.execute_update(query, params)
+            if self.file_state:
+                self.file_state.advance(file_names, batch_id, stage_column)
     
     def reset_stage_for_file(self, file_name: str, stage_column: str):
         """Reset a stage to 0 for a specific file (for reaudit)."""
         query = f"UPDATE fileDistribution SET {stage_column} = 0 WHERE file = %s"
-        self.db.execute_update(query, (file_name,))
+        with self.db.transaction():
+            self.db.execute_update(query, (file_name,))
+            if self.file_state:
+                self.file_state.reset(file_name, stage_column)
 
 
 class LidStatusRepo:
     """Repository for lidStatus table operations."""
     
+    BY_BATCH_QUERY = "SELECT * FROM lidStatus WHERE batchId = %s"
+    
     def __init__(self, db: Database):
         self.db = db
     
@@ -304,8 +747,68 @@ class LidStatusRepo:
     
     def get_by_batch(self, batch_id: int) -> List[Dict]:
         """Get all LID records for a batch."""
-        query = "SELECT * FROM lidStatus WHERE batchId = %s"
-        return self.db.execute_query(query, (batch_id,))
+        return self.db.execute_query(self.BY_BATCH_QUERY, (batch_id,))
+
+
+class ReferenceCacheVersionRepo:
+    """
+    Repository for referenceCacheVersion table operations.
+    
+    Holds one version per reference cache namespace ("*" for all of them).
+    Invalidating bumps it, and every process's ReferenceCache drops the
+    namespace once it sees the new version, not only the process that
+    received the request.
+    """
+    
+    # Set to False once the table turns out to be missing (migration not run)
+    available = True
+    
+    VERSIONS_QUERY = "SELECT namespace, version FROM referenceCacheVersion"
+    
+    def __init__(self, db: Database):
+        self.db = db
+    
+    def get_versions(self) -> Dict[str, int]:
+        """Current version of each invalidated namespace."""
+        if not ReferenceCacheVersionRepo.available:
+            return {}
+        try:
+            rows = self.db.execute_query(self.VERSIONS_QUERY)
+        except errors.ProgrammingError as e:
+            self._check_missing(e)
+            return {}
+        return {row['namespace']: row['version'] for row in rows}
+    
+    def bump(self, namespace: Optional[str] = None) -> bool:
+        """
+        Record an invalidation for other processes.
+        
+        Args:
+            namespace: Cache namespace (all namespaces if None)
+        
+        Returns:
+            False if the table is missing, so only the local cache was cleared
+        """
+        if not ReferenceCacheVersionRepo.available:
+            return False
+        query = """
+            INSERT INTO referenceCacheVersion (namespace, version) VALUES (%s, 1)
+            ON DUPLICATE KEY UPDATE version = version + 1
+        """
+        try:
+            self.db.execute_update(query, (namespace or "*",))
+        except errors.ProgrammingError as e:
+            self._check_missing(e)
+            return False
+        return True
+    
+    @staticmethod
+    def _check_missing(error: errors.ProgrammingError):
+        if error.errno != 1146:  # ER_NO_SUCH_TABLE
+            raise error
+        ReferenceCacheVersionRepo.available = False
+        logger.warning("reference_cache_versions_unavailable", error=str(error),
+                       hint="run database/migrations/create_reference_cache_version.sql")
 
 
 class LanguageRepo:
@@ -315,9 +818,11 @@ class LanguageRepo:
         self.db = db
     
     def get_by_code(self, language_code: str) -> Optional[Dict]:
-        """Get language by language code."""
+        """Get language by language code (cached)."""
         query = "SELECT * FROM `language` WHERE languageCode = %s"
-        return self.db.execute_one(query, (language_code,))
+        return get_reference_cache().get_or_load(
+            "language", language_code, lambda: self.db.execute_one(query, (language_code,))
+        )
     
     def get_id_by_code(self, language_code: str) -> Optional[int]:
         """Get language ID by language code."""
@@ -332,9 +837,11 @@ class ProcessRepo:
         self.db = db
     
     def get_by_id(self, process_id: int) -> Optional[Dict]:
-        """Get process by ID."""
+        """Get process by ID (cached)."""
         query = "SELECT * FROM `process` WHERE id = %s"
-        return self.db.execute_one(query, (process_id,))
+        return get_reference_cache().get_or_load(
+            "process", process_id, lambda: self.db.execute_one(query, (process_id,))
+        )
     
     def get_audit_form_id(self, process_id: int) -> Optional[int]:
         """Get auditFormId for a process."""
@@ -345,18 +852,19 @@ class ProcessRepo:
 class CallRepo:
     """Repository for call table operations."""
     
+    BY_AUDIO_NAME_QUERY = "SELECT * FROM `call` WHERE audioName = %s AND batchId = %s"
+    BY_STATUS_QUERY = "SELECT * FROM `call` WHERE batchId = %s AND status = %s"
+    
     def __init__(self, db: Database):
         self.db = db
     
     def get_by_audio_name(self, audio_name: str, batch_id: int) -> Optional[Dict]:
         """Get call by audio name."""
-        query = "SELECT * FROM `call` WHERE audioName = %s AND batchId = %s"
-        return self.db.execute_one(query, (audio_name, batch_id))
+        return self.db.execute_one(self.BY_AUDIO_NAME_QUERY, (audio_name, batch_id))
     
     def get_by_status(self, batch_id: int, status: str) -> List[Dict]:
         """Get calls by status for a batch."""
-        query = "SELECT * FROM `call` WHERE batchId = %s AND status = %s"
-        return self.db.execute_query(query, (batch_id, status))
+        return self.db.execute_query(self.BY_STATUS_QUERY, (batch_id, status))
     
     def insert(
         self,
@@ -424,6 +932,40 @@ class CallRepo:
         """
         self.db.execute_update(query, (language_id, lang_code, audio_duration, audio_name, batch_id))
 
+    def update_lid_info_for_batch(self, batch_id: int) -> int:
+        """
+        Copy LID results (language and duration) onto every call of a batch.
+        
+        One join-update from lidStatus (latest row per file) and language into
+        call. Calls whose values already match are left alone, so re-running
+        after LID completed is a no-op.
+        
+        Args:
+            batch_id: Batch ID
+        
+        Returns:
+            Number of call records changed
+        """
+        query = """
+            UPDATE `call` c
+            JOIN (
+                SELECT l.audioName, COALESCE(l.language, 'unknown') AS lang,
+                       COALESCE(l.audioDuration, 0) AS duration
+                FROM lidStatus l
+                JOIN (
+                    SELECT audioName, MAX(id) AS id
+                    FROM lidStatus
+                    WHERE batchId = %s
+                    GROUP BY audioName
+                ) latest ON latest.id = l.id
+            ) lid ON lid.audioName = c.audioName
+            LEFT JOIN `language` lang ON lang.languageCode = lid.lang
+            SET c.languageId = lang.id, c.lang = lid.lang, c.audioDuration = lid.duration
+            WHERE c.batchId = %s
+              AND NOT (c.languageId <=> lang.id AND c.lang <=> lid.lang AND c.audioDuration <=> lid.duration)
+        """
+        return self.db.execute_update(query, (batch_id, batch_id))
+
     def insert_from_distribution(
         self,
         audio_name: str,
@@ -460,6 +1002,8 @@ class CallRepo:
 class TranscriptRepo:
     """Repository for transcript table operations."""
     
+    BY_CALL_ID_QUERY = "SELECT * FROM transcript WHERE callId = %s ORDER BY startTime"
+    
     def __init__(self, db: Database):
         self.db = db
     
@@ -487,10 +1031,7 @@ class TranscriptRepo:
         if not records:
             return 0
         
-        query = """
-            INSERT INTO transcript (callId, languageId, startTime, endTime, speaker, text, confidence)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """
+        columns = ['callId', 'languageId', 'startTime', 'endTime', 'speaker', 'text', 'confidence']
         
         params_list = []
         for record in records:
@@ -505,12 +1046,11 @@ class TranscriptRepo:
             )
             params_list.append(params)
         
-        return self.db.execute_many(query, params_list)
+        return self.db.bulk_insert("transcript", columns, params_list)
     
     def get_by_call_id(self, call_id: int) -> List[Dict]:
         """Get all transcript records for a call."""
-        query = "SELECT * FROM transcript WHERE callId = %s ORDER BY startTime"
-        return self.db.execute_query(query, (call_id,))
+        return self.db.execute_query(self.BY_CALL_ID_QUERY, (call_id,))
     
     def delete_by_call_id(self, call_id: int) -> int:
         """Delete all transcripts for a call (for reaudit)."""
@@ -519,11 +1059,94 @@ class TranscriptRepo:
 
 
 class BatchExecutionLogRepo:
-    """Repository for batchExecutionLog table operations."""
+    """
+    Repository for batchExecutionLog table operations.
+
+    Every event write also updates the per-stage batchStageCounters row in
+    the same transaction (if STAGE_COUNTERS_ENABLED and the table exists).
+    """
+
+    # Cleared for the whole process if batchStageCounters does not exist
+    counters_available = True
+    # Whether a multi-row INSERT gets consecutive IDs (checked on first use)
+    consecutive_ids: Optional[bool] = None
+    
+    SINCE_QUERY = """
+        SELECT * FROM batchExecutionLog
+        WHERE batchId = %s AND id > %s
+        ORDER BY id ASC
+        LIMIT %s
+    """
+    BY_STAGE_QUERY = """
+        SELECT * FROM batchExecutionLog
+        WHERE batchId = %s AND stage = %s
+        ORDER BY timestamp DESC
+        LIMIT %s
+    """
 
     def __init__(self, db: Database):
         self.db = db
 
+    @classmethod
+    def counters_enabled(cls) -> bool:
+        """Whether event writes maintain batchStageCounters."""
+        return cls.counters_available and get_settings().stage_counters_enabled
+
+    def update_stage_counters(self, events: List[Dict[str, Any]]):
+        """
+        Add a set of events to their batchStageCounters rows (one upsert).
+
+        Args:
+            events: Keyword arguments of insert_event, one dict per event
+        """
+        if not events or not self.counters_enabled():
+            return
+
+        counters: Dict[Tuple[int, str], Dict[str, Any]] = {}
+        for event in events:
+            timestamp = event.get('timestamp') or datetime.now()
+            counter = counters.setdefault(
+                (event['batch_id'], event['stage']),
+                {'total': None, 'processed': None, 'errors': 0, 'events': 0, 'first': timestamp, 'last': timestamp}
+            )
+            for key, field in (('total', 'total_files'), ('processed', 'processed_files')):
+                value = event.get(field)
+                if value is not None:
+                    counter[key] = value if counter[key] is None else max(counter[key], value)
+            counter['errors'] += int(event['event_type'] == 'error')
+            counter['events'] += 1
+            counter['first'] = min(counter['first'], timestamp)
+            counter['last'] = max(counter['last'], timestamp)
+
+        params = []
+        for (batch_id, stage), counter in counters.items():
+            params.extend((batch_id, stage, counter['total'], counter['processed'],
+                           counter['errors'], counter['events'], counter['first'], counter['last']))
+        # Totals keep their largest value (NULL = not reported), as MAX() did
+        query = f"""
+            INSERT INTO batchStageCounters (
+                batchId, stage, totalFiles, processedFiles,
+                errorCount, eventCount, firstEventAt, lastEventAt
+            ) VALUES {', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s)'] * len(counters))}
+            ON DUPLICATE KEY UPDATE
+                totalFiles = COALESCE(GREATEST(totalFiles, VALUES(totalFiles)), totalFiles, VALUES(totalFiles)),
+                processedFiles = COALESCE(GREATEST(processedFiles, VALUES(processedFiles)),
+                                          processedFiles, VALUES(processedFiles)),
+                errorCount = errorCount + VALUES(errorCount),
+                eventCount = eventCount + VALUES(eventCount),
+                firstEventAt = LEAST(firstEventAt, VALUES(firstEventAt)),
+                lastEventAt = GREATEST(lastEventAt, VALUES(lastEventAt))
+        """
+        try:
+            with self.db.transaction():
+                self.db.execute_update(query, tuple(params))
+        except errors.ProgrammingError as e:
+            if e.errno != 1146:  # ER_NO_SUCH_TABLE
+                raise
+            BatchExecutionLogRepo.counters_available = False
+            logger.warning("stage_counters_unavailable", error=str(e),
+                           hint="run database/migrations/create_batch_stage_counters.sql")
+
     def insert_event(
         self,
         batch_id: int,
@@ -537,7 +1160,8 @@ class BatchExecutionLogRepo:
         error_message: Optional[str] = None,
         total_files: Optional[int] = None,
         processed_files: Optional[int] = None,
-        metadata: Optional[str] = None
+        metadata: Optional[str] = None,
+        timestamp: Optional[datetime] = None
     ) -> int:
         """
         Insert a batch execution log event.
@@ -555,6 +1179,7 @@ class BatchExecutionLogRepo:
             total_files: Total files count (optional, for stage_start)
             processed_files: Processed files count (optional, for stage_progress/complete)
             metadata: JSON string of additional metadata (optional)
+            timestamp: When the event happened (defaults to now)
 
         Returns:
             Inserted event ID
@@ -563,15 +1188,103 @@ class BatchExecutionLogRepo:
             INSERT INTO batchExecutionLog (
                 batchId, stage, eventType, fileName, gpuIp,
                 payload, response, status, errorMessage,
-                totalFiles, processedFiles, metadata
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                totalFiles, processedFiles, metadata, timestamp
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
         """
+        timestamp = timestamp or datetime.now()
         params = (
             batch_id, stage, event_type, file_name, gpu_ip,
             payload, response, status, error_message,
-            total_files, processed_files, metadata
+            total_files, processed_files, metadata, timestamp
         )
-        return self.db.execute_insert(query, params)
+        with self.db.transaction():
+            event_id = self.db.execute_insert(query, params)
+            self.update_stage_counters([{
+                'batch_id': batch_id, 'stage': stage, 'event_type': event_type,
+                'total_files': total_files, 'processed_files': processed_files,
+                'timestamp': timestamp
+            }])
+        return event_id
+
+    @staticmethod
+    def _insert_events_query(events: List[Dict[str, Any]]):
+        """
+        Multi-row INSERT statement and parameters for events.
+
+        Each event keeps the time it was recorded ('timestamp', set when it
+        was queued) rather than the time its chunk is flushed.
+        """
+        params = []
+        for event in events:
+            params.extend((
+                event['batch_id'], event['stage'], event['event_type'],
+                event.get('file_name'), event.get('gpu_ip'),
+                event.get('payload'), event.get('response'),
+                event.get('status', 'processing'), event.get('error_message'),
+                event.get('total_files'), event.get('processed_files'), event.get('metadata'),
+                event.get('timestamp') or datetime.now()
+            ))
+        query = f"""
+            INSERT INTO batchExecutionLog (
+                batchId, stage, eventType, fileName, gpuIp,
+                payload, response, status, errorMessage,
+                totalFiles, processedFiles, metadata, timestamp
+            ) VALUES {', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)'] * len(events))}
+        """
+        return query, tuple(params)
+
+    def insert_events(self, events: List[Dict[str, Any]]) -> int:
+        """
+        Insert many events with one multi-row INSERT.
+
+        Args:
+            events: Keyword arguments of insert_event, one dict per event
+
+        Returns:
+            Number of events inserted
+        """
+        if not events:
+            return 0
+        query, params = self._insert_events_query(events)
+        with self.db.transaction():
+            inserted = self.db.execute_update(query, params)
+            self.update_stage_counters(events)
+        return inserted
+
+    def insert_events_returning_ids(self, events: List[Dict[str, Any]]) -> List[int]:
+        """
+        Insert many events and return their IDs (in event order).
+
+        A multi-row INSERT reports the ID of its first row; the others are
+        consecutive when innodb_autoinc_lock_mode is 0 or 1. Under the
+        interleaved mode (2) the events are inserted one by one instead,
+        still in a single transaction.
+
+        Args:
+            events: Keyword arguments of insert_event, one dict per event
+
+        Returns:
+            Inserted event IDs
+        """
+        if not events:
+            return []
+        if BatchExecutionLogRepo.consecutive_ids is None:
+            row = self.db.execute_one("SELECT @@innodb_autoinc_lock_mode AS mode")
+            BatchExecutionLogRepo.consecutive_ids = row is not None and int(row['mode']) < 2
+        with self.db.transaction() as conn:
+            if BatchExecutionLogRepo.consecutive_ids:
+                query, params = self._insert_events_query(events)
+                cursor = conn.cursor()
+                try:
+                    cursor.execute(query, params)
+                    first_id = cursor.lastrowid
+                finally:
+                    cursor.close()
+                ids = list(range(first_id, first_id + len(events)))
+            else:
+                ids = [self.db.execute_insert(*self._insert_events_query([event])) for event in events]
+            self.update_stage_counters(events)
+        return ids
 
     def get_by_batch(self, batch_id: int, limit: int = 1000) -> List[Dict]:
         """
@@ -611,13 +1324,7 @@ class BatchExecutionLogRepo:
             List of event records ordered by ID ascending (chronological)
         """
         if since_id is not None:
-            query = """
-                SELECT * FROM batchExecutionLog
-                WHERE batchId = %s AND id > %s
-                ORDER BY id ASC
-                LIMIT %s
-            """
-            return self.db.execute_query(query, (batch_id, since_id, limit))
+            return self.db.execute_query(self.SINCE_QUERY, (batch_id, since_id, limit))
         else:
             query = """
                 SELECT * FROM batchExecutionLog
@@ -640,6 +1347,15 @@ class BatchExecutionLogRepo:
         Returns:
             Dictionary with total_files, processed_files, errors counts
         """
+        if self.counters_enabled():
+            query = """
+                SELECT totalFiles AS total_files, processedFiles AS processed_files, errorCount AS error_count
+                FROM batchStageCounters
+                WHERE batchId = %s AND stage = %s
+            """
+            result = self.db.execute_one(query, (batch_id, stage))
+            return result if result else {'total_files': 0, 'processed_files': 0, 'error_count': 0}
+
         query = """
             SELECT
                 MAX(totalFiles) as total_files,
@@ -663,10 +1379,35 @@ class BatchExecutionLogRepo:
         Returns:
             List of event records for the stage
         """
+        return self.db.execute_query(self.BY_STAGE_QUERY, (batch_id, stage, limit))
+
+    def get_gpu_throughput(self, stage: str, lookback_batches: int = 5) -> Dict[str, float]:
+        """
+        Measure per-GPU throughput for a stage over recent batches.
+
+        Throughput is completed files per second of that GPU's active window
+        (first to last file_complete) within each batch, summed over batches.
+
+        Args:
+            stage: Stage name (e.g., 'stt')
+            lookback_batches: Number of most recent batch IDs to consider
+
+        Returns:
+            Dict mapping GPU IP to files per second (GPUs without data are omitted)
+        """
         query = """
-            SELECT * FROM batchExecutionLog
-            WHERE batchId = %s AND stage = %s
-            ORDER BY timestamp DESC
-            LIMIT %s
+            SELECT gpuIp, batchId, COUNT(*) AS files,
+                   TIMESTAMPDIFF(SECOND, MIN(timestamp), MAX(timestamp)) AS seconds
+            FROM batchExecutionLog
+            WHERE stage = %s AND eventType = 'file_complete' AND gpuIp IS NOT NULL
+              AND batchId > (SELECT COALESCE(MAX(id), 0) - %s FROM batchStatus)
+            GROUP BY gpuIp, batchId
         """
-        return self.db.execute_query(query, (batch_id, stage, limit))
+        files: Dict[str, int] = {}
+        seconds: Dict[str, int] = {}
+        for row in self.db.execute_query(query, (stage, lookback_batches)):
+            if not row['seconds']:
+                continue
+            files[row['gpuIp']] = files.get(row['gpuIp'], 0) + row['files']
+            seconds[row['gpuIp']] = seconds.get(row['gpuIp'], 0) + row['seconds']
+        return {ip: files[ip] / seconds[ip] for ip in files}
@@ -0,0 +1,249 @@
+"""Bounded MySQL connection pool with a wait queue, health checks and metrics."""
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+import mysql.connector
+from mysql.connector import errors
+import structlog
+
+logger = structlog.get_logger()
+
+
+class PoolTimeoutError(errors.PoolError):
+    """No connection became available within the pool timeout."""
+
+
+class PooledConnection:
+    """
+    Connection checked out of a ConnectionPool.
+
+    Behaves like the wrapped mysql.connector connection; close() hands it
+    back to the pool instead of closing the socket, so existing
+    `conn = db.get_connection() ... conn.close()` code keeps working.
+    """
+
+    def __init__(self, pool: "ConnectionPool", conn: Any, created_at: float):
+        self._pool = pool
+        self._conn = conn
+        self.created_at = created_at
+        self.last_used = time.monotonic()
+        self._checked_out = False
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+    def close(self):
+        """Return the connection to the pool."""
+        if self._checked_out:
+            self._checked_out = False
+            self._pool._release(self)
+
+
+class ConnectionPool:
+    """
+    Thread-safe MySQL connection pool.
+
+    Keeps up to `pool_size` connections open and opens up to `max_overflow`
+    extra ones under load (closed again when returned). When every slot is
+    in use, callers queue for up to `timeout` seconds instead
+    of failing immediately. Idle connections are pinged before reuse and
+    replaced once older than `recycle` seconds, so connections dropped by
+    the server's wait_timeout never reach a query. With `reset_session`,
+    a reused connection is reset (COM_RESET_CONNECTION) on checkout, so
+    session variables and temporary tables of its previous user are gone.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 5,
+        max_overflow: int = 0,
+        timeout: float = 30.0,
+        recycle: float = 3600.0,
+        ping_interval: float = 30.0,
+        reset_session: bool = True,
+        **connect_args
+    ):
+        self.pool_size = max(1, pool_size)
+        self.max_overflow = max(0, max_overflow)
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_interval = ping_interval
+        self.reset_session = reset_session
+        self._connect_args = connect_args
+
+        self._idle: Deque[PooledConnection] = deque()
+        self._opened = 0  # Connections currently open (idle + in use)
+        self._in_use = 0
+        self._waiters = 0
+        self._cond = threading.Condition()
+
+        # Metrics
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._max_wait = 0.0
+        self._timeouts = 0
+        self._recycled = 0
+        self._reconnects = 0
+        self._peak_in_use = 0
+
+    def _connect(self) -> PooledConnection:
+        conn = mysql.connector.connect(**self._connect_args)
+        return PooledConnection(self, conn, time.monotonic())
+
+    def _discard(self, pooled: PooledConnection):
+        try:
+            pooled._conn.close()
+        except Exception:
+            pass
+
+    def _healthy(self, pooled: PooledConnection) -> bool:
+        """Recycle old connections and ping ones idle for a while."""
+        now = time.monotonic()
+        if self.recycle and now - pooled.created_at > self.recycle:
+            self._recycled += 1
+            return False
+        if self.ping_interval and now - pooled.last_used > self.ping_interval:
+            try:
+                pooled._conn.ping(reconnect=False)
+            except Exception:
+                self._reconnects += 1
+                return False
+        return True
+
+    def _reset(self, pooled: PooledConnection) -> bool:
+        """Reset a reused connection's session state; False if that failed."""
+        try:
+            pooled._conn.reset_session()
+            return True
+        except Exception as e:
+            logger.warning("db_pool_reset_failed", error=str(e))
+            return False
+
+    def get_connection(self, timeout: Optional[float] = None) -> PooledConnection:
+        """
+        Check out a connection, waiting if the pool is exhausted.
+
+        Args:
+            timeout: Seconds to wait for a free connection (defaults to the
+                pool timeout)
+
+        Returns:
+            A PooledConnection; call close() to return it
+
+        Raises:
+            PoolTimeoutError: If none became available in time
+        """
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        waited = False
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    pooled = self._idle.popleft()
+                    break
+                if self._opened < self.pool_size + self.max_overflow:
+                    # Reserve the slot, then connect outside the lock
+                    self._opened += 1
+                    pooled = None
+                    break
+
+                remaining = timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self._timeouts += 1
+                    logger.warning("db_pool_timeout", timeout=timeout, **self._stats_locked())
+                    raise PoolTimeoutError(
+                        f"No database connection available after {timeout}s "
+                        f"({self._in_use} in use, {self._waiters} waiting)"
+                    )
+                waited = True
+                self._waiters += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiters -= 1
+
+            self._in_use += 1
+            self._checkouts += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+            if waited:
+                wait = time.monotonic() - started
+                self._waits += 1
+                self._wait_time += wait
+                self._max_wait = max(self._max_wait, wait)
+
+        try:
+            if pooled is not None and not (
+                self._healthy(pooled) and (not self.reset_session or self._reset(pooled))
+            ):
+                self._discard(pooled)
+                pooled = None
+            if pooled is None:
+                pooled = self._connect()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._opened -= 1
+                self._cond.notify()
+            raise
+
+        pooled._checked_out = True
+        return pooled
+
+    def _release(self, pooled: PooledConnection):
+        """Take a connection back (called by PooledConnection.close)."""
+        keep = True
+        try:
+            # Never hand the next caller someone else's open transaction
+            if pooled._conn.in_transaction:
+                pooled._conn.rollback()
+        except Exception:
+            keep = False
+
+        with self._cond:
+            self._in_use -= 1
+            # Overflow connections are closed once the pool is back under its size
+            if keep and self._opened <= self.pool_size:
+                pooled.last_used = time.monotonic()
+                self._idle.append(pooled)
+            else:
+                self._opened -= 1
+                keep = False
+            self._cond.notify()
+
+        if not keep:
+            self._discard(pooled)
+
+    def _stats_locked(self) -> Dict[str, Any]:
+        return {
+            'pool_size': self.pool_size,
+            'max_overflow': self.max_overflow,
+            'open': self._opened,
+            'idle': len(self._idle),
+            'in_use': self._in_use,
+            'peak_in_use': self._peak_in_use,
+            'waiters': self._waiters,
+            'checkouts': self._checkouts,
+            'waits': self._waits,
+            'avg_wait_ms': round(self._wait_time / self._waits * 1000, 1) if self._waits else 0.0,
+            'max_wait_ms': round(self._max_wait * 1000, 1),
+            'timeouts': self._timeouts,
+            'recycled': self._recycled,
+            'reconnects': self._reconnects,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Utilization snapshot: in-use, waiters, wait times, timeouts."""
+        with self._cond:
+            return self._stats_locked()
+
+    def close_idle(self):
+        """Close every idle connection (in-use ones close when returned)."""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._opened -= len(idle)
+        for pooled in idle:
+            self._discard(pooled)
@@ -0,0 +1,78 @@
+"""Buffered bulk writer for file distribution records."""
+import threading
+import time
+from typing import List, Optional, Tuple
+import structlog
+
+from .config import get_settings
+from .database import FileDistributionRepo
+
+logger = structlog.get_logger()
+
+
+class DistributionRecordWriter:
+    """
+    Collects uploaded files and writes their fileDistribution and call rows in bulk.
+
+    A flush happens once `flush_size` files are pending or `flush_interval`
+    seconds have passed since the last flush; each flush is one transaction
+    with a multi-row INSERT per table. Files are only added after their
+    upload succeeded, so a crash can leave uploaded files without rows but
+    never rows without uploads; file distribution resume re-uploads and
+    records any file that has no fileDistribution row.
+    """
+
+    def __init__(
+        self,
+        file_dist_repo: FileDistributionRepo,
+        batch_id: int,
+        process_id: int,
+        category_mapping_id: int,
+        audio_endpoint: str,
+        audit_form_id: Optional[int]
+    ):
+        settings = get_settings()
+        self.file_dist_repo = file_dist_repo
+        self.batch_id = batch_id
+        self.process_id = process_id
+        self.category_mapping_id = category_mapping_id
+        self.audio_endpoint = audio_endpoint
+        self.audit_form_id = audit_form_id
+        self.flush_size = max(1, settings.distribution_flush_size)
+        self.flush_interval = settings.distribution_flush_interval
+        self.written = 0
+        self._pending: List[Tuple[str, str]] = []
+        self._last_flush = time.monotonic()
+        # add/flush are called from DB executor threads
+        self._lock = threading.RLock()
+
+    def add(self, file_name: str, gpu_ip: str):
+        """Record one uploaded file, flushing if the buffer is full or stale."""
+        with self._lock:
+            self._pending.append((file_name, gpu_ip))
+            if (len(self._pending) >= self.flush_size
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self.flush()
+
+    def flush(self):
+        """Write all pending rows in one transaction."""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._pending:
+                return
+            records, self._pending = self._pending, []
+            try:
+                self.file_dist_repo.insert_distributed(
+                    records,
+                    batch_id=self.batch_id,
+                    process_id=self.process_id,
+                    category_mapping_id=self.category_mapping_id,
+                    audio_endpoint=self.audio_endpoint,
+                    audit_form_id=self.audit_form_id
+                )
+            except Exception:
+                # Keep the rows so the next flush retries them
+                self._pending = records + self._pending
+                raise
+            self.written += len(records)
+        logger.info("distribution_records_flushed", batch_id=self.batch_id, count=len(records), total=self.written)
@@ -0,0 +1,216 @@
+"""Background, batched writer for batchExecutionLog events."""
+import atexit
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+import structlog
+
+from .config import get_settings
+from .database import get_database, BatchExecutionLogRepo
+from .event_publisher import EventPublisher, get_event_publisher, close_event_publisher, to_log_row
+
+logger = structlog.get_logger()
+
+# High-volume event types that the "drop" policy may discard when the queue
+# is full; stage start/complete, errors and info messages are always kept
+DROPPABLE_EVENTS = {"file_start", "file_complete", "stage_progress"}
+
+
+class EventLogWriter:
+    """
+    Queues batchExecutionLog events and writes them from a background thread.
+
+    The flusher writes one multi-row INSERT once `flush_size` events are
+    queued or `flush_interval` seconds have passed, so callers only pay for
+    an append. The queue is bounded by `max_queue`; when it is full the
+    "block" policy makes callers wait up to `block_timeout` seconds for
+    room (backpressure), while "drop" discards high-volume file/progress
+    events straight away. Events still queued are written by close(),
+    which also runs at interpreter exit. With a publisher, every written
+    chunk is also published with its IDs (see EventPublisher).
+    """
+
+    def __init__(
+        self,
+        repo: BatchExecutionLogRepo,
+        flush_size: int = 200,
+        flush_interval: float = 1.0,
+        max_queue: int = 10000,
+        policy: str = "block",
+        block_timeout: float = 5.0,
+        publisher: Optional[EventPublisher] = None
+    ):
+        if policy not in ("block", "drop"):
+            raise ValueError(f"Unknown event log overflow policy: {policy}")
+        self.repo = repo
+        self.flush_size = max(1, flush_size)
+        self.flush_interval = flush_interval
+        self.max_queue = max(self.flush_size, max_queue)
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.publisher = publisher
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._flushing = False
+        self._flush_requested = False
+        self._thread = threading.Thread(target=self._run, name="event-log-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, event: Dict[str, Any]) -> bool:
+        """
+        Queue one event (keyword arguments of BatchExecutionLogRepo.insert_event).
+
+        The event is stamped with the current time unless it has a
+        'timestamp' already, so it is stored with when it happened rather
+        than when its chunk is written.
+
+        Returns:
+            False if the event was dropped
+        """
+        event.setdefault('timestamp', datetime.now())
+        with self._cond:
+            if not self._closed and len(self._queue) >= self.max_queue:
+                if self.policy == "drop" and event.get("event_type") in DROPPABLE_EVENTS:
+                    self._drop(event)
+                    return False
+                # Backpressure: wait for the flusher to make room
+                self._cond.notify_all()
+                deadline = time.monotonic() + self.block_timeout
+                while len(self._queue) >= self.max_queue and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._drop(event)
+                        return False
+                    self._cond.wait(remaining)
+            if not self._closed:
+                self._queue.append(event)
+                if len(self._queue) >= self.flush_size:
+                    self._cond.notify_all()
+                return True
+        # Closed (possibly while waiting for room): the flusher may already
+        # have stopped, so write the event directly, outside the lock
+        self._write([event])
+        return True
+
+    def _drop(self, event: Dict[str, Any]):
+        self.dropped += 1
+        # Log the first drop and then every 1000th to avoid flooding the log
+        if self.dropped == 1 or self.dropped % 1000 == 0:
+            logger.warning("event_log_dropped", event_type=event.get("event_type"),
+                           stage=event.get("stage"), dropped=self.dropped, policy=self.policy)
+
+    def _run(self):
+        """Flusher thread: write a chunk whenever it is full or stale."""
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while len(self._queue) < self.flush_size and not (self._closed or self._flush_requested):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed and not self._queue:
+                    return
+                chunk = [self._queue.popleft() for _ in range(min(self.flush_size, len(self._queue)))]
+                self._flushing = bool(chunk)
+                if not self._queue:
+                    self._flush_requested = False
+                # Room was made for blocked producers
+                self._cond.notify_all()
+            try:
+                if chunk:
+                    self._write(chunk)
+            finally:
+                with self._cond:
+                    self._flushing = False
+                    self._cond.notify_all()
+
+    def _write(self, events: List[Dict[str, Any]]):
+        try:
+            if self.publisher is None:
+                self.repo.insert_events(events)
+            else:
+                ids = self.repo.insert_events_returning_ids(events)
+            self.written += len(events)
+        except Exception as e:
+            # Logging must never stop the pipeline; the events are lost
+            self.failed += len(events)
+            logger.error("event_log_flush_failed", count=len(events), error=str(e))
+            return
+        if self.publisher is not None:
+            self.publisher.publish([to_log_row(event, event_id) for event, event_id in zip(events, ids)])
+
+    def flush(self, timeout: Optional[float] = None):
+        """Wait until every event queued so far has been written."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._flushing:
+                self._flush_requested = True
+                self._cond.notify_all()
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    logger.warning("event_log_flush_timeout", pending=len(self._queue))
+                    return
+                self._cond.wait(remaining if remaining is not None else self.flush_interval)
+
+    def close(self, timeout: Optional[float] = 30.0):
+        """Write all queued events and stop the flusher thread."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        logger.info("event_log_writer_closed", written=self.written, dropped=self.dropped, failed=self.failed)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and write/drop counters."""
+        with self._cond:
+            return {
+                'queued': len(self._queue),
+                'max_queue': self.max_queue,
+                'policy': self.policy,
+                'written': self.written,
+                'dropped': self.dropped,
+                'failed': self.failed
+            }
+
+
+# Writer singleton (started on first use)
+_writer: Optional[EventLogWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_event_log_writer() -> EventLogWriter:
+    """Get or start the batched event log writer."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            settings = get_settings()
+            _writer = EventLogWriter(
+                BatchExecutionLogRepo(get_database()),
+                flush_size=settings.event_log_flush_size,
+                flush_interval=settings.event_log_flush_interval,
+                max_queue=settings.event_log_max_queue,
+                policy=settings.event_log_overflow_policy,
+                block_timeout=settings.event_log_block_timeout,
+                publisher=get_event_publisher()
+            )
+            atexit.register(_writer.close)
+        return _writer
+
+
+def close_event_log_writer():
+    """Write queued events and stop the writer and the event publisher."""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.close()
+    close_event_publisher()
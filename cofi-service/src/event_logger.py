@@ -1,18 +1,33 @@
 """Event logging module for batch processing pipeline monitoring."""
+import base64
 import json
-from typing import Optional, Dict, Any
+import threading
+import zlib
+from typing import Optional, Dict, Any, Callable
 from datetime import datetime
 import structlog
 
+from .config import get_settings
 from .database import get_database
+from .event_log_writer import get_event_log_writer
+from .event_publisher import get_event_publisher, to_log_row
 
 logger = structlog.get_logger()
 
+# Prefix of payload/response values stored zlib-compressed and base64-encoded
+COMPRESSED_PREFIX = "zlib:"
+
+# Sizes of payload/response blobs before and after summarizing/compression
+_storage = {'blobs': 0, 'compressed': 0, 'original_bytes': 0, 'stored_bytes': 0}
+_storage_lock = threading.Lock()
+
 
 class EventLogger:
     """
     Centralized event logger for batch processing pipeline.
     Logs detailed execution events to batchExecutionLog table for dashboard monitoring.
+    Events are queued and written in batches by a background thread
+    (see EventLogWriter) unless EVENT_LOG_ASYNC is off.
     """
 
     @staticmethod
@@ -22,6 +37,18 @@ class EventLogger:
         db = get_database()
         return BatchExecutionLogRepo(db)
 
+    @staticmethod
+    def _write(**event):
+        """Queue an event for the background writer (or insert it directly if disabled)."""
+        event['timestamp'] = datetime.now()
+        if get_settings().event_log_async:
+            get_event_log_writer().put(event)
+            return
+        event_id = EventLogger._get_repo().insert_event(**event)
+        publisher = get_event_publisher()
+        if publisher is not None:
+            publisher.publish([to_log_row(event, event_id)])
+
     @staticmethod
     def _serialize_data(data: Any) -> Optional[str]:
         """Serialize data to JSON string."""
@@ -33,6 +60,52 @@ class EventLogger:
             logger.error("event_logger_serialization_failed", error=str(e))
             return str(data)
 
+    @staticmethod
+    def _encode_blob(data: Any, summarizer: Optional[Callable[[Any], Any]] = None) -> Optional[str]:
+        """
+        Serialize a payload/response for storage.
+
+        The summarizer (if enabled) replaces the full data by a compact
+        summary; results longer than EVENT_LOG_COMPRESS_THRESHOLD characters
+        are zlib-compressed and stored as "zlib:<base64>".
+        """
+        if data is None:
+            return None
+        settings = get_settings()
+        text = EventLogger._serialize_data(data)
+        original_bytes = len(text.encode('utf-8'))
+
+        if summarizer is not None and settings.event_log_summarize_responses:
+            try:
+                text = EventLogger._serialize_data(summarizer(data))
+            except Exception as e:
+                logger.warning("event_logger_summary_failed", error=str(e))
+
+        compressed = False
+        threshold = settings.event_log_compress_threshold
+        if threshold and len(text) > threshold:
+            packed = COMPRESSED_PREFIX + base64.b64encode(zlib.compress(text.encode('utf-8'))).decode('ascii')
+            if len(packed) < len(text):
+                text, compressed = packed, True
+
+        with _storage_lock:
+            _storage['blobs'] += 1
+            _storage['compressed'] += int(compressed)
+            _storage['original_bytes'] += original_bytes
+            _storage['stored_bytes'] += len(text.encode('utf-8'))
+        return text
+
+    @staticmethod
+    def storage_stats() -> Dict[str, Any]:
+        """Bytes of payload/response data produced vs. stored since startup."""
+        with _storage_lock:
+            stats = dict(_storage)
+        stats['saved_bytes'] = stats['original_bytes'] - stats['stored_bytes']
+        stats['saved_pct'] = (
+            round(stats['saved_bytes'] / stats['original_bytes'] * 100, 1) if stats['original_bytes'] else 0.0
+        )
+        return stats
+
     @staticmethod
     def stage_start(
         batch_id: int,
@@ -50,8 +123,7 @@ class EventLogger:
             metadata: Additional metadata dictionary
         """
         try:
-            repo = EventLogger._get_repo()
-            repo.insert_event(
+            EventLogger._write(
                 batch_id=batch_id,
                 stage=stage,
                 event_type='stage_start',
@@ -82,9 +154,8 @@ class EventLogger:
             metadata: Additional metadata (durations, stats, etc.)
         """
         try:
-            repo = EventLogger._get_repo()
             status = 'success' if failed_files == 0 else 'failed'
-            repo.insert_event(
+            EventLogger._write(
                 batch_id=batch_id,
                 stage=stage,
                 event_type='stage_complete',
@@ -122,8 +193,7 @@ class EventLogger:
             metadata: Additional metadata
         """
         try:
-            repo = EventLogger._get_repo()
-            repo.insert_event(
+            EventLogger._write(
                 batch_id=batch_id,
                 stage=stage,
                 event_type='stage_progress',
@@ -160,15 +230,14 @@ class EventLogger:
             payload: Request payload sent to processing API
         """
         try:
-            repo = EventLogger._get_repo()
-            repo.insert_event(
+            EventLogger._write(
                 batch_id=batch_id,
                 stage=stage,
                 event_type='file_start',
                 file_name=file_name,
                 gpu_ip=gpu_ip,
                 status='processing',
-                payload=EventLogger._serialize_data(payload)
+                payload=EventLogger._encode_blob(payload)
             )
             logger.debug(
                 "event_logged",
@@ -187,7 +256,8 @@ class EventLogger:
         file_name: str,
         gpu_ip: Optional[str] = None,
         response: Optional[Dict[str, Any]] = None,
-        status: str = 'success'
+        status: str = 'success',
+        summarizer: Optional[Callable[[Any], Any]] = None
     ):
         """
         Log file processing completion event.
@@ -199,17 +269,17 @@ class EventLogger:
             gpu_ip: GPU IP address
             response: Response data from processing API
             status: 'success' or 'failed'
+            summarizer: Turns the response into the compact form that is stored
         """
         try:
-            repo = EventLogger._get_repo()
-            repo.insert_event(
+            EventLogger._write(
                 batch_id=batch_id,
                 stage=stage,
                 event_type='file_complete',
                 file_name=file_name,
                 gpu_ip=gpu_ip,
                 status=status,
-                response=EventLogger._serialize_data(response)
+                response=EventLogger._encode_blob(response, summarizer)
             )
             logger.debug(
                 "event_logged",
@@ -242,8 +312,7 @@ class EventLogger:
             payload: Request payload that was sent
         """
         try:
-            repo = EventLogger._get_repo()
-            repo.insert_event(
+            EventLogger._write(
                 batch_id=batch_id,
                 stage=stage,
                 event_type='error',
@@ -251,7 +320,7 @@ class EventLogger:
                 gpu_ip=gpu_ip,
                 status='failed',
                 error_message=error_message,
-                payload=EventLogger._serialize_data(payload)
+                payload=EventLogger._encode_blob(payload)
             )
             logger.warning(
                 "event_logged",
@@ -280,8 +349,7 @@ class EventLogger:
             metadata: Additional data
         """
         try:
-            repo = EventLogger._get_repo()
-            repo.insert_event(
+            EventLogger._write(
                 batch_id=batch_id,
                 stage=stage,
                 event_type='info',
@@ -0,0 +1,238 @@
+"""Live push of written batchExecutionLog events to the dashboard."""
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+import httpx
+import structlog
+
+from .config import get_settings
+
+logger = structlog.get_logger()
+
+
+def to_log_row(event: Dict[str, Any], event_id: int) -> Dict[str, Any]:
+    """
+    Turn a written event (keyword arguments of insert_event) into a
+    batchExecutionLog-shaped row, as the dashboard reads it from MySQL.
+    """
+    return {
+        'id': event_id,
+        'batchId': event['batch_id'],
+        'stage': event['stage'],
+        'eventType': event['event_type'],
+        'fileName': event.get('file_name'),
+        'gpuIp': event.get('gpu_ip'),
+        'payload': event.get('payload'),
+        'response': event.get('response'),
+        'status': event.get('status', 'processing'),
+        'errorMessage': event.get('error_message'),
+        'totalFiles': event.get('total_files'),
+        'processedFiles': event.get('processed_files'),
+        'metadata': event.get('metadata'),
+        'timestamp': (event.get('timestamp') or datetime.now()).isoformat(timespec='milliseconds')
+    }
+
+
+class EventPublisher(ABC):
+    """
+    Publishes events after they are written to batchExecutionLog.
+
+    Publishing is best effort and must never block or fail the pipeline:
+    MySQL stays the durable store, and the dashboard falls back to reading
+    it for history, reconnects and anything a push did not deliver.
+    """
+
+    @abstractmethod
+    def publish(self, rows: List[Dict[str, Any]]):
+        """Publish batchExecutionLog rows (see to_log_row)."""
+        pass
+
+    def close(self):
+        """Deliver what is still pending and stop."""
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class InProcessEventPublisher(EventPublisher):
+    """
+    In-process stand-in for a broker: hands rows to local subscribers.
+
+    Used when the consumer runs in the same process (and for trying the
+    push path without a dashboard); a failing subscriber is logged and
+    skipped.
+    """
+
+    def __init__(self):
+        self.subscribers: List[Callable[[List[Dict[str, Any]]], None]] = []
+        self.published = 0
+
+    def subscribe(self, callback: Callable[[List[Dict[str, Any]]], None]):
+        """Register a callback receiving each published list of rows."""
+        self.subscribers.append(callback)
+
+    def publish(self, rows: List[Dict[str, Any]]):
+        self.published += len(rows)
+        for callback in list(self.subscribers):
+            try:
+                callback(rows)
+            except Exception as e:
+                logger.error("event_push_subscriber_failed", error=str(e))
+
+    def stats(self) -> Dict[str, Any]:
+        return {'mode': 'memory', 'subscribers': len(self.subscribers), 'published': self.published}
+
+
+class HttpEventPublisher(EventPublisher):
+    """
+    POSTs events to the dashboard's /api/events/push from a background thread.
+
+    publish() only appends to a bounded queue, so the event log writer
+    never waits on HTTP. The sender posts up to `batch_size` rows per
+    request, in ID order. When the dashboard is unreachable the rows are
+    kept and retried after `retry_interval` seconds; beyond `max_queue`
+    the oldest are dropped and their batches are sent as "gaps" with the
+    next request, so the dashboard re-reads them from MySQL.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float = 2.0,
+        token: str = "",
+        batch_size: int = 500,
+        max_queue: int = 10000,
+        retry_interval: float = 5.0
+    ):
+        self.url = url
+        self.timeout = timeout
+        self.batch_size = max(1, batch_size)
+        self.max_queue = max(self.batch_size, max_queue)
+        self.retry_interval = retry_interval
+        self.pushed = 0
+        self.dropped = 0
+        self.failures = 0
+        headers = {"X-Event-Push-Token": token} if token else {}
+        self._client = httpx.Client(timeout=timeout, headers=headers)
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._gaps: Set[int] = set()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="event-push", daemon=True)
+        self._thread.start()
+
+    def publish(self, rows: List[Dict[str, Any]]):
+        with self._cond:
+            self._queue.extend(rows)
+            overflow = len(self._queue) - self.max_queue
+            for _ in range(max(0, overflow)):
+                self._gaps.add(self._queue.popleft()['batchId'])
+            if overflow > 0:
+                self.dropped += overflow
+                logger.warning("event_push_dropped", count=overflow, dropped=self.dropped)
+            self._cond.notify_all()
+
+    def _run(self):
+        """Sender thread: post queued rows, keeping them for a retry on failure."""
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                rows = [self._queue[i] for i in range(min(self.batch_size, len(self._queue)))]
+                gaps = sorted(self._gaps)
+            if self._post(rows, gaps):
+                with self._cond:
+                    self._gaps.difference_update(gaps)
+                    # The queue may have dropped rows meanwhile; only remove those sent
+                    sent = {id(row) for row in rows}
+                    while self._queue and id(self._queue[0]) in sent:
+                        self._queue.popleft()
+                    self.pushed += len(rows)
+                continue
+            with self._cond:
+                if self._closed:
+                    # Nobody to retry for; the rows are in MySQL
+                    self._queue.clear()
+                    return
+                self._cond.wait(self.retry_interval)
+
+    def _post(self, rows: List[Dict[str, Any]], gaps: List[int]) -> bool:
+        try:
+            response = self._client.post(self.url, json={"events": rows, "gaps": gaps})
+            response.raise_for_status()
+            return True
+        except Exception as e:
+            self.failures += 1
+            # Log the first failure and then every 100th while the dashboard is down
+            if self.failures == 1 or self.failures % 100 == 0:
+                logger.warning("event_push_failed", url=self.url, pending=len(self._queue),
+                               failures=self.failures, error=str(e))
+            return False
+
+    def close(self, timeout: Optional[float] = None):
+        """Try to send what is queued (one attempt) and stop the sender thread."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(self.timeout * 2 if timeout is None else timeout)
+        self._client.close()
+        logger.info("event_publisher_closed", pushed=self.pushed, dropped=self.dropped, failures=self.failures)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                'mode': 'http',
+                'url': self.url,
+                'queued': len(self._queue),
+                'pushed': self.pushed,
+                'dropped': self.dropped,
+                'failures': self.failures
+            }
+
+
+# Publisher singleton (None when EVENT_PUSH_MODE is off)
+_publisher: Optional[EventPublisher] = None
+_publisher_started = False
+_publisher_lock = threading.Lock()
+
+
+def get_event_publisher() -> Optional[EventPublisher]:
+    """Get or start the configured event publisher (None if pushing is off)."""
+    global _publisher, _publisher_started
+    with _publisher_lock:
+        if not _publisher_started:
+            settings = get_settings()
+            mode = settings.event_push_mode
+            if mode == "http":
+                if not settings.event_push_token:
+                    logger.warning("event_push_token_missing",
+                                   hint="the dashboard rejects pushes without EVENT_PUSH_TOKEN")
+                _publisher = HttpEventPublisher(
+                    settings.event_push_url,
+                    timeout=settings.event_push_timeout,
+                    token=settings.event_push_token,
+                    max_queue=settings.event_push_max_queue
+                )
+            elif mode == "memory":
+                _publisher = InProcessEventPublisher()
+            elif mode != "off":
+                raise ValueError(f"Unknown event push mode: {mode}")
+            _publisher_started = True
+            if _publisher is not None:
+                logger.info("event_publisher_started", mode=mode)
+        return _publisher
+
+
+def close_event_publisher():
+    """Deliver pending pushes and stop the publisher (no-op if it never started)."""
+    global _publisher, _publisher_started
+    with _publisher_lock:
+        publisher, _publisher, _publisher_started = _publisher, None, False
+    if publisher is not None:
+        publisher.close()
@@ -1,7 +1,8 @@
 """File management for reading batch files and distributing to GPUs."""
 import os
+import wave
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 import pandas as pd
 import structlog
 from dataclasses import dataclass
@@ -76,28 +77,149 @@ class FileManager:
             audio_files=audio_files
         )
     
-    def distribute_files_to_gpus(self, audio_files: List[str]) -> Dict[str, List[str]]:
+    def distribute_files_to_gpus(
+        self,
+        audio_files: List[str],
+        gpu_speeds: Optional[Dict[str, float]] = None
+    ) -> Dict[str, List[str]]:
         """
-        Distribute audio files across GPU machines using round-robin.
+        Distribute audio files across GPU machines.
+        
+        Uses the configured distribution_strategy: 'round_robin' assigns by
+        index, 'lpt' balances estimated processing time per GPU.
         
         Args:
             audio_files: List of audio file paths
+            gpu_speeds: Optional relative throughput per GPU IP (LPT only)
         
         Returns:
             Dict mapping GPU IP to list of file paths assigned to it
         """
         gpu_ips = self.settings.gpu_machine_list
-        distribution: Dict[str, List[str]] = {ip: [] for ip in gpu_ips}
         
-        for i, file_path in enumerate(audio_files):
-            gpu_ip = gpu_ips[i % len(gpu_ips)]
-            distribution[gpu_ip].append(file_path)
+        if self.settings.distribution_strategy == "lpt" and len(gpu_ips) > 1:
+            distribution = self._distribute_lpt(audio_files, gpu_ips, gpu_speeds or {})
+        else:
+            distribution = {ip: [] for ip in gpu_ips}
+            for i, file_path in enumerate(audio_files):
+                gpu_ip = gpu_ips[i % len(gpu_ips)]
+                distribution[gpu_ip].append(file_path)
         
         for gpu_ip, files in distribution.items():
             logger.info("files_distributed", gpu=gpu_ip, count=len(files))
         
         return distribution
     
+    def get_relative_gpu_speeds(self, log_repo) -> Dict[str, float]:
+        """
+        Relative GPU speeds from STT throughput in recent batches.
+        
+        Args:
+            log_repo: BatchExecutionLogRepo used to read past file_complete events
+        
+        Returns:
+            Dict mapping GPU IP to speed relative to the measured average
+            (empty if disabled or no history)
+        """
+        if not self.settings.distribution_use_gpu_throughput:
+            return {}
+        try:
+            throughput = log_repo.get_gpu_throughput("stt", self.settings.distribution_throughput_lookback)
+        except Exception as e:
+            logger.warning("gpu_throughput_unavailable", error=str(e))
+            return {}
+        
+        measured = {ip: rate for ip, rate in throughput.items() if ip in self.settings.gpu_machine_list and rate > 0}
+        if not measured:
+            return {}
+        average = sum(measured.values()) / len(measured)
+        speeds = {ip: rate / average for ip, rate in measured.items()}
+        logger.info("gpu_throughput_loaded", speeds=speeds)
+        return speeds
+    
+    def _distribute_lpt(
+        self,
+        audio_files: List[str],
+        gpu_ips: List[str],
+        gpu_speeds: Dict[str, float]
+    ) -> Dict[str, List[str]]:
+        """
+        Longest-processing-time-first bin packing.
+        
+        Files are sorted by estimated cost (largest first) and each one goes
+        to the GPU that would finish it earliest, given the work already
+        assigned and that GPU's relative speed.
+        """
+        weights = self.estimate_file_weights(audio_files)
+        speeds = {ip: gpu_speeds.get(ip) or 1.0 for ip in gpu_ips}
+        
+        distribution: Dict[str, List[str]] = {ip: [] for ip in gpu_ips}
+        load: Dict[str, float] = {ip: 0.0 for ip in gpu_ips}
+        
+        for file_path in sorted(audio_files, key=lambda f: weights[f], reverse=True):
+            weight = weights[file_path]
+            gpu_ip = min(gpu_ips, key=lambda ip: (load[ip] + weight) / speeds[ip])
+            distribution[gpu_ip].append(file_path)
+            load[gpu_ip] += weight
+        
+        logger.info(
+            "lpt_distribution",
+            estimated_seconds={ip: round(load[ip] / speeds[ip], 1) for ip in gpu_ips},
+            speeds=speeds
+        )
+        return distribution
+    
+    def estimate_file_weights(self, audio_files: List[str]) -> Dict[str, float]:
+        """
+        Estimate relative processing cost of each file.
+        
+        Uses the WAV header duration when readable. Other files are weighted
+        by size, converted to seconds with the average bytes-per-second of
+        the WAV files in the batch (or left in bytes if there are none).
+        
+        Returns:
+            Dict mapping file path to weight
+        """
+        durations: Dict[str, float] = {}
+        sizes: Dict[str, int] = {}
+        
+        for file_path in audio_files:
+            try:
+                sizes[file_path] = os.path.getsize(file_path)
+            except OSError:
+                sizes[file_path] = 0
+            duration = self.get_wav_duration(file_path)
+            if duration:
+                durations[file_path] = duration
+        
+        known_bytes = sum(sizes[f] for f in durations)
+        known_seconds = sum(durations.values())
+        bytes_per_second = known_bytes / known_seconds if known_bytes and known_seconds else None
+        
+        weights: Dict[str, float] = {}
+        for file_path in audio_files:
+            if file_path in durations:
+                weights[file_path] = durations[file_path]
+            elif bytes_per_second:
+                weights[file_path] = sizes[file_path] / bytes_per_second
+            else:
+                weights[file_path] = float(sizes[file_path])
+        
+        logger.info("file_weights_estimated", files=len(audio_files), with_duration=len(durations))
+        return weights
+    
+    @staticmethod
+    def get_wav_duration(file_path: str) -> Optional[float]:
+        """Read audio duration in seconds from a WAV header, or None if not a readable WAV."""
+        if not file_path.lower().endswith(".wav"):
+            return None
+        try:
+            with wave.open(file_path, "rb") as wav:
+                rate = wav.getframerate()
+                return wav.getnframes() / rate if rate else None
+        except (wave.Error, EOFError, OSError):
+            return None
+    
     def get_file_name(self, file_path: str) -> str:
         """Extract file name from path."""
         return os.path.basename(file_path)
@@ -0,0 +1,202 @@
+"""Per-GPU bounded work queues for dispatching files to GPU processing APIs."""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+import structlog
+
+logger = structlog.get_logger()
+
+# Queue sentinel telling a worker to exit
+_CLOSED = object()
+
+
+class AimdLimiter:
+    """
+    Concurrency limit using additive-increase / multiplicative-decrease.
+
+    The limit grows by one after a full window of fast successful requests
+    and is halved on an error or a request slower than the latency target.
+    With adaptive mode disabled the limit stays fixed at its initial value.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int = 1,
+        maximum: int = 16,
+        latency_target: float = 120.0,
+        adaptive: bool = False
+    ):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum if adaptive else initial)
+        self.limit = min(max(initial, self.minimum), self.maximum)
+        self.latency_target = latency_target
+        self.adaptive = adaptive
+        self._credit = 0.0
+        self._last_decrease = 0.0
+
+    def on_success(self, latency: float):
+        """Record a successful request and its latency."""
+        if not self.adaptive:
+            return
+        if latency > self.latency_target:
+            self._decrease()
+            return
+        self._credit += 1.0 / self.limit
+        if self._credit >= 1.0 and self.limit < self.maximum:
+            self.limit += 1
+            self._credit = 0.0
+
+    def on_error(self):
+        """Record a failed request."""
+        if self.adaptive:
+            self._decrease()
+
+    def _decrease(self):
+        # At most one decrease per latency window, so a burst of failures
+        # from the same in-flight window only halves the limit once
+        now = time.monotonic()
+        if now - self._last_decrease < self.latency_target:
+            return
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit // 2)
+        self._credit = 0.0
+
+
+class GpuWorkQueue:
+    """
+    Bounded work queue and worker pool for a single GPU.
+
+    Items wait in the queue until a worker slot is free, so no more than
+    the limiter's current limit of requests is ever in flight to the GPU.
+    Items can be added while the queue runs (retries); the workers exit
+    once the owner calls close().
+    """
+
+    def __init__(
+        self,
+        gpu_ip: str,
+        handler: Callable[[str, Any], Awaitable[Any]],
+        limiter: AimdLimiter
+    ):
+        self.gpu_ip = gpu_ip
+        self.handler = handler
+        self.limiter = limiter
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.closed = False
+        self._total_latency = 0.0
+        self._waiting = 0
+        self._workers: List[asyncio.Task] = []
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._slots = asyncio.Condition()
+
+    def put(self, item: Any):
+        """Enqueue one item for this GPU."""
+        self._queue.put_nowait(item)
+
+    def put_many(self, items: List[Any]):
+        """Enqueue items for this GPU."""
+        for item in items:
+            self._queue.put_nowait(item)
+
+    def close(self):
+        """Let the workers exit once they finish their current item."""
+        if self.closed:
+            return
+        self.closed = True
+        for _ in range(max(len(self._workers), 1)):
+            self._queue.put_nowait(_CLOSED)
+
+    @property
+    def queued(self) -> int:
+        """Number of items waiting for a worker slot."""
+        # Once closed the queue holds only exit sentinels
+        return self._waiting if self.closed else self._queue.qsize() + self._waiting
+
+    @property
+    def load(self) -> int:
+        """Queued plus in-flight items."""
+        return self.queued + self.in_flight
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, in-flight count and outcome counters for this GPU."""
+        done = self.completed + self.failed
+        return {
+            'queued': self.queued,
+            'in_flight': self.in_flight,
+            'limit': self.limiter.limit,
+            'completed': self.completed,
+            'failed': self.failed,
+            'avg_latency': round(self._total_latency / done, 2) if done else None
+        }
+
+    async def _acquire_slot(self):
+        async with self._slots:
+            await self._slots.wait_for(lambda: self.in_flight < self.limiter.limit)
+            self.in_flight += 1
+
+    async def _release_slot(self):
+        async with self._slots:
+            self.in_flight -= 1
+            self._slots.notify_all()
+
+    async def _worker(self, on_result: Callable[[str, Any, Any], Awaitable[None]]):
+        while True:
+            item = await self._queue.get()
+            if item is _CLOSED:
+                return
+
+            self._waiting += 1
+            try:
+                await self._acquire_slot()
+            finally:
+                self._waiting -= 1
+
+            started = time.monotonic()
+            try:
+                result = await self.handler(self.gpu_ip, item)
+            except Exception as e:
+                result = e
+            latency = time.monotonic() - started
+            self._total_latency += latency
+
+            if isinstance(result, Exception):
+                self.failed += 1
+                self.limiter.on_error()
+            else:
+                self.completed += 1
+                self.limiter.on_success(latency)
+            await self._release_slot()
+
+            # Called without holding a slot, so slow persistence or a retry
+            # decision never blocks other requests to this GPU
+            await on_result(self.gpu_ip, item, result)
+
+    async def run(self, on_result: Callable[[str, Any, Any], Awaitable[None]]):
+        """Process items with up to limiter.maximum workers until close() is called."""
+        self._workers = [
+            asyncio.create_task(self._worker(on_result))
+            for _ in range(self.limiter.maximum)
+        ]
+        if self.closed:
+            # Closed before the workers existed: make sure each one sees a sentinel
+            for _ in range(len(self._workers)):
+                self._queue.put_nowait(_CLOSED)
+        try:
+            await asyncio.gather(*self._workers)
+        finally:
+            for worker in self._workers:
+                worker.cancel()
+
+
+async def log_queue_stats(queues: Dict[str, GpuWorkQueue], interval: float, label: str = ""):
+    """Periodically log per-GPU queue saturation until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        logger.info(
+            "gpu_queue_stats",
+            endpoint=label,
+            gpus={ip: queue.stats() for ip, queue in queues.items()}
+        )
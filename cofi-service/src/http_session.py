@@ -0,0 +1,71 @@
+"""Shared aiohttp session with keep-alive connection pooling."""
+import asyncio
+from typing import Optional
+import aiohttp
+import structlog
+
+from .config import get_settings
+
+logger = structlog.get_logger()
+
+
+class HttpSessionManager:
+    """
+    Owns one aiohttp.ClientSession for the whole process.
+
+    The session's connector keeps a keep-alive pool per host (GPU mediators,
+    NLP APIs) with a per-host connection cap and cached DNS lookups, so the
+    tens of thousands of calls in a batch reuse connections instead of doing
+    a TCP handshake each.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """Get the shared session, creating it on first use in the running loop."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.settings.http_pool_limit,
+                limit_per_host=self.settings.http_pool_limit_per_host,
+                use_dns_cache=True,
+                ttl_dns_cache=self.settings.http_dns_cache_ttl,
+                keepalive_timeout=self.settings.http_keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._loop = loop
+            logger.info(
+                "http_session_created",
+                limit=self.settings.http_pool_limit,
+                limit_per_host=self.settings.http_pool_limit_per_host
+            )
+        return self._session
+
+    async def close(self):
+        """Close the shared session and its pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("http_session_closed")
+        self._session = None
+        self._loop = None
+
+
+# Session manager singleton
+_manager: Optional[HttpSessionManager] = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Get the process-wide pooled HTTP session."""
+    global _manager
+    if _manager is None:
+        _manager = HttpSessionManager()
+    return _manager.get_session()
+
+
+async def close_http_sessions():
+    """Close the pooled HTTP session (call on shutdown)."""
+    if _manager is not None:
+        await _manager.close()
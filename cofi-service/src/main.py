@@ -2,21 +2,30 @@
 import asyncio
 import structlog
 import time
+from functools import partial
+from typing import Dict, List, Optional
 
 from .config import get_settings
-from .database import get_database, BatchStatusRepo, FileDistributionRepo, LidStatusRepo, CallRepo, LanguageRepo, ProcessRepo
+from .database import get_database, BatchStatusRepo, FileDistributionRepo, FileStateRepo, LidStatusRepo, CallRepo, LanguageRepo, ProcessRepo, BatchExecutionLogRepo
 from .file_manager import FileManager
 from .metadata_manager import MetadataManager
 from .rule_engine import RuleEngineStep1
 from .rule_engine_step2 import process_rule_engine
 from .mediator_client import MediatorClient
+from .http_session import close_http_sessions
+from .container_planner import get_container_planner
+from .distribution_writer import DistributionRecordWriter
+from .query_plan import verify_query_plans
+from .scheduler import StageScheduler, StageNode, RESOURCE_GPU, RESOURCE_CPU, RESOURCE_DB
 from .pipeline.denoise_stage import DenoiseStage
 from .pipeline.ivr_stage import IVRStage
 from .pipeline.lid_stage import LIDStage
 from .pipeline.stt_stage import STTStage
+from .pipeline.partitioned import PartitionedLidStt
 from .pipeline.llm1_stage import LLM1Stage
 from .pipeline.llm2_stage import LLM2Stage
 from .event_logger import EventLogger
+from .event_log_writer import close_event_log_writer
 
 # Configure structured logging
 structlog.configure(
@@ -31,6 +40,9 @@ logger = structlog.get_logger()
 class CofiOrchestrator:
     """Main orchestrator for the audio processing pipeline."""
     
+    # Batch statuses that triaging (running alongside STT) must not overwrite
+    STATUSES_AFTER_TRIAGING = ["sttDone", "llm1Done", "llm2Done", "Completed"]
+    
     def __init__(self):
         self.settings = get_settings()
         self.db = get_database()
@@ -44,6 +56,7 @@ class CofiOrchestrator:
         self.call_repo = CallRepo(self.db)
         self.language_repo = LanguageRepo(self.db)
         self.process_repo = ProcessRepo(self.db)
+        self.log_repo = BatchExecutionLogRepo(self.db)
         self.metadata_manager = MetadataManager()
         self.rule_engine = RuleEngineStep1()
     
@@ -86,63 +99,72 @@ class CofiOrchestrator:
         self.batch_repo.update_db_insertion_status(batch_id, "InProgress")
         self.batch_repo.set_stage_start_time(batch_id, "file_distribution")
 
-        # Check if files already distributed (partial resume)
-        existing = self.file_dist_repo.get_by_batch(batch_id)
+        # Read batch files
+        batch_files = self.file_manager.read_batch_files()
+
+        # Partial resume: files are recorded in buffered chunks after their
+        # upload, so a crash can leave uploaded files without rows. Re-upload
+        # and record only those; files with rows are already distributed.
+        existing = {record['file'] for record in self.file_dist_repo.get_by_batch(batch_id)}
+        audio_files = [
+            file_path for file_path in batch_files.audio_files
+            if self.file_manager.get_file_name(file_path) not in existing
+        ]
 
         if existing:
-            logger.info("files_already_distributed", batch_id=batch_id, count=len(existing))
+            logger.info("files_already_distributed", batch_id=batch_id, count=len(existing), remaining=len(audio_files))
+        if existing and not audio_files:
             self.batch_repo.update_db_insertion_status(batch_id, "Complete")
             self.batch_repo.set_stage_end_time(batch_id, "file_distribution")
             return False
 
-        # Read batch files
-        batch_files = self.file_manager.read_batch_files()
-
         # Log stage start
-        EventLogger.stage_start(batch_id, 'file_distribution', total_files=len(batch_files.audio_files))
+        EventLogger.stage_start(batch_id, 'file_distribution', total_files=len(audio_files))
 
         # Distribute to GPUs
-        distribution = self.file_manager.distribute_files_to_gpus(batch_files.audio_files)
+        distribution = self.file_manager.distribute_files_to_gpus(
+            audio_files,
+            gpu_speeds=self.file_manager.get_relative_gpu_speeds(self.log_repo)
+        )
 
         # Get audit form ID once (used for all calls)
         audit_form_id = self.process_repo.get_audit_form_id(self.settings.process_id)
 
-        # Upload files to GPUs in parallel
+        # fileDistribution and call rows are buffered and written in bulk
+        # (one transaction per chunk) on the DB thread pool as uploads finish
+        writer = DistributionRecordWriter(
+            self.file_dist_repo,
+            batch_id,
+            process_id=self.settings.process_id,
+            category_mapping_id=self.settings.category_mapping_id,
+            audio_endpoint=self.settings.audio_endpoint,
+            audit_form_id=audit_form_id
+        )
+
         async def upload_and_record(gpu_ip: str, file_path: str):
-            """Upload a single file and create records."""
+            """Upload a single file and queue its records."""
             file_name = self.file_manager.get_file_name(file_path)
 
             try:
                 # Upload file to GPU
-                EventLogger.file_start(batch_id, 'file_distribution', file_name, gpu_ip)
+                await self.db.run(EventLogger.file_start, batch_id, 'file_distribution', file_name, gpu_ip)
                 await self.mediator.upload_file(gpu_ip, file_path, file_name)
-                EventLogger.file_complete(batch_id, 'file_distribution', file_name, gpu_ip,
-                                        response={'uploaded': True, 'size': 'N/A'}, status='success')
-
-                # Create file distribution record
-                self.file_dist_repo.insert(file_name, gpu_ip, batch_id)
-
-                # Create call record (language info will be updated after LID stage)
-                try:
-                    self.call_repo.insert_from_distribution(
-                        audio_name=file_name,
-                        batch_id=batch_id,
-                        ip=gpu_ip,
-                        process_id=self.settings.process_id,
-                        category_mapping_id=self.settings.category_mapping_id,
-                        audio_endpoint=self.settings.audio_endpoint,
-                        audit_form_id=audit_form_id
-                    )
-                    logger.info("call_record_created", file=file_name, batch_id=batch_id)
-                except Exception as e:
-                    logger.error("call_record_creation_failed", file=file_name, error=str(e))
-
-                return True, file_name
+                await self.db.run(EventLogger.file_complete, batch_id, 'file_distribution', file_name, gpu_ip,
+                                  response={'uploaded': True, 'size': 'N/A'}, status='success')
             except Exception as e:
                 logger.error("file_upload_failed", file=file_name, gpu=gpu_ip, error=str(e))
-                EventLogger.file_error(batch_id, 'file_distribution', file_name, str(e), gpu_ip)
+                await self.db.run(EventLogger.file_error, batch_id, 'file_distribution', file_name, str(e), gpu_ip)
                 return False, file_name
 
+            # Queue file distribution + call records (language info will be
+            # updated after LID stage). A failed flush keeps the rows buffered
+            # for the next one.
+            try:
+                await self.db.run(writer.add, file_name, gpu_ip)
+            except Exception as e:
+                logger.error("distribution_flush_failed", file=file_name, error=str(e))
+            return True, file_name
+
         # Create upload tasks for all files across all GPUs
         upload_tasks = []
         for gpu_ip, file_paths in distribution.items():
@@ -152,7 +174,12 @@ class CofiOrchestrator:
 
         # Execute all uploads in parallel
         logger.info("uploading_files_parallel", total_tasks=len(upload_tasks))
-        results = await asyncio.gather(*upload_tasks, return_exceptions=False)
+        try:
+            results = await asyncio.gather(*upload_tasks, return_exceptions=False)
+        finally:
+            # Rows of every uploaded file must be written before the stage
+            # is marked complete; if this raises, resume re-uploads them
+            await self.db.run(writer.flush)
 
         # Count successes and failures
         uploaded_count = sum(1 for success, _ in results if success)
@@ -173,38 +200,56 @@ class CofiOrchestrator:
         """Update Call records with language info from LID results."""
         EventLogger.info(batch_id, 'lid', 'Updating call records with LID results')
 
-        lid_records = self.lid_repo.get_by_batch(batch_id)
-
-        updated_count = 0
-        for record in lid_records:
-            # Get language ID
-            lang_code = record.get('language', 'unknown')
-            lang_record = self.language_repo.get_by_code(lang_code)
-            language_id = lang_record['id'] if lang_record else None
-
-            # Update existing call record with language info and duration
-            try:
-                self.call_repo.update_lid_info(
-                    audio_name=record['file'],
-                    batch_id=batch_id,
-                    language_id=language_id,
-                    lang_code=lang_code,
-                    audio_duration=record.get('duration', 0)
-                )
-                updated_count += 1
-            except Exception as e:
-                logger.error("call_lid_update_failed", file=record['file'], error=str(e))
+        # Single join-update; only calls whose LID values changed are written
+        updated_count = self.call_repo.update_lid_info_for_batch(batch_id)
 
         EventLogger.info(batch_id, 'lid', f'Updated {updated_count} call records with LID data',
                         metadata={'updated': updated_count})
         logger.info("calls_updated_from_lid", count=updated_count)
     
+    def next_gpu_container(self, batch: Dict, after_stage: str) -> Optional[str]:
+        """
+        Container of the next GPU stage that will actually run after a stage.
+
+        Used to pre-start that container on each GPU as soon as it drains.
+        The LLM stages call the NLP APIs and start no container, so STT has
+        no successor (its container is stopped by the LLM1 stage as before).
+
+        Args:
+            batch: Batch record (stage status columns)
+            after_stage: Stage name ('ivr', 'lid' or 'stt')
+
+        Returns:
+            Container name, or None if no later stage needs a GPU container
+        """
+        stages = [
+            ('ivr', self.settings.ivr_container,
+             self.settings.ivr_enabled and batch.get('ivrStatus') != 'Complete'),
+            ('lid', self.settings.lid_container, batch.get('lidStatus') != 'Complete'),
+            ('stt', self.settings.stt_container, batch.get('sttStatus') != 'Complete'),
+        ]
+        names = [name for name, _, _ in stages]
+        for _, container, pending in stages[names.index(after_stage) + 1:]:
+            if pending:
+                return container
+        return None
+    
     def update_batch_status(self, batch_id: int, status: str):
         """Update batch status."""
         self.batch_repo.update_status(batch_id, status)
         logger.info("batch_status_updated", batch_id=batch_id, status=status)
     
     async def run(self):
+        """Run the complete pipeline, releasing shared resources on exit."""
+        if self.settings.verify_query_plans:
+            await self.db.run(verify_query_plans, self.db)
+        try:
+            await self._run_pipeline()
+        finally:
+            await close_http_sessions()
+            await self.db.run(close_event_log_writer)
+    
+    async def _run_pipeline(self):
         """Run the complete pipeline with resume support."""
         logger.info("cofi_service_starting", batch_date=self.settings.batch_date)
         
@@ -212,216 +257,348 @@ class CofiOrchestrator:
         batch = self.get_or_create_batch()
         batch_id = batch['id']
         self.batch_repo.set_batch_start_time(batch_id)
+        if self.settings.file_state_enabled:
+            # Batches distributed before fileState was enabled
+            FileStateRepo(self.db).sync_batch(batch_id)
+        self._previous_container: Optional[str] = None
         
-        # 2. File Distribution Stage
-        if batch.get('dbInsertionStatus') != 'Complete':
-            await self.distribute_files(batch)
-        else:
-            logger.info("file_distribution_skipped")
-        
-        # 3. Process callMetadata CSV (optional)
-        if self.settings.callmetadata_enabled:
-            if not self.metadata_manager.is_call_metadata_processed(batch_id):
-                self.batch_repo.set_stage_start_time(batch_id, "callmetadata")
-                try:
-                    EventLogger.stage_start(batch_id, 'callmetadata')
-                    count = self.metadata_manager.process_call_metadata_csv(batch_id)
-                    self.batch_repo.update_callmetadata_status(batch_id, 1)
-                    EventLogger.stage_complete(batch_id, 'callmetadata', count, 0, metadata={'records': count})
-                    logger.info("callmetadata_processed", count=count)
-                except Exception as e:
-                    logger.error("callmetadata_failed", error=str(e))
-                    EventLogger.file_error(batch_id, 'callmetadata', 'callMetadata.csv', str(e))
-                finally:
-                    self.batch_repo.set_stage_end_time(batch_id, "callmetadata")
-            else:
-                logger.info("callmetadata_already_processed")
-        else:
-            logger.info("callmetadata_stage_skipped")
-
-        # 4. Process tradeMetadata CSV (optional)
-        if self.settings.trademetadata_enabled:
-            if not self.metadata_manager.is_trade_metadata_processed(batch_id):
-                self.batch_repo.set_stage_start_time(batch_id, "trademetadata")
-                try:
-                    EventLogger.stage_start(batch_id, 'trademetadata')
-                    count = self.metadata_manager.process_trade_metadata_csv(batch_id)
-                    self.batch_repo.update_trademetadata_status(batch_id, 1)
-                    EventLogger.stage_complete(batch_id, 'trademetadata', count, 0, metadata={'records': count})
-                    logger.info("trademetadata_processed", count=count)
-                except Exception as e:
-                    logger.error("trademetadata_failed", error=str(e))
-                    EventLogger.file_error(batch_id, 'trademetadata', 'tradeMetadata.csv', str(e))
-                finally:
-                    self.batch_repo.set_stage_end_time(batch_id, "trademetadata")
-            else:
-                logger.info("trademetadata_already_processed")
-        else:
-            logger.info("trademetadata_stage_skipped")
+        # 2. Run the stage graph; each stage starts as soon as its
+        # dependencies are done, and is skipped if its resume status says so
+        scheduler = StageScheduler(
+            self.build_stage_graph(batch),
+            max_workers=self.settings.stage_executor_workers
+        )
+        await scheduler.run()
         
-        # 5. Run pipeline stages
-        previous_container = None
+        # Mark batch complete
+        self.update_batch_status(batch_id, "Completed")
+        self.batch_repo.set_batch_end_time(batch_id)
         
-        # Stage: Denoise (optional)
-        if self.settings.denoise_enabled:
-            if batch.get('denoiseStatus') != 'Complete':
-                self.batch_repo.update_denoise_status(batch_id, "InProgress")
-                self.batch_repo.set_stage_start_time(batch_id, "denoise")
-                denoise_stage = DenoiseStage()
-                await denoise_stage.execute(batch_id, previous_container)
-                self.batch_repo.update_denoise_status(batch_id, "Complete")
-                self.batch_repo.set_stage_end_time(batch_id, "denoise")
-                self.update_batch_status(batch_id, "denoiseDone")
-            else:
-                logger.info("denoise_stage_already_complete")
-        else:
-            logger.info("denoise_stage_skipped")
+        logger.info("pipeline_completed", batch_id=batch_id)
+    
+    def build_stage_graph(self, batch: dict) -> List[StageNode]:
+        """
+        Declare pipeline stages with their dependencies and resource class.
         
-        # Stage: IVR (optional)
-        if self.settings.ivr_enabled:
-            if batch.get('ivrStatus') != 'Complete':
-                self.batch_repo.update_ivr_status(batch_id, "InProgress")
-                self.batch_repo.set_stage_start_time(batch_id, "ivr")
-                ivr_stage = IVRStage()
-                await ivr_stage.execute(batch_id, previous_container)
-                self.batch_repo.update_ivr_status(batch_id, "Complete")
-                self.batch_repo.set_stage_end_time(batch_id, "ivr")
-                self.update_batch_status(batch_id, "ivrDone")
-                previous_container = self.settings.ivr_container
-            else:
-                logger.info("ivr_stage_already_complete")
-        else:
-            logger.info("ivr_stage_skipped")
+        GPU stages form a chain (denoise -> IVR -> LID -> STT -> LLM1 -> LLM2)
+        and run one at a time. CSV ingestion has no dependencies and runs in
+        the executor alongside GPU work; Rule Engine Step 1 only waits for the
+        LID call update and the metadata, so it overlaps STT. In partitioned
+        GPU pool mode the LID node may run LID and STT at once (decided when
+        it starts, after file distribution); the STT node is then skipped.
         
-        # Stage: LID
-        if batch.get('lidStatus') != 'Complete':
-            self.batch_repo.update_lid_status(batch_id, "InProgress")
-            self.batch_repo.set_stage_start_time(batch_id, "lid")
-            lid_stage = LIDStage()
-            await lid_stage.execute(batch_id, previous_container)
-            self.batch_repo.update_lid_status(batch_id, "Complete")
-            self.batch_repo.set_stage_end_time(batch_id, "lid")
-            self.update_batch_status(batch_id, "lidDone")
-            previous_container = self.settings.lid_container
-        else:
-            logger.info("lid_stage_already_complete")
+        Args:
+            batch: Batch record (resume status columns)
         
-        # Update Call records with LID results (language and duration)
-        self.update_calls_from_lid(batch_id)
+        Returns:
+            List of stage nodes
+        """
+        batch_id = batch['id']
+        settings = self.settings
         
-        # Stage: Rule Engine Step 1 - Trade to Audio Mapping (optional)
-        if self.settings.rule_engine_enabled:
-            if batch.get('triagingStatus') != 'Complete':
-                self.batch_repo.update_triaging_status(batch_id, "InProgress")
-                self.batch_repo.set_stage_start_time(batch_id, "triaging")
-                try:
-                    EventLogger.stage_start(batch_id, 'triaging', metadata={'step': 1, 'description': 'Trade to audio mapping'})
-                    count = self.rule_engine.process(batch_id)
-
-                    # Fill auditAnswer for calls without trade data
-                    no_trade_count = self.rule_engine.fill_audio_not_found(batch_id)
-                    logger.info("audio_not_found_filled", count=no_trade_count)
-
-                    self.batch_repo.update_triaging_status(batch_id, "Complete")
-                    self.update_batch_status(batch_id, "triagingDone")
-                    EventLogger.stage_complete(batch_id, 'triaging', count, 0, metadata={
-                        'mappings': count,
-                        'no_trade_count': no_trade_count
-                    })
-                    logger.info("rule_engine_step1_done", mappings=count)
-                except Exception as e:
-                    logger.error("rule_engine_failed", error=str(e))
-                    EventLogger.file_error(batch_id, 'triaging', 'rule_engine_step1', str(e))
-                finally:
-                    self.batch_repo.set_stage_end_time(batch_id, "triaging")
-            else:
-                logger.info("rule_engine_already_complete")
-        else:
-            logger.info("rule_engine_stage_skipped")
         
-        # Stage: STT
-        if batch.get('sttStatus') != 'Complete':
-            self.batch_repo.update_stt_status(batch_id, "InProgress")
-            self.batch_repo.set_stage_start_time(batch_id, "stt")
-            stt_stage = STTStage()
-            await stt_stage.execute(batch_id, previous_container)
-            self.batch_repo.update_stt_status(batch_id, "Complete")
-            self.batch_repo.set_stage_end_time(batch_id, "stt")
-            self.update_batch_status(batch_id, "sttDone")
-            previous_container = self.settings.stt_container
-        else:
-            logger.info("stt_stage_already_complete")
+        return [
+            StageNode(
+                name="file_distribution",
+                run=partial(self.distribute_files, batch),
+                resource=RESOURCE_GPU,
+                is_complete=lambda: batch.get('dbInsertionStatus') == 'Complete'
+            ),
+            StageNode(
+                name="callmetadata",
+                run=partial(self.run_callmetadata_stage, batch_id),
+                resource=RESOURCE_DB,
+                enabled=settings.callmetadata_enabled,
+                is_complete=lambda: self.metadata_manager.is_call_metadata_processed(batch_id)
+            ),
+            StageNode(
+                name="trademetadata",
+                run=partial(self.run_trademetadata_stage, batch_id),
+                resource=RESOURCE_DB,
+                enabled=settings.trademetadata_enabled,
+                is_complete=lambda: self.metadata_manager.is_trade_metadata_processed(batch_id)
+            ),
+            StageNode(
+                name="denoise",
+                run=partial(self.run_denoise_stage, batch_id),
+                deps=["file_distribution"],
+                resource=RESOURCE_GPU,
+                enabled=settings.denoise_enabled,
+                is_complete=lambda: batch.get('denoiseStatus') == 'Complete'
+            ),
+            StageNode(
+                name="ivr",
+                run=partial(self.run_ivr_stage, batch_id, batch),
+                deps=["denoise"],
+                resource=RESOURCE_GPU,
+                enabled=settings.ivr_enabled,
+                is_complete=lambda: batch.get('ivrStatus') == 'Complete'
+            ),
+            StageNode(
+                name="lid",
+                run=partial(self.run_lid_or_partitioned, batch_id, batch),
+                deps=["ivr"],
+                resource=RESOURCE_GPU,
+                is_complete=lambda: batch.get('lidStatus') == 'Complete'
+            ),
+            StageNode(
+                # Update Call records with LID results (language and duration)
+                name="lid_update",
+                run=partial(self.update_calls_from_lid, batch_id),
+                deps=["lid"],
+                resource=RESOURCE_DB
+            ),
+            StageNode(
+                name="triaging",
+                run=partial(self.run_rule_engine_step1, batch_id),
+                deps=["lid_update", "callmetadata", "trademetadata"],
+                resource=RESOURCE_CPU,
+                enabled=settings.rule_engine_enabled,
+                is_complete=lambda: batch.get('triagingStatus') == 'Complete'
+            ),
+            StageNode(
+                # Skipped when the LID node already ran STT on partitioned pools
+                name="stt",
+                run=partial(self.run_stt_stage, batch_id, batch),
+                deps=["lid_update"],
+                resource=RESOURCE_GPU,
+                is_complete=lambda: batch.get('sttStatus') == 'Complete'
+            ),
+            StageNode(
+                # LLM1 reads tradeAudioMapping, written by Rule Engine Step 1
+                name="llm1",
+                run=partial(self.run_llm1_stage, batch_id),
+                deps=["stt", "triaging"],
+                resource=RESOURCE_GPU,
+                enabled=settings.llm1_enabled,
+                is_complete=lambda: batch.get('llm1Status') == 'Complete'
+            ),
+            StageNode(
+                name="llm2",
+                run=partial(self.run_llm2_stage, batch_id),
+                deps=["llm1"],
+                resource=RESOURCE_GPU,
+                enabled=settings.llm2_enabled,
+                is_complete=lambda: batch.get('llm2Status') == 'Complete'
+            ),
+            StageNode(
+                name="release_containers",
+                run=self.release_containers,
+                deps=["llm2"],
+                resource=RESOURCE_GPU
+            ),
+            StageNode(
+                name="triaging_step2",
+                run=partial(self.run_rule_engine_step2, batch_id),
+                deps=["llm2", "triaging"],
+                resource=RESOURCE_CPU,
+                enabled=settings.rule_engine_enabled,
+                is_complete=lambda: batch.get('triagingStep2Status') == 'Complete'
+            ),
+        ]
+    
+    def use_partitioned_pools(self, batch: dict) -> bool:
+        """
+        Whether LID and STT run concurrently on separate GPU pools.
         
-        # Stage: LLM1 (optional)
-        if self.settings.llm1_enabled:
-            if batch.get('llm1Status') != 'Complete':
-                self.batch_repo.update_llm1_status(batch_id, "InProgress")
-                self.batch_repo.set_stage_start_time(batch_id, "llm1")
-                llm1_stage = LLM1Stage()
-                await llm1_stage.execute(batch_id, previous_container)
-                self.batch_repo.update_llm1_status(batch_id, "Complete")
-                self.batch_repo.set_stage_end_time(batch_id, "llm1")
-                self.update_batch_status(batch_id, "llm1Done")
-            else:
-                logger.info("llm1_stage_already_complete")
-        else:
-            logger.info("llm1_stage_skipped")
+        Needs GPU_POOL_MODE=partitioned, at least two GPUs, LID not yet
+        complete and enough pending files to be worth splitting the GPUs.
+        Only meaningful once file distribution has run (see run_lid_or_partitioned).
+        """
+        if self.settings.gpu_pool_mode != "partitioned":
+            return False
+        if len(self.settings.gpu_machine_list) < 2:
+            logger.warning("gpu_partitioning_disabled", reason="needs at least 2 GPUs")
+            return False
+        if batch.get('lidStatus') == 'Complete' or batch.get('sttStatus') == 'Complete':
+            return False
+        pending = self.file_dist_repo.count_stage_pending(batch['id'], 'lidDone')
+        if pending < self.settings.partition_min_files:
+            logger.info("gpu_partitioning_skipped", pending_files=pending,
+                        min_files=self.settings.partition_min_files)
+            return False
+        return True
+    
+    def run_callmetadata_stage(self, batch_id: int):
+        """Process callMetadata CSV."""
+        self.batch_repo.set_stage_start_time(batch_id, "callmetadata")
+        try:
+            EventLogger.stage_start(batch_id, 'callmetadata')
+            count = self.metadata_manager.process_call_metadata_csv(batch_id)
+            self.batch_repo.update_callmetadata_status(batch_id, 1)
+            EventLogger.stage_complete(batch_id, 'callmetadata', count, 0, metadata={'records': count})
+            logger.info("callmetadata_processed", count=count)
+        except Exception as e:
+            logger.error("callmetadata_failed", error=str(e))
+            EventLogger.file_error(batch_id, 'callmetadata', 'callMetadata.csv', str(e))
+        finally:
+            self.batch_repo.set_stage_end_time(batch_id, "callmetadata")
+    
+    def run_trademetadata_stage(self, batch_id: int):
+        """Process tradeMetadata CSV."""
+        self.batch_repo.set_stage_start_time(batch_id, "trademetadata")
+        try:
+            EventLogger.stage_start(batch_id, 'trademetadata')
+            count = self.metadata_manager.process_trade_metadata_csv(batch_id)
+            self.batch_repo.update_trademetadata_status(batch_id, 1)
+            EventLogger.stage_complete(batch_id, 'trademetadata', count, 0, metadata={'records': count})
+            logger.info("trademetadata_processed", count=count)
+        except Exception as e:
+            logger.error("trademetadata_failed", error=str(e))
+            EventLogger.file_error(batch_id, 'trademetadata', 'tradeMetadata.csv', str(e))
+        finally:
+            self.batch_repo.set_stage_end_time(batch_id, "trademetadata")
+    
+    async def run_denoise_stage(self, batch_id: int):
+        """Run the denoise stage."""
+        self.batch_repo.update_denoise_status(batch_id, "InProgress")
+        self.batch_repo.set_stage_start_time(batch_id, "denoise")
+        denoise_stage = DenoiseStage()
+        await denoise_stage.execute(batch_id, self._previous_container)
+        self.batch_repo.update_denoise_status(batch_id, "Complete")
+        self.batch_repo.set_stage_end_time(batch_id, "denoise")
+        self.update_batch_status(batch_id, "denoiseDone")
+    
+    async def run_ivr_stage(self, batch_id: int, batch: dict):
+        """Run the IVR stage."""
+        self.batch_repo.update_ivr_status(batch_id, "InProgress")
+        self.batch_repo.set_stage_start_time(batch_id, "ivr")
+        ivr_stage = IVRStage()
+        await ivr_stage.execute(batch_id, self._previous_container, self.next_gpu_container(batch, 'ivr'))
+        self.batch_repo.update_ivr_status(batch_id, "Complete")
+        self.batch_repo.set_stage_end_time(batch_id, "ivr")
+        self.update_batch_status(batch_id, "ivrDone")
+        self._previous_container = self.settings.ivr_container
+    
+    async def run_lid_stage(self, batch_id: int, batch: dict):
+        """Run the LID stage."""
+        self.batch_repo.update_lid_status(batch_id, "InProgress")
+        self.batch_repo.set_stage_start_time(batch_id, "lid")
+        lid_stage = LIDStage()
+        await lid_stage.execute(batch_id, self._previous_container, self.next_gpu_container(batch, 'lid'))
+        self.batch_repo.update_lid_status(batch_id, "Complete")
+        self.batch_repo.set_stage_end_time(batch_id, "lid")
+        self.update_batch_status(batch_id, "lidDone")
+        self._previous_container = self.settings.lid_container
+    
+    async def run_lid_or_partitioned(self, batch_id: int, batch: dict):
+        """
+        Run LID, or LID and STT together on partitioned GPU pools.
         
-        # Stage: LLM2 (optional)
-        if self.settings.llm2_enabled:
-            if batch.get('llm2Status') != 'Complete':
-                self.batch_repo.update_llm2_status(batch_id, "InProgress")
-                self.batch_repo.set_stage_start_time(batch_id, "llm2")
-                llm2_stage = LLM2Stage()
-                await llm2_stage.execute(batch_id, previous_container)
-                self.batch_repo.update_llm2_status(batch_id, "Complete")
-                self.batch_repo.set_stage_end_time(batch_id, "llm2")
-                self.update_batch_status(batch_id, "llm2Done")
-            else:
-                logger.info("llm2_stage_already_complete")
+        Decided here rather than when the stage graph is built, because a new
+        batch has no fileDistribution rows until file_distribution has run.
+        """
+        if self.use_partitioned_pools(batch):
+            await self.run_partitioned_lid_stt(batch_id, batch)
         else:
-            logger.info("llm2_stage_skipped")
-        
-        # Stop final container
+            await self.run_lid_stage(batch_id, batch)
+    
+    async def run_partitioned_lid_stt(self, batch_id: int, batch: dict):
+        """Run LID and STT concurrently on separate GPU pools."""
+        self.batch_repo.update_lid_status(batch_id, "InProgress")
+        self.batch_repo.update_stt_status(batch_id, "InProgress")
+        self.batch_repo.set_stage_start_time(batch_id, "lid")
+        self.batch_repo.set_stage_start_time(batch_id, "stt")
+        runner = PartitionedLidStt()
+        await runner.execute(batch_id, self._previous_container, self.next_gpu_container(batch, 'stt'))
+        self.batch_repo.update_lid_status(batch_id, "Complete")
+        self.batch_repo.set_stage_end_time(batch_id, "lid")
+        self.batch_repo.update_stt_status(batch_id, "Complete")
+        self.batch_repo.set_stage_end_time(batch_id, "stt")
+        self.update_batch_status(batch_id, "sttDone")
+        self._previous_container = self.settings.stt_container
+        # The stt node checks this when it starts and is skipped
+        batch['lidStatus'] = batch['sttStatus'] = 'Complete'
+    
+    def run_rule_engine_step1(self, batch_id: int):
+        """Rule Engine Step 1 - trade to audio mapping."""
+        self.batch_repo.update_triaging_status(batch_id, "InProgress")
+        self.batch_repo.set_stage_start_time(batch_id, "triaging")
+        try:
+            EventLogger.stage_start(batch_id, 'triaging', metadata={'step': 1, 'description': 'Trade to audio mapping'})
+            count = self.rule_engine.process(batch_id)
+
+            # Fill auditAnswer for calls without trade data
+            no_trade_count = self.rule_engine.fill_audio_not_found(batch_id)
+            logger.info("audio_not_found_filled", count=no_trade_count)
+
+            self.batch_repo.update_triaging_status(batch_id, "Complete")
+            # Runs alongside STT: keep a later status (e.g. sttDone) in place
+            self.batch_repo.update_status_unless(batch_id, "triagingDone", self.STATUSES_AFTER_TRIAGING)
+            EventLogger.stage_complete(batch_id, 'triaging', count, 0, metadata={
+                'mappings': count,
+                'no_trade_count': no_trade_count
+            })
+            logger.info("rule_engine_step1_done", mappings=count)
+        except Exception as e:
+            logger.error("rule_engine_failed", error=str(e))
+            EventLogger.file_error(batch_id, 'triaging', 'rule_engine_step1', str(e))
+        finally:
+            self.batch_repo.set_stage_end_time(batch_id, "triaging")
+    
+    async def run_stt_stage(self, batch_id: int, batch: dict):
+        """Run the STT stage."""
+        self.batch_repo.update_stt_status(batch_id, "InProgress")
+        self.batch_repo.set_stage_start_time(batch_id, "stt")
+        stt_stage = STTStage()
+        await stt_stage.execute(batch_id, self._previous_container, self.next_gpu_container(batch, 'stt'))
+        self.batch_repo.update_stt_status(batch_id, "Complete")
+        self.batch_repo.set_stage_end_time(batch_id, "stt")
+        self.update_batch_status(batch_id, "sttDone")
+        self._previous_container = self.settings.stt_container
+    
+    async def run_llm1_stage(self, batch_id: int):
+        """Run the LLM1 extraction stage."""
+        self.batch_repo.update_llm1_status(batch_id, "InProgress")
+        self.batch_repo.set_stage_start_time(batch_id, "llm1")
+        llm1_stage = LLM1Stage()
+        await llm1_stage.execute(batch_id, self._previous_container)
+        self.batch_repo.update_llm1_status(batch_id, "Complete")
+        self.batch_repo.set_stage_end_time(batch_id, "llm1")
+        self.update_batch_status(batch_id, "llm1Done")
+    
+    async def run_llm2_stage(self, batch_id: int):
+        """Run the LLM2 audit question stage."""
+        self.batch_repo.update_llm2_status(batch_id, "InProgress")
+        self.batch_repo.set_stage_start_time(batch_id, "llm2")
+        llm2_stage = LLM2Stage()
+        await llm2_stage.execute(batch_id, self._previous_container)
+        self.batch_repo.update_llm2_status(batch_id, "Complete")
+        self.batch_repo.set_stage_end_time(batch_id, "llm2")
+        self.update_batch_status(batch_id, "llm2Done")
+    
+    async def release_containers(self):
+        """Stop final container (and anything switched in per GPU)."""
+        if self.settings.overlap_container_switch:
+            await get_container_planner().stop_all()
         await self.mediator.stop_all_containers(self.settings.llm2_container)
-        
-        # Stage: Rule Engine Step 2 (TODO: implement full logic)
-        if self.settings.rule_engine_enabled:
-            if batch.get('triagingStep2Status') != 'Complete':
-                logger.info("rule_engine_step2_starting")
-                self.batch_repo.set_stage_start_time(batch_id, "triaging_step2")
-                EventLogger.stage_start(batch_id, 'triaging_step2', metadata={
-                    'batch_date': self.settings.batch_date
-                })
-                start_time = time.perf_counter()
-                try:
-                    result = process_rule_engine(self.settings.batch_date, batch_id)
-                    duration = time.perf_counter() - start_time
-                    logger.info("rule_engine_step2_completed", batch_id=batch_id, duration_seconds=duration, result=result)
-                    EventLogger.stage_complete(
-                        batch_id,
-                        'triaging_step2',
-                        1,
-                        0,
-                        metadata={'duration_seconds': duration}
-                    )
-                except Exception as e:
-                    logger.error("rule_engine_step2_failed", batch_id=batch_id, error=str(e))
-                    EventLogger.file_error(batch_id, 'triaging_step2', 'rule_engine_step2', str(e))
-                finally:
-                    self.batch_repo.update_triaging_step2_status(batch_id, "Complete")
-                    self.batch_repo.set_stage_end_time(batch_id, "triaging_step2")
-                    logger.info("rule_engine_step2_done")
-            else:
-                logger.info("rule_engine_step2_already_complete")
-        else:
-            logger.info("rule_engine_step2_skipped")
-        
-        # Mark batch complete
-        self.update_batch_status(batch_id, "Completed")
-        self.batch_repo.set_batch_end_time(batch_id)
-        
-        logger.info("pipeline_completed", batch_id=batch_id)
+    
+    def run_rule_engine_step2(self, batch_id: int):
+        """Rule Engine Step 2 (TODO: implement full logic)."""
+        logger.info("rule_engine_step2_starting")
+        self.batch_repo.set_stage_start_time(batch_id, "triaging_step2")
+        EventLogger.stage_start(batch_id, 'triaging_step2', metadata={
+            'batch_date': self.settings.batch_date
+        })
+        start_time = time.perf_counter()
+        try:
+            result = process_rule_engine(self.settings.batch_date, batch_id)
+            duration = time.perf_counter() - start_time
+            logger.info("rule_engine_step2_completed", batch_id=batch_id, duration_seconds=duration, result=result)
+            EventLogger.stage_complete(
+                batch_id,
+                'triaging_step2',
+                1,
+                0,
+                metadata={'duration_seconds': duration}
+            )
+        except Exception as e:
+            logger.error("rule_engine_step2_failed", batch_id=batch_id, error=str(e))
+            EventLogger.file_error(batch_id, 'triaging_step2', 'rule_engine_step2', str(e))
+        finally:
+            self.batch_repo.update_triaging_step2_status(batch_id, "Complete")
+            self.batch_repo.set_stage_end_time(batch_id, "triaging_step2")
+            logger.info("rule_engine_step2_done")
 
 
 async def main():
@@ -1,10 +1,13 @@
 """HTTP client for communicating with cofi-mediator-service on GPU machines."""
 import aiohttp
 import asyncio
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Awaitable, AsyncIterator, Tuple
 import structlog
 
 from .config import get_settings
+from .gpu_queue import AimdLimiter, GpuWorkQueue, log_queue_stats
+from .http_session import get_http_session
+from .retry import RetryPolicy
 
 logger = structlog.get_logger()
 
@@ -15,6 +18,15 @@ class MediatorClient:
     def __init__(self, timeout: int = 600):
         self.settings = get_settings()
         self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.probe_timeout = aiohttp.ClientTimeout(total=30)
+        self.gpu_queues: Dict[str, GpuWorkQueue] = {}
+        # Per-GPU upload bound (see upload_file)
+        self.upload_slots: Dict[str, asyncio.Semaphore] = {}
+        self._upload_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.retry_policy = RetryPolicy.from_settings()
+        # Files that still failed after all retries in the last dispatch
+        self.dead_letter: List[Dict[str, Any]] = []
+        self.retries = 0
     
     def _get_mediator_url(self, gpu_ip: str) -> str:
         """Build mediator base URL."""
@@ -23,69 +35,152 @@ class MediatorClient:
     async def start_container(self, gpu_ip: str, container_name: str) -> Dict[str, Any]:
         """Start a Docker container on a GPU machine."""
         url = f"{self._get_mediator_url(gpu_ip)}/start_container"
-        async with aiohttp.ClientSession(timeout=self.timeout) as session:
-            try:
-                async with session.post(url, json={"container_name": container_name}) as resp:
-                    result = await resp.json()
-                    logger.info("container_started", gpu=gpu_ip, container=container_name, result=result)
-                    return result
-            except Exception as e:
-                logger.error("start_container_failed", gpu=gpu_ip, container=container_name, error=str(e))
-                raise
+        session = get_http_session()
+        try:
+            async with session.post(url, json={"container_name": container_name}, timeout=self.timeout) as resp:
+                result = await resp.json()
+                logger.info("container_started", gpu=gpu_ip, container=container_name, result=result)
+                return result
+        except Exception as e:
+            logger.error("start_container_failed", gpu=gpu_ip, container=container_name, error=str(e))
+            raise
     
     async def stop_container(self, gpu_ip: str, container_name: str) -> Dict[str, Any]:
         """Stop a Docker container on a GPU machine."""
         url = f"{self._get_mediator_url(gpu_ip)}/stop_container"
-        async with aiohttp.ClientSession(timeout=self.timeout) as session:
-            try:
-                async with session.post(url, json={"container_name": container_name}) as resp:
-                    result = await resp.json()
-                    logger.info("container_stopped", gpu=gpu_ip, container=container_name, result=result)
-                    return result
-            except Exception as e:
-                logger.error("stop_container_failed", gpu=gpu_ip, container=container_name, error=str(e))
-                raise
+        session = get_http_session()
+        try:
+            async with session.post(url, json={"container_name": container_name}, timeout=self.timeout) as resp:
+                result = await resp.json()
+                logger.info("container_stopped", gpu=gpu_ip, container=container_name, result=result)
+                return result
+        except Exception as e:
+            logger.error("stop_container_failed", gpu=gpu_ip, container=container_name, error=str(e))
+            raise
     
     async def check_container_status(self, gpu_ip: str, container_name: str) -> bool:
         """Check if a container is running on a GPU machine."""
         url = f"{self._get_mediator_url(gpu_ip)}/container_status"
-        async with aiohttp.ClientSession(timeout=self.timeout) as session:
-            try:
-                async with session.post(url, json={"container_name": container_name}) as resp:
-                    result = await resp.json()
-                    return result.get("is_running", False)
-            except Exception as e:
-                logger.error("check_status_failed", gpu=gpu_ip, container=container_name, error=str(e))
+        session = get_http_session()
+        try:
+            async with session.post(url, json={"container_name": container_name}, timeout=self.timeout) as resp:
+                result = await resp.json()
+                return result.get("is_running", False)
+        except Exception as e:
+            logger.error("check_status_failed", gpu=gpu_ip, container=container_name, error=str(e))
+            return False
+    
+    async def check_container_ready(self, gpu_ip: str, container_name: str, port: int) -> Optional[bool]:
+        """
+        Ask the mediator to probe a container's model endpoint.
+        
+        Returns:
+            True/False for ready/not ready, or None if the mediator does not
+            support readiness probes (older mediator without /container_ready)
+        """
+        url = f"{self._get_mediator_url(gpu_ip)}/container_ready"
+        payload = {
+            "container_name": container_name,
+            "port": port,
+            "path": self.settings.readiness_probe_path
+        }
+        session = get_http_session()
+        try:
+            async with session.post(url, json=payload, timeout=self.probe_timeout) as resp:
+                if resp.status == 404:
+                    return None
+                result = await resp.json()
+                return result.get("ready", False)
+        except Exception as e:
+            logger.debug("readiness_probe_failed", gpu=gpu_ip, container=container_name, error=str(e))
+            return False
+    
+    async def wait_until_ready(self, gpu_ip: str, container_name: str, port: int, timeout: float) -> bool:
+        """
+        Poll a container on one GPU until its model endpoint is ready.
+        
+        Args:
+            gpu_ip: GPU machine IP
+            container_name: Container to probe
+            port: Model server port inside the GPU machine
+            timeout: Maximum seconds to wait (the old fixed startup wait)
+        
+        Returns:
+            True if ready, False if the timeout elapsed first
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + timeout
+        
+        while True:
+            ready = await self.check_container_ready(gpu_ip, container_name, port)
+            
+            if ready is None:
+                # Mediator cannot probe - fall back to the fixed startup wait
+                logger.warning("readiness_probe_unsupported", gpu=gpu_ip, container=container_name)
+                await asyncio.sleep(max(0.0, deadline - loop.time()))
+                return True
+            
+            if ready:
+                logger.info("container_ready", gpu=gpu_ip, container=container_name,
+                            waited_seconds=round(loop.time() - started, 1))
+                return True
+            
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                logger.warning("container_readiness_timeout", gpu=gpu_ip, container=container_name, timeout=timeout)
                 return False
+            
+            await asyncio.sleep(min(self.settings.readiness_poll_interval, remaining))
+    
+    def _upload_slot(self, gpu_ip: str) -> asyncio.Semaphore:
+        """Semaphore bounding concurrent uploads to one GPU (per event loop)."""
+        loop = asyncio.get_running_loop()
+        if self._upload_loop is not loop:
+            self.upload_slots = {}
+            self._upload_loop = loop
+        if gpu_ip not in self.upload_slots:
+            self.upload_slots[gpu_ip] = asyncio.Semaphore(max(1, self.settings.http_pool_limit_per_host))
+        return self.upload_slots[gpu_ip]
     
     async def upload_file(self, gpu_ip: str, file_path: str, file_name: str) -> Dict[str, Any]:
-        """Upload a file to a GPU machine."""
+        """
+        Upload a file to a GPU machine.
+        
+        At most HTTP_POOL_LIMIT_PER_HOST uploads per GPU run at once; the
+        rest wait here rather than for a pooled connection, where the wait
+        would count against the request's total timeout.
+        """
         url = f"{self._get_mediator_url(gpu_ip)}/upload_file"
-        async with aiohttp.ClientSession(timeout=self.timeout) as session:
-            try:
+        session = get_http_session()
+        try:
+            async with self._upload_slot(gpu_ip):
                 with open(file_path, 'rb') as f:
                     data = aiohttp.FormData()
                     data.add_field('file', f, filename=file_name)
-                    async with session.post(url, data=data) as resp:
+                    async with session.post(url, data=data, timeout=self.timeout) as resp:
                         result = await resp.json()
                         logger.info("file_uploaded", gpu=gpu_ip, file=file_name, result=result)
                         return result
-            except Exception as e:
-                logger.error("upload_failed", gpu=gpu_ip, file=file_name, error=str(e))
-                raise
+        except Exception as e:
+            logger.error("upload_failed", gpu=gpu_ip, file=file_name, error=str(e))
+            raise
     
     async def call_processing_api(self, gpu_ip: str, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Call a processing API (IVR, LID, STT, LLM) on a GPU machine."""
         url = f"{self._get_mediator_url(gpu_ip)}{endpoint}"
-        async with aiohttp.ClientSession(timeout=self.timeout) as session:
-            try:
-                async with session.post(url, json=payload) as resp:
-                    result = await resp.json()
-                    logger.info("api_called", gpu=gpu_ip, endpoint=endpoint, status=resp.status)
-                    return result
-            except Exception as e:
-                logger.error("api_call_failed", gpu=gpu_ip, endpoint=endpoint, error=str(e))
-                raise
+        session = get_http_session()
+        try:
+            async with session.post(url, json=payload, timeout=self.timeout) as resp:
+                if resp.status >= 500:
+                    # Let 5xx surface as errors so they can be retried
+                    resp.raise_for_status()
+                result = await resp.json()
+                logger.info("api_called", gpu=gpu_ip, endpoint=endpoint, status=resp.status)
+                return result
+        except Exception as e:
+            logger.error("api_call_failed", gpu=gpu_ip, endpoint=endpoint, error=str(e))
+            raise
     
     # Parallel operations across all GPUs
     
@@ -103,36 +198,185 @@ class MediatorClient:
         results = await asyncio.gather(*tasks, return_exceptions=True)
         return list(zip(gpu_ips, results))
     
-    async def process_files_parallel(
-        self, 
-        file_gpu_mapping: Dict[str, List[str]], 
+    def _build_limiter(self) -> AimdLimiter:
+        """Create the per-GPU concurrency limiter from settings."""
+        return AimdLimiter(
+            initial=self.settings.gpu_max_inflight,
+            minimum=self.settings.gpu_min_inflight,
+            maximum=self.settings.gpu_max_inflight_limit,
+            latency_target=self.settings.gpu_latency_target,
+            adaptive=self.settings.gpu_adaptive_concurrency
+        )
+    
+    def queue_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-GPU queue depth, in-flight count and limit for the running dispatch."""
+        return {gpu_ip: queue.stats() for gpu_ip, queue in self.gpu_queues.items()}
+    
+    async def stream_files(
+        self,
+        file_gpu_mapping: Dict[str, List[str]],
         endpoint: str,
-        payload_builder: callable
-    ) -> Dict[str, Any]:
+        payload_builder: callable,
+        ready_waiter: Optional[Callable[[str], Awaitable[Any]]] = None,
+        on_gpu_drained: Optional[Callable[[str], Awaitable[Any]]] = None
+    ) -> AsyncIterator[Tuple[str, str, Any]]:
         """
-        Process files in parallel across all GPUs.
+        Process files across all GPUs, yielding each result as it completes.
+        
+        Each GPU gets its own bounded work queue, so at most the configured
+        in-flight depth of requests hits a GPU at any time. Each GPU starts
+        draining its queue as soon as its own ready_waiter returns,
+        independent of the other GPUs.
+        
+        Completed results pass through a bounded buffer: if the consumer
+        falls behind, workers pause instead of piling up responses, so memory
+        is bounded by in-flight work rather than batch size.
+        
+        Transient failures are re-enqueued after a backoff (without holding
+        a GPU slot while waiting), on the least-loaded other GPU when audio
+        storage is shared and rerouting is enabled. Files that still fail are
+        yielded with their last error and recorded in dead_letter.
         
         Args:
             file_gpu_mapping: Dict mapping GPU IP to list of files on that GPU
             endpoint: API endpoint to call
             payload_builder: Function to build payload from file name
+            ready_waiter: Optional coroutine function awaited per GPU before dispatch
+            on_gpu_drained: Optional coroutine function awaited per GPU once its
+                last request has finished
         
-        Returns:
-            Dict with results per file
+        Yields:
+            (file_name, gpu_ip, result) tuples; result is an Exception on failure
         """
-        all_tasks = []
-        task_info = []
+        done = object()
+        buffer: asyncio.Queue = asyncio.Queue(maxsize=self.settings.stream_result_buffer)
+        # Files per GPU not yet finally resolved (queued, in flight or waiting
+        # to retry); a GPU's queue closes - and the GPU counts as drained -
+        # when this reaches zero
+        remaining: Dict[str, int] = {}
+        attempts: Dict[str, int] = {}
+        retry_tasks: set = set()
+        
+        async def handle(gpu_ip: str, file_name: str) -> Any:
+            return await self.call_processing_api(gpu_ip, endpoint, payload_builder(file_name))
+        
+        def finish(gpu_ip: str):
+            remaining[gpu_ip] -= 1
+            if remaining[gpu_ip] <= 0:
+                self.gpu_queues[gpu_ip].close()
+        
+        async def requeue(gpu_ip: str, file_name: str, delay: float):
+            await asyncio.sleep(delay)
+            self.gpu_queues[gpu_ip].put(file_name)
         
+        async def on_result(gpu_ip: str, file_name: str, result: Any):
+            if isinstance(result, Exception):
+                attempts[file_name] = attempts.get(file_name, 0) + 1
+                if self.retry_policy.should_retry(result, attempts[file_name]):
+                    target = self._retry_target(gpu_ip, remaining)
+                    if target != gpu_ip:
+                        remaining[target] += 1
+                        finish(gpu_ip)
+                    delay = self.retry_policy.backoff(attempts[file_name])
+                    self.retries += 1
+                    logger.warning("file_retry_scheduled", file=file_name, gpu=gpu_ip, target_gpu=target,
+                                   attempt=attempts[file_name], delay=round(delay, 1), error=str(result) or type(result).__name__)
+                    task = asyncio.create_task(requeue(target, file_name, delay))
+                    retry_tasks.add(task)
+                    task.add_done_callback(retry_tasks.discard)
+                    return
+                self.dead_letter.append({
+                    'file': file_name,
+                    'gpu': gpu_ip,
+                    'attempts': attempts[file_name],
+                    'transient': self.retry_policy.is_transient(result),
+                    'error': str(result) or type(result).__name__
+                })
+            await buffer.put((file_name, gpu_ip, result))
+            finish(gpu_ip)
+        
+        async def run_gpu(queue: GpuWorkQueue):
+            if ready_waiter:
+                await ready_waiter(queue.gpu_ip)
+            await queue.run(on_result)
+            if on_gpu_drained:
+                await on_gpu_drained(queue.gpu_ip)
+        
+        async def produce():
+            try:
+                await asyncio.gather(*[run_gpu(queue) for queue in self.gpu_queues.values()])
+            finally:
+                await buffer.put(done)
+        
+        self.gpu_queues = {}
+        self.dead_letter = []
+        self.retries = 0
         for gpu_ip, files in file_gpu_mapping.items():
-            for file_name in files:
-                payload = payload_builder(file_name)
-                task = self.call_processing_api(gpu_ip, endpoint, payload)
-                all_tasks.append(task)
-                task_info.append((gpu_ip, file_name))
+            queue = GpuWorkQueue(gpu_ip, handle, self._build_limiter())
+            queue.put_many(files)
+            self.gpu_queues[gpu_ip] = queue
+            remaining[gpu_ip] = len(files)
+            if not files:
+                queue.close()
         
-        results = await asyncio.gather(*all_tasks, return_exceptions=True)
+        producer = asyncio.create_task(produce())
+        stats_task = asyncio.create_task(
+            log_queue_stats(self.gpu_queues, self.settings.gpu_queue_stats_interval, endpoint)
+        )
+        try:
+            while True:
+                item = await buffer.get()
+                if item is done:
+                    break
+                yield item
+            # Surface unexpected producer errors (e.g. a failing ready_waiter)
+            await producer
+        finally:
+            stats_task.cancel()
+            producer.cancel()
+            for task in list(retry_tasks):
+                task.cancel()
         
-        return {
-            info[1]: {"gpu": info[0], "result": result}
-            for info, result in zip(task_info, results)
-        }
+        logger.info("gpu_dispatch_completed", endpoint=endpoint, gpus=self.queue_stats(),
+                    retries=self.retries, dead_letter=len(self.dead_letter))
+    
+    def _retry_target(self, gpu_ip: str, remaining: Dict[str, int]) -> str:
+        """
+        Pick the GPU for a retry.
+        
+        Files live only on the GPU they were uploaded to, unless all GPUs
+        share the audio volume; then the least-loaded other GPU that is still
+        running this stage is used.
+        """
+        if not (self.settings.retry_reroute and self.settings.shared_audio_storage):
+            return gpu_ip
+        candidates = [
+            ip for ip, queue in self.gpu_queues.items()
+            if ip != gpu_ip and not queue.closed and remaining.get(ip, 0) > 0
+        ]
+        if not candidates:
+            return gpu_ip
+        return min(candidates, key=lambda ip: self.gpu_queues[ip].load)
+    
+    async def process_files_parallel(
+        self, 
+        file_gpu_mapping: Dict[str, List[str]], 
+        endpoint: str,
+        payload_builder: callable,
+        ready_waiter: Optional[Callable[[str], Awaitable[Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Process files in parallel across all GPUs and collect every result.
+        
+        Prefer stream_files for large batches; this keeps all responses in
+        memory until the last file finishes.
+        
+        Returns:
+            Dict with results per file
+        """
+        results: Dict[str, Any] = {}
+        async for file_name, gpu_ip, result in self.stream_files(
+            file_gpu_mapping, endpoint, payload_builder, ready_waiter
+        ):
+            results[file_name] = {"gpu": gpu_ip, "result": result}
+        return results
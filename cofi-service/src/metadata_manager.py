@@ -87,16 +87,12 @@ class CallMetadataRepo:
         if not records:
             return 0
         
-        query = """
-            INSERT INTO callMetadata (
-                nId, sClientId, sClientName, sClientMobileNumber, nBranchId, sBranchName,
-                sSessionId, dCallStartTime, dCallEndTime, nCallType, nCallStatus,
-                sAgentId, sAgentName, sAgentMobileNumber, sRecordingFileName, sRecordingUrl,
-                nTagId, sRemark, dLastUpdateTime, nFeedBack, nIsAdd, sSIPChannel, batchId
-            ) VALUES (
-                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-            )
-        """
+        columns = [
+            'nId', 'sClientId', 'sClientName', 'sClientMobileNumber', 'nBranchId', 'sBranchName',
+            'sSessionId', 'dCallStartTime', 'dCallEndTime', 'nCallType', 'nCallStatus', 'sAgentId',
+            'sAgentName', 'sAgentMobileNumber', 'sRecordingFileName', 'sRecordingUrl', 'nTagId',
+            'sRemark', 'dLastUpdateTime', 'nFeedBack', 'nIsAdd', 'sSIPChannel', 'batchId'
+        ]
         
         params_list = []
         for record in records:
@@ -127,7 +123,7 @@ class CallMetadataRepo:
             )
             params_list.append(params)
         
-        return self.db.execute_many(query, params_list)
+        return self.db.bulk_insert("callMetadata", columns, params_list)
     
     def get_by_batch(self, batch_id: int) -> List[Dict]:
         """Get all callMetadata records for a batch."""
@@ -152,18 +148,14 @@ class TradeMetadataRepo:
         if not records:
             return 0
         
-        query = """
-            INSERT INTO tradeMetadata (
-                orderId, clientCode, clientName, regNumber, alName, alNumber, alRelation,
-                tradeDate, orderPlacedTime, buySell, instType, expiryDate, optionType,
-                symbol, comScriptCode, scripName, strikePrice, tradeQuantity, tradePrice,
-                tradeValue, lotQty, dealerCodeSbMainCode, dealerNameSuBrokerName,
-                dealerEmailId, dealingBranch, dealingZone, dealingState, dealingCity,
-                loginId, digit12, originalExchangeCode, batchId, processId
-            ) VALUES (
-                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-            )
-        """
+        columns = [
+            'orderId', 'clientCode', 'clientName', 'regNumber', 'alName', 'alNumber', 'alRelation',
+            'tradeDate', 'orderPlacedTime', 'buySell', 'instType', 'expiryDate', 'optionType',
+            'symbol', 'comScriptCode', 'scripName', 'strikePrice', 'tradeQuantity', 'tradePrice',
+            'tradeValue', 'lotQty', 'dealerCodeSbMainCode', 'dealerNameSuBrokerName',
+            'dealerEmailId', 'dealingBranch', 'dealingZone', 'dealingState', 'dealingCity',
+            'loginId', 'digit12', 'originalExchangeCode', 'batchId', 'processId'
+        ]
         
         params_list = []
         for record in records:
@@ -204,7 +196,7 @@ class TradeMetadataRepo:
             )
             params_list.append(params)
         
-        return self.db.execute_many(query, params_list)
+        return self.db.bulk_insert("tradeMetadata", columns, params_list)
     
     def get_by_batch(self, batch_id: int) -> List[Dict]:
         """Get all tradeMetadata records for a batch."""
@@ -1,7 +1,10 @@
 """Base pipeline stage with common logic using mysql.connector."""
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
+from collections import deque
+from functools import partial
+from typing import Deque, Dict, List, Any, Optional, Tuple
 import asyncio
+import time
 import structlog
 
 import json
@@ -9,6 +12,9 @@ from ..config import get_settings
 from ..database import get_database, FileDistributionRepo
 from ..mediator_client import MediatorClient
 from ..event_logger import EventLogger
+from ..checkpoint import CompletionCheckpointer
+from ..container_planner import get_container_planner
+from ..webhook_client import get_webhook_client
 
 logger = structlog.get_logger()
 
@@ -21,6 +27,7 @@ class PipelineStage(ABC):
     wait_seconds: int = 60
     status_column: str = ""  # e.g., "ivrDone", "lidDone"
     api_endpoint: str = ""
+    api_port: int = 0  # Model server port on the GPU, used for readiness probes
     
     # Map stage_name to processing_logs ENUM value
     processing_log_stage: str = ""  # e.g., "denoise", "ivr", "lid", "stt", "llm1", "llm2"
@@ -30,6 +37,9 @@ class PipelineStage(ABC):
         self.mediator = MediatorClient()
         self.db = get_database()
         self.file_dist_repo = FileDistributionRepo(self.db)
+        self.planner = get_container_planner()
+        # (call_id, status) webhooks whose writes have committed, not yet sent
+        self.notifications: Deque[Tuple[int, str]] = deque()
 
     @abstractmethod
     def build_payload(self, file_name: str) -> Dict[str, Any]:
@@ -41,6 +51,30 @@ class PipelineStage(ABC):
         """Process API response and update database if needed."""
         pass
     
+    def summarize_response(self, response: Any) -> Any:
+        """
+        Compact form of an API response for batchExecutionLog.
+        
+        Keeps top-level scalars (status, durations, language, ...), replaces
+        lists by their length and truncates long strings. Stages with large
+        responses override this with a stage-specific summary.
+        """
+        if isinstance(response, list):
+            return {'items': len(response)}
+        if not isinstance(response, dict):
+            return response
+        summary: Dict[str, Any] = {}
+        for key, value in response.items():
+            if isinstance(value, (list, tuple)):
+                summary[f"{key}_count"] = len(value)
+            elif isinstance(value, dict):
+                summary[key] = self.summarize_response(value)
+            elif isinstance(value, str) and len(value) > 200:
+                summary[key] = value[:200] + "..."
+            else:
+                summary[key] = value
+        return summary
+    
     def get_pending_files(self, batch_id: int) -> Dict[str, List[str]]:
         """
         Get files that need processing for this stage.
@@ -60,23 +94,173 @@ class PipelineStage(ABC):
         
         return file_gpu_mapping
     
+    def create_checkpointer(self, batch_id: int) -> CompletionCheckpointer:
+        """Create a buffered writer for this stage's completion flags."""
+        return CompletionCheckpointer(self.file_dist_repo, batch_id, self.status_column)
+    
     def mark_files_complete(self, file_names: List[str], batch_id: int):
         """Mark files as complete for this stage."""
         self.file_dist_repo.mark_stage_done(file_names, batch_id, self.status_column)
         logger.info("files_marked_complete", stage=self.stage_name, count=len(file_names))
     
-    async def execute(self, batch_id: int, previous_container: Optional[str] = None):
+    def notify_after_commit(self, call_id: int, status: str):
+        """Queue a call status webhook for once the current writes have committed."""
+        self.db.after_commit(self.notifications.append, (call_id, status))
+    
+    def log_complete_after_commit(self, batch_id: int, file_name: str, gpu_ip: str, result: Any):
+        """Log a file's success event (with response) once its writes have committed."""
+        self.db.after_commit(partial(
+            EventLogger.file_complete, batch_id, self.stage_name, file_name, gpu_ip, result,
+            status='success', summarizer=self.summarize_response
+        ))
+    
+    async def send_notifications(self):
+        """Send the queued call status webhooks (never while holding a DB transaction)."""
+        if not self.notifications:
+            return
+        batch = []
+        while self.notifications:
+            batch.append(self.notifications.popleft())
+        webhook_client = get_webhook_client()
+        await asyncio.gather(*[
+            webhook_client.notify_call_status_async(call_id, status) for call_id, status in batch
+        ])
+    
+    def persist_result(
+        self,
+        file_name: str,
+        gpu_ip: str,
+        result: Any,
+        batch_id: int,
+        checkpointer: Optional[CompletionCheckpointer] = None
+    ) -> bool:
+        """
+        Log and store one file's API result (blocking; run on the DB thread pool).
+        
+        Args:
+            checkpointer: Completion flag buffer the file is added to on
+                success (None if the caller adds it after its own commit)
+        
+        Returns:
+            True if the file was processed successfully
+        """
+        # Build payload for logging
+        payload = None
+        try:
+            payload = self.build_payload(file_name)
+        except Exception as e:
+            logger.error("payload_build_failed", file=file_name, error=str(e))
+
+        # Log file start (with payload) - optional for large batches
+        if self.settings.log_file_start_events and payload:
+            EventLogger.file_start(batch_id, self.stage_name, file_name, gpu_ip, payload)
+
+        if isinstance(result, Exception):
+            logger.error("file_processing_failed", file=file_name, error=str(result))
+            EventLogger.file_error(batch_id, self.stage_name, file_name, str(result), gpu_ip, payload=payload)
+            return False
+
+        try:
+            # One unit of work per file: a failure leaves none of its writes behind
+            with self.db.transaction():
+                self.process_response(file_name, result, gpu_ip, batch_id)
+                # Not published for a file (or group) that rolls back
+                self.log_complete_after_commit(batch_id, file_name, gpu_ip, result)
+        except Exception as e:
+            logger.error("process_response_failed", file=file_name, error=str(e))
+            EventLogger.file_error(batch_id, self.stage_name, file_name, f"process_response failed: {e}", gpu_ip)
+            return False
+
+        if checkpointer is not None:
+            checkpointer.add(file_name)
+        return True
+    
+    def persist_results(
+        self,
+        results: List[Tuple[str, str, Any]],
+        batch_id: int,
+        checkpointer: CompletionCheckpointer
+    ) -> List[str]:
+        """
+        Store a group of API results with a single commit (group commit).
+        
+        Each file runs in its own savepoint, so a failing file is rolled
+        back without losing the others in the group. Files are only added
+        to the checkpointer once the group has committed, so a failed group
+        leaves them pending for resume.
+        
+        Args:
+            results: (file_name, gpu_ip, result) tuples
+            batch_id: Current batch ID
+            checkpointer: Completion flag buffer for this stage
+        
+        Returns:
+            Names of the files stored successfully
+        """
+        successful = []
+        try:
+            with self.db.transaction():
+                for file_name, gpu_ip, result in results:
+                    try:
+                        with self.db.transaction():
+                            if self.persist_result(file_name, gpu_ip, result, batch_id):
+                                successful.append(file_name)
+                    except Exception as e:
+                        logger.error("persist_result_failed", file=file_name, error=str(e))
+        except Exception as e:
+            # Nothing from this group was committed and no flag is set, so
+            # resume re-sends these files
+            logger.error("group_commit_failed", stage=self.stage_name, files=len(results), error=str(e))
+            return []
+        for file_name in successful:
+            checkpointer.add(file_name)
+        return successful
+    
+    async def wait_for_gpu_ready(self, gpu_ip: str, batch_id: int) -> bool:
+        """Wait until this stage's container on one GPU passes its readiness probe."""
+        if not self.container_name or not self.api_port:
+            return True
+
+        ready = await self.mediator.wait_until_ready(
+            gpu_ip, self.container_name, self.api_port, self.wait_seconds
+        )
+        if not ready:
+            EventLogger.info(batch_id, self.stage_name,
+                             f"Container {self.container_name} on {gpu_ip} not ready after {self.wait_seconds}s, dispatching anyway")
+        return ready
+
+    async def prepare_gpu(self, gpu_ip: str, batch_id: int, previous_container: Optional[str]):
+        """Hand one GPU over from the previous stage's container to this one, then wait for readiness."""
+        await self.planner.transition(gpu_ip, previous_container, self.container_name)
+        await self.wait_for_gpu_ready(gpu_ip, batch_id)
+
+    async def release_gpu(self, gpu_ip: str, batch_id: int, next_container: Optional[str]):
+        """Start switching a drained GPU to the next stage's container in the background."""
+        EventLogger.info(batch_id, self.stage_name,
+                         f"{gpu_ip} drained, switching {self.container_name} -> {next_container}")
+        self.planner.schedule(gpu_ip, self.container_name, next_container)
+
+    async def execute(
+        self,
+        batch_id: int,
+        previous_container: Optional[str] = None,
+        next_container: Optional[str] = None
+    ):
         """
         Execute this pipeline stage.
 
         Args:
             batch_id: Current batch ID
             previous_container: Container from previous stage to stop first
+            next_container: Container of the next stage; with overlapped
+                switching it is started on each GPU as soon as that GPU drains
         """
         logger.info("stage_starting", stage=self.stage_name)
+        overlap = self.settings.overlap_container_switch and bool(self.container_name)
 
-        # 1. Stop previous container on all GPUs (if any)
-        if previous_container:
+        # 1. Stop previous container on all GPUs (if any); with overlapped
+        # switching this happens per GPU in prepare_gpu instead
+        if previous_container and not overlap:
             logger.info("stopping_previous_container", container=previous_container)
             EventLogger.info(batch_id, self.stage_name, f"Stopping previous container: {previous_container}")
             await self.mediator.stop_all_containers(previous_container)
@@ -85,6 +269,8 @@ class PipelineStage(ABC):
         file_gpu_mapping = self.get_pending_files(batch_id)
 
         if not file_gpu_mapping:
+            if overlap and previous_container:
+                await self.planner.transition_all(self.settings.gpu_machine_list, previous_container, None)
             logger.info("no_pending_files", stage=self.stage_name)
             EventLogger.info(batch_id, self.stage_name, "No pending files for processing")
             return
@@ -99,72 +285,103 @@ class PipelineStage(ABC):
         })
 
         # 3. Start this stage's container on all GPUs
-        logger.info("starting_containers", container=self.container_name)
-        EventLogger.info(batch_id, self.stage_name, f"Starting containers: {self.container_name}")
-        await self.mediator.start_all_containers(self.container_name)
-
-        # 4. Wait for container startup
-        logger.info("waiting_for_startup", seconds=self.wait_seconds)
-        EventLogger.info(batch_id, self.stage_name, f"Waiting {self.wait_seconds}s for container startup")
-        await asyncio.sleep(self.wait_seconds)
-
-        # 5. Process all files in parallel
-        EventLogger.info(batch_id, self.stage_name, f"Processing {total_files} files in parallel")
-        results = await self.mediator.process_files_parallel(
-            file_gpu_mapping,
-            self.api_endpoint,
-            self.build_payload
-        )
+        if overlap:
+            # GPUs with no files for this stage only need the previous container stopped
+            for gpu_ip in self.settings.gpu_machine_list:
+                if gpu_ip not in file_gpu_mapping:
+                    self.planner.schedule(gpu_ip, previous_container, None)
+        elif self.container_name:
+            logger.info("starting_containers", container=self.container_name)
+            EventLogger.info(batch_id, self.stage_name, f"Starting containers: {self.container_name}")
+            await self.mediator.start_all_containers(self.container_name)
 
-        # 6. Process responses and update database
+        # 4-5. Each GPU waits for its own container readiness (bounded by the
+        # stage wait time), then starts processing its files immediately
+        logger.info("waiting_for_readiness", container=self.container_name, timeout=self.wait_seconds)
+        EventLogger.info(batch_id, self.stage_name,
+                         f"Processing {total_files} files in parallel (per-GPU readiness, timeout {self.wait_seconds}s)")
+        # 6. Persist each response as soon as it arrives, overlapping DB
+        # writes with the GPU work still in flight
         successful_files = []
         # Get progress interval from settings (configurable for large batches)
         progress_interval = self.settings.progress_update_interval
+        idx = 0
+        # Completion flags are checkpointed in small chunks so a crash only
+        # re-sends the files completed since the last flush
+        checkpointer = self.create_checkpointer(batch_id)
+        # Results are stored in groups, one commit per group
+        group_size = max(1, self.settings.db_group_commit_size)
+        group_interval = self.settings.db_group_commit_interval
+        pending: List[Tuple[str, str, Any]] = []
+        group_started = time.monotonic()
 
-        for idx, (file_name, result_data) in enumerate(results.items(), 1):
-            result = result_data.get("result")
-            gpu_ip = result_data.get("gpu")
+        async def flush_group():
+            nonlocal pending
+            if not pending:
+                return
+            group, pending = pending, []
+            # DB writes run on the DB thread pool so they never block
+            # the event loop that keeps the GPU requests flowing
+            successful_files.extend(await self.db.run(self.persist_results, group, batch_id, checkpointer))
+            # Webhooks only for committed writes, sent after the commit
+            await self.send_notifications()
 
-            # Build payload for logging
-            payload = None
-            try:
-                payload = self.build_payload(file_name)
-            except Exception as e:
-                logger.error("payload_build_failed", file=file_name, error=str(e))
+        try:
+            async for file_name, gpu_ip, result in self.mediator.stream_files(
+                file_gpu_mapping,
+                self.api_endpoint,
+                self.build_payload,
+                ready_waiter=(
+                    (lambda gpu_ip: self.prepare_gpu(gpu_ip, batch_id, previous_container)) if overlap
+                    else (lambda gpu_ip: self.wait_for_gpu_ready(gpu_ip, batch_id))
+                ),
+                on_gpu_drained=(
+                    (lambda gpu_ip: self.release_gpu(gpu_ip, batch_id, next_container))
+                    if overlap and next_container else None
+                )
+            ):
+                idx += 1
 
-            # Log file start (with payload) - optional for large batches
-            if self.settings.log_file_start_events and payload:
-                EventLogger.file_start(batch_id, self.stage_name, file_name, gpu_ip, payload)
+                if not pending:
+                    group_started = time.monotonic()
+                pending.append((file_name, gpu_ip, result))
+                if len(pending) >= group_size or time.monotonic() - group_started >= group_interval:
+                    await flush_group()
 
-            if isinstance(result, Exception):
-                logger.error("file_processing_failed", file=file_name, error=str(result))
-                EventLogger.file_error(batch_id, self.stage_name, file_name, str(result), gpu_ip, payload=payload)
-            else:
-                # Log file complete (with response)
-                EventLogger.file_complete(batch_id, self.stage_name, file_name, gpu_ip, result, status='success')
-                self.process_response(file_name, result, gpu_ip, batch_id)
-                successful_files.append(file_name)
-
-            # Periodic progress update (every N files)
-            if idx % progress_interval == 0 or idx == total_files:
-                EventLogger.stage_progress(
-                    batch_id,
-                    self.stage_name,
-                    processed_files=len(successful_files),
-                    total_files=total_files,
-                    metadata={'files_processed': idx, 'success_rate': len(successful_files) / idx * 100}
-                )
+                # Periodic progress update (every N completed files)
+                if idx % progress_interval == 0 or idx == total_files:
+                    await flush_group()
+                    await self.db.run(
+                        EventLogger.stage_progress,
+                        batch_id,
+                        self.stage_name,
+                        processed_files=len(successful_files),
+                        total_files=total_files,
+                        metadata={
+                            'files_processed': idx,
+                            'success_rate': len(successful_files) / idx * 100,
+                            'gpu_queues': self.mediator.queue_stats(),
+                            'db_pool': self.db.pool_stats()
+                        }
+                    )
+        finally:
+            await flush_group()
+            await self.db.run(checkpointer.flush)
 
-        # 7. Mark successful files as complete
-        if successful_files:
-            self.mark_files_complete(successful_files, batch_id)
+        logger.info("files_marked_complete", stage=self.stage_name, count=checkpointer.flushed)
 
         failed_count = total_files - len(successful_files)
 
         # Log stage complete
         EventLogger.stage_complete(batch_id, self.stage_name, len(successful_files), failed_count, metadata={
             'total_files': total_files,
-            'container': self.container_name
+            'container': self.container_name,
+            'gpu_queues': self.mediator.queue_stats(),
+            'retries': self.mediator.retries,
+            'dead_letter_count': len(self.mediator.dead_letter),
+            'dead_letter': self.mediator.dead_letter[:self.settings.dead_letter_log_limit],
+            'db_pool': self.db.pool_stats(),
+            'event_log_storage': EventLogger.storage_stats()
         })
 
         logger.info("stage_completed", stage=self.stage_name, processed=len(successful_files), failed=failed_count)
@@ -18,6 +18,7 @@ class IVRStage(PipelineStage):
         self.container_name = settings.ivr_container
         self.wait_seconds = settings.ivr_wait
         self.api_endpoint = settings.ivr_api_endpoint
+        self.api_port = settings.ivr_port
     
     def build_payload(self, file_name: str) -> Dict[str, Any]:
         """Build IVR API payload."""
@@ -1,5 +1,5 @@
 """LID (Language Identification) processing stage."""
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 import structlog
 
 from .base import PipelineStage
@@ -20,8 +20,9 @@ class LIDStage(PipelineStage):
         super().__init__()
         settings = get_settings()
         self.container_name = settings.lid_container
-        self.wait_seconds = 60  # LID is relatively fast
+        self.wait_seconds = settings.lid_wait
         self.api_endpoint = settings.lid_api_endpoint
+        self.api_port = settings.lid_port
         self.lid_repo = LidStatusRepo(self.db)
     
     def build_payload(self, file_name: str) -> Dict[str, Any]:
@@ -32,9 +33,10 @@ class LIDStage(PipelineStage):
             "response": ""
         }
     
-    def process_response(self, file_name: str, response: Dict[str, Any], gpu_ip: str, batch_id: int):
+    @staticmethod
+    def parse_response(response: Dict[str, Any]) -> Tuple[str, float]:
         """
-        Process LID API response and store in lidStatus table.
+        Extract language and duration from a LID API response.
         Response structure:
         {
             "data": {
@@ -43,17 +45,36 @@ class LIDStage(PipelineStage):
                 ]
             }
         }
+        
+        Returns:
+            (language code, audio duration in seconds)
         """
+        data = response.get("data", {})
+        derived = data.get("derived_value", [{}])[0]
+        
+        language = derived.get("results", ["unknown"])[0]
+        audio_duration = derived.get("audio_duration", 0.0)
+        
+        # Truncate 3-char language codes to 2 chars (e.g., "hin" -> "hi", "eng" -> "en")
+        if isinstance(language, str) and len(language) == 3:
+            language = language[:2]
+        return language, audio_duration
+    
+    def summarize_response(self, response: Any) -> Any:
+        """Detected language, duration and top-level status of a LID response."""
         try:
-            data = response.get("data", {})
-            derived = data.get("derived_value", [{}])[0]
-            
-            language = derived.get("results", ["unknown"])[0]
-            audio_duration = derived.get("audio_duration", 0.0)
-            
-            # Truncate 3-char language codes to 2 chars (e.g., "hin" -> "hi", "eng" -> "en")
-            if isinstance(language, str) and len(language) == 3:
-                language = language[:2]
+            language, audio_duration = self.parse_response(response)
+        except Exception:
+            return super().summarize_response(response)
+        summary = {'language': language, 'audio_duration': audio_duration}
+        if 'status' in response:
+            summary['status'] = response['status']
+        return summary
+    
+    def process_response(self, file_name: str, response: Dict[str, Any], gpu_ip: str, batch_id: int):
+        """Process LID API response and store in lidStatus table."""
+        try:
+            language, audio_duration = self.parse_response(response)
             
             # Insert LID status record
             self.lid_repo.insert(
@@ -66,4 +87,3 @@ class LIDStage(PipelineStage):
             logger.info("lid_result_saved", file=file_name, language=language, duration=audio_duration)
         except Exception as e:
             logger.error("lid_response_processing_failed", file=file_name, error=str(e))
-
@@ -8,7 +8,9 @@ import structlog
 from ..config import get_settings
 from ..database import CallRepo, TranscriptRepo, FileDistributionRepo, get_database
 from ..webhook_client import get_webhook_client
+from ..http_session import get_http_session
 from ..event_logger import EventLogger
+from ..checkpoint import CompletionCheckpointer
 
 logger = structlog.get_logger()
 
@@ -172,15 +174,15 @@ class LLM1Stage:
     
     async def call_nlp_api(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Call the NLP API directly (not via GPU mediator)."""
-        async with aiohttp.ClientSession(timeout=self.timeout) as session:
-            try:
-                async with session.post(self.api_url, json=payload) as resp:
-                    result = await resp.json()
-                    logger.info("nlp_api_called", status=resp.status)
-                    return result
-            except Exception as e:
-                logger.error("nlp_api_failed", error=str(e))
-                raise
+        session = get_http_session()
+        try:
+            async with session.post(self.api_url, json=payload, timeout=self.timeout) as resp:
+                result = await resp.json()
+                logger.info("nlp_api_called", status=resp.status)
+                return result
+        except Exception as e:
+            logger.error("nlp_api_failed", error=str(e))
+            raise
     
     def _safe_get_value(self, item: Dict, key: str, default=0):
         """Safely get value from dict, handling 'NA' strings."""
@@ -316,6 +318,9 @@ class LLM1Stage:
         max_concurrent = len(self.settings.gpu_machine_list)
         semaphore = asyncio.Semaphore(max_concurrent)
 
+        # Completion flags are checkpointed in small chunks as calls finish
+        checkpointer = CompletionCheckpointer(self.file_dist_repo, batch_id, 'llm1Done')
+
         async def process_single_call(call_record):
             """Process a single call with concurrency limit."""
             async with semaphore:
@@ -326,27 +331,29 @@ class LLM1Stage:
 
                 try:
                     # Build payload with transcript and trade details
-                    payload = self.build_payload(call_record)
+                    payload = await self.db.run(self.build_payload, call_record)
 
                     # Skip if no transcript
                     if not payload['text']:
                         logger.warning("no_transcript_skipping", file=audio_name)
-                        EventLogger.file_error(batch_id, 'llm1', audio_name, "No transcript found - skipping", payload=payload)
+                        await self.db.run(EventLogger.file_error, batch_id, 'llm1', audio_name,
+                                          "No transcript found - skipping", payload=payload)
                         return False, audio_name
 
                     # Call NLP API
                     response = await self.call_nlp_api(payload)
 
-                    # Process response
-                    self.process_response(call_record, response)
-                    EventLogger.file_complete(batch_id, 'llm1', audio_name, status='success')
+                    # Process response (DB writes + webhook run off the event loop)
+                    await self.db.run(self.process_response, call_record, response)
+                    await self.db.run(EventLogger.file_complete, batch_id, 'llm1', audio_name, status='success')
+                    await self.db.run(checkpointer.add, audio_name)
                     return True, audio_name
 
                 except Exception as e:
                     logger.error("llm1_processing_failed",
                                file=audio_name,
                                error=str(e))
-                    EventLogger.file_error(batch_id, 'llm1', audio_name, str(e), payload=payload)
+                    await self.db.run(EventLogger.file_error, batch_id, 'llm1', audio_name, str(e), payload=payload)
                     return False, audio_name
 
         # Create tasks for all calls
@@ -354,7 +361,10 @@ class LLM1Stage:
 
         # Execute all in parallel (with concurrency limit)
         logger.info("llm1_processing_parallel", max_concurrent=max_concurrent)
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        try:
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            await self.db.run(checkpointer.flush)
 
         # Count successes and track successful files
         successful_files = []
@@ -372,10 +382,7 @@ class LLM1Stage:
 
         successful = len(successful_files)
 
-        # Mark successful files as complete in fileDistribution
-        if successful_files:
-            self.file_dist_repo.mark_stage_done(successful_files, batch_id, 'llm1Done')
-            logger.info("files_marked_llm1_complete", count=len(successful_files))
+        logger.info("files_marked_llm1_complete", count=checkpointer.flushed)
 
         # Log stage complete
         EventLogger.stage_complete(batch_id, 'llm1', successful, failed, metadata={
@@ -9,18 +9,19 @@ logger = structlog.get_logger()
 class CallConversationRepo:
     """Repository for callConversation table operations."""
     
+    BY_CALL_ID_QUERY = """
+        SELECT optionType, lotQuantity, strikePrice, expiryDate,
+               tradeDate, tradePrice, buySell
+        FROM callConversation
+        WHERE callId = %s
+    """
+    
     def __init__(self, db):
         self.db = db
     
     def get_by_call_id(self, call_id: int):
         """Get call conversation records for a call."""
-        query = """
-            SELECT optionType, lotQuantity, strikePrice, expiryDate, 
-                   tradeDate, tradePrice, buySell 
-            FROM callConversation 
-            WHERE callId = %s
-        """
-        return self.db.execute_query(query, (call_id,))
+        return self.db.execute_query(self.BY_CALL_ID_QUERY, (call_id,))
 
 
 class CustomRuleExecutor:
@@ -9,7 +9,10 @@ from ..config import get_settings
 from ..database import CallRepo, TranscriptRepo, FileDistributionRepo, get_database
 from ..mediator_client import MediatorClient
 from ..webhook_client import get_webhook_client
+from ..http_session import get_http_session
+from ..ref_cache import get_reference_cache
 from ..event_logger import EventLogger
+from ..checkpoint import CompletionCheckpointer
 from .llm2_custom_rules import CustomRuleExecutor
 
 logger = structlog.get_logger()
@@ -22,7 +25,7 @@ class AuditFormRepo:
         self.db = db
     
     def get_audit_form_questions(self, audit_form_id: int) -> List[Dict]:
-        """Get all audit form questions with sections."""
+        """Get all audit form questions with sections (cached)."""
         query = """
             SELECT 
                 afsqm.*, 
@@ -38,7 +41,9 @@ class AuditFormRepo:
                 WHERE auditFormId = %s
             )
         """
-        return self.db.execute_query(query, (audit_form_id, audit_form_id))
+        return get_reference_cache().get_or_load(
+            "audit_form", audit_form_id, lambda: self.db.execute_query(query, (audit_form_id, audit_form_id))
+        )
 
 
 class AuditAnswerRepo:
@@ -164,15 +169,15 @@ class LLM2Stage:
     
     async def call_nlp_api(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Call the NLP API directly (not via GPU mediator)."""
-        async with aiohttp.ClientSession(timeout=self.timeout) as session:
-            try:
-                async with session.post(self.api_url, json=payload) as resp:
-                    result = await resp.json()
-                    logger.info("nlp_api_q2_called", status=resp.status)
-                    return result
-            except Exception as e:
-                logger.error("nlp_api_q2_failed", error=str(e))
-                raise
+        session = get_http_session()
+        try:
+            async with session.post(self.api_url, json=payload, timeout=self.timeout) as resp:
+                result = await resp.json()
+                logger.info("nlp_api_q2_called", status=resp.status)
+                return result
+        except Exception as e:
+            logger.error("nlp_api_q2_failed", error=str(e))
+            raise
     
     async def classify_trade(self, transcript_text: str, language: str) -> str:
         """
@@ -328,11 +333,11 @@ class LLM2Stage:
             # Let's assume we have a method to get it
             from ..database import ProcessRepo
             process_repo = ProcessRepo(self.db)
-            process_info = process_repo.get_by_id(process_id)
+            process_info = await self.db.run(process_repo.get_by_id, process_id)
             audit_form_id = process_info.get('auditFormId', 1) if process_info else 1
             
             # Get audit form questions
-            audit_form_questions = self.audit_form_repo.get_audit_form_questions(audit_form_id)
+            audit_form_questions = await self.db.run(self.audit_form_repo.get_audit_form_questions, audit_form_id)
             
             if not audit_form_questions:
                 logger.warning("no_audit_questions_found", audit_form_id=audit_form_id)
@@ -341,7 +346,7 @@ class LLM2Stage:
             logger.info("audit_questions_loaded", count=len(audit_form_questions), call_id=call_id)
             
             # Get transcript
-            transcript_text = self._get_transcript_text(call_id)
+            transcript_text = await self.db.run(self._get_transcript_text, call_id)
             
             if not transcript_text:
                 logger.warning("no_transcript_found", call_id=call_id)
@@ -423,12 +428,31 @@ class LLM2Stage:
             
             # Insert all audit answers
             if audit_answers:
-                count = self.audit_answer_repo.insert_many(audit_answers)
+                count = await self.db.run(self.audit_answer_repo.insert_many, audit_answers)
                 logger.info("audit_answers_inserted", call_id=call_id, count=count)
             
         except Exception as e:
             logger.error("llm2_processing_failed", call_id=call_id, error=str(e))
     
+    def complete_call(self, call_record: Dict, checkpointer: CompletionCheckpointer):
+        """Mark a call Complete, send its webhook and checkpoint it (blocking)."""
+        audio_name = call_record['audioName']
+        self.call_repo.update_status(
+            audio_name,
+            "AuditDone",
+            "Complete"
+        )
+
+        # Send webhook notification
+        try:
+            webhook_client = get_webhook_client()
+            webhook_client.notify_call_status(call_record['id'], "Complete")
+        except Exception as webhook_err:
+            logger.error("webhook_failed", call_id=call_record['id'], status="Complete", error=str(webhook_err))
+
+        EventLogger.file_complete(call_record['batchId'], 'llm2', audio_name, status='success')
+        checkpointer.add(audio_name)
+    
     async def execute(self, batch_id: int, previous_container: Optional[str] = None):
         """
         Execute LLM2 stage for audit question answering with parallel API calls.
@@ -457,6 +481,9 @@ class LLM2Stage:
         max_concurrent = len(self.settings.gpu_machine_list)
         semaphore = asyncio.Semaphore(max_concurrent)
 
+        # Completion flags are checkpointed in small chunks as calls finish
+        checkpointer = CompletionCheckpointer(self.file_dist_repo, batch_id, 'llm2Done')
+
         async def process_single_call(call_record):
             """Process a single call with concurrency limit."""
             async with semaphore:
@@ -466,29 +493,16 @@ class LLM2Stage:
                 try:
                     await self.process_call(call_record)
 
-                    # Update call status
-                    self.call_repo.update_status(
-                        audio_name,
-                        "AuditDone",
-                        "Complete"
-                    )
-
-                    # Send webhook notification
-                    try:
-                        webhook_client = get_webhook_client()
-                        webhook_client.notify_call_status(call_record['id'], "Complete")
-                    except Exception as webhook_err:
-                        logger.error("webhook_failed", call_id=call_record['id'], status="Complete", error=str(webhook_err))
-
-                    EventLogger.file_complete(batch_id, 'llm2', audio_name, status='success')
+                    # Update call status, notify and checkpoint off the event loop
+                    await self.db.run(self.complete_call, call_record, checkpointer)
                     return True, audio_name
 
                 except Exception as e:
                     logger.error("llm2_call_processing_failed",
                                call_id=call_record['id'],
                                error=str(e))
-                    EventLogger.file_error(batch_id, 'llm2', audio_name, str(e), 
-                                         payload={"call_id": call_record['id'], "audio_name": audio_name})
+                    await self.db.run(EventLogger.file_error, batch_id, 'llm2', audio_name, str(e),
+                                      payload={"call_id": call_record['id'], "audio_name": audio_name})
                     return False, audio_name
 
         # Create tasks for all calls
@@ -496,7 +510,10 @@ class LLM2Stage:
 
         # Execute all in parallel (with concurrency limit)
         logger.info("llm2_processing_parallel", max_concurrent=max_concurrent)
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        try:
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            await self.db.run(checkpointer.flush)
 
         # Count successes and track successful files
         successful_files = []
@@ -514,10 +531,7 @@ class LLM2Stage:
 
         successful = len(successful_files)
 
-        # Mark successful files as complete in fileDistribution
-        if successful_files:
-            self.file_dist_repo.mark_stage_done(successful_files, batch_id, 'llm2Done')
-            logger.info("files_marked_llm2_complete", count=len(successful_files))
+        logger.info("files_marked_llm2_complete", count=checkpointer.flushed)
 
         # Log stage complete
         EventLogger.stage_complete(batch_id, 'llm2', successful, failed, metadata={
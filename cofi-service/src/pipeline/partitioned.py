@@ -0,0 +1,305 @@
+"""LID and STT running concurrently on disjoint GPU pools."""
+import asyncio
+from typing import Any, Dict, List, Optional, Set, Tuple
+import structlog
+
+from .base import PipelineStage
+from .lid_stage import LIDStage
+from .stt_stage import STTStage
+from ..config import get_settings
+from ..database import BatchExecutionLogRepo
+from ..file_manager import FileManager
+from ..gpu_queue import GpuWorkQueue, log_queue_stats
+from ..event_logger import EventLogger
+
+logger = structlog.get_logger()
+
+
+class PartitionedLidStt:
+    """
+    Runs LID and STT at the same time on two GPU pools.
+
+    The GPU list is split into a LID pool and an STT pool, each running
+    only its own container. A file goes to STT as soon as its LID result
+    is stored and its call record updated, so transcription starts minutes
+    into the batch instead of after LID has finished everywhere.
+
+    Unless audio storage is shared, each file lives only on the GPU it was
+    distributed to; it is uploaded again from the batch directory to a
+    GPU of the other pool before being processed there.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.lid = LIDStage()
+        self.stt = STTStage()
+        self.mediator = self.lid.mediator
+        self.planner = self.lid.planner
+        self.db = self.lid.db
+        self.file_dist_repo = self.lid.file_dist_repo
+        self.call_repo = self.stt.call_repo
+        self.language_repo = self.stt.language_repo
+        self.log_repo = BatchExecutionLogRepo(self.db)
+        self.file_manager = FileManager()
+        self.retry_policy = self.mediator.retry_policy
+
+        # File -> GPUs that have a copy of it
+        self._present: Dict[str, Set[str]] = {}
+        self._upload_locks: Dict[str, asyncio.Lock] = {}
+
+    def plan_pools(self, gpu_ips: List[str]) -> Tuple[List[str], List[str]]:
+        """
+        Split GPUs into a LID pool and an STT pool.
+
+        Pools are sized so both stages drain at about the same rate, using
+        the per-GPU seconds-per-file of each stage measured in recent
+        batches; without history, PARTITION_LID_SHARE of the GPUs run LID.
+
+        Returns:
+            (lid_gpus, stt_gpus), each with at least one GPU
+        """
+        lookback = self.settings.distribution_throughput_lookback
+        lid_share = self.settings.partition_lid_share
+        try:
+            lid_rates = self.log_repo.get_gpu_throughput(self.lid.stage_name, lookback)
+            stt_rates = self.log_repo.get_gpu_throughput(self.stt.stage_name, lookback)
+            if lid_rates and stt_rates:
+                lid_seconds = len(lid_rates) / sum(lid_rates.values())
+                stt_seconds = len(stt_rates) / sum(stt_rates.values())
+                lid_share = lid_seconds / (lid_seconds + stt_seconds)
+        except Exception as e:
+            logger.warning("partition_throughput_unavailable", error=str(e))
+
+        lid_count = min(max(round(len(gpu_ips) * lid_share), 1), len(gpu_ips) - 1)
+        lid_gpus, stt_gpus = gpu_ips[:lid_count], gpu_ips[lid_count:]
+        logger.info("gpu_pools_planned", lid=lid_gpus, stt=stt_gpus, lid_share=round(lid_share, 3))
+        return lid_gpus, stt_gpus
+
+    async def _ensure_present(self, gpu_ip: str, file_name: str):
+        """Upload a file to a GPU from the batch directory if it is not there yet."""
+        if self.settings.shared_audio_storage or gpu_ip in self._present.get(file_name, ()):
+            return
+        key = f"{gpu_ip}/{file_name}"
+        lock = self._upload_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            if gpu_ip in self._present.get(file_name, ()):
+                return
+            try:
+                file_path = self.file_manager.get_batch_directory() / file_name
+                await self.mediator.upload_file(gpu_ip, str(file_path), file_name)
+                self._present.setdefault(file_name, set()).add(gpu_ip)
+            finally:
+                # Waiters still hold the lock object; later callers see _present
+                if self._upload_locks.get(key) is lock:
+                    del self._upload_locks[key]
+
+    @staticmethod
+    def _pick(queues: Dict[str, GpuWorkQueue], preferred: Optional[str]) -> str:
+        """Use the GPU that already has the file, else the least-loaded one."""
+        if preferred in queues:
+            return preferred
+        return min(queues, key=lambda ip: queues[ip].load)
+
+    def _update_call_from_lid(self, file_name: str, batch_id: int, response: Dict[str, Any]):
+        """Copy one file's LID result onto its call record."""
+        language, audio_duration = self.lid.parse_response(response)
+        self.call_repo.update_lid_info(
+            audio_name=file_name,
+            batch_id=batch_id,
+            language_id=self.language_repo.get_id_by_code(language),
+            lang_code=language,
+            audio_duration=audio_duration
+        )
+
+    async def execute(
+        self,
+        batch_id: int,
+        previous_container: Optional[str] = None,
+        next_container: Optional[str] = None
+    ):
+        """
+        Run LID and STT for all pending files of a batch.
+
+        Args:
+            batch_id: Current batch ID
+            previous_container: Container of the previous stage to replace
+            next_container: Container to switch each pool to once it is done
+        """
+        lid_gpus, stt_gpus = self.plan_pools(self.settings.gpu_machine_list)
+
+        lid_records = self.file_dist_repo.get_pending_for_stage(batch_id, self.lid.status_column)
+        home = {record['file']: record['ip'] for record in self.file_dist_repo.get_by_batch(batch_id)}
+        self._present = {file_name: {ip} for file_name, ip in home.items()}
+        lid_pending = {record['file'] for record in lid_records}
+
+        # Calls whose LID finished in an earlier run go straight to STT
+        stt_ready = [
+            record for record in self.call_repo.get_by_status(batch_id, "Pending")
+            if record['audioName'] not in lid_pending
+        ]
+
+        EventLogger.stage_start(batch_id, self.lid.stage_name, total_files=len(lid_records), metadata={
+            'container': self.lid.container_name, 'gpu_pool': lid_gpus, 'mode': 'partitioned'
+        })
+        EventLogger.stage_start(batch_id, self.stt.stage_name, metadata={
+            'container': self.stt.container_name, 'gpu_pool': stt_gpus, 'mode': 'partitioned'
+        })
+
+        lid_checkpointer = self.lid.create_checkpointer(batch_id)
+        stt_checkpointer = self.stt.create_checkpointer(batch_id)
+        counts = {'lid_ok': 0, 'lid_failed': 0, 'stt_ok': 0, 'stt_failed': 0}
+        attempts: Dict[Tuple[str, str], int] = {}
+        # Files not yet finally resolved per stage; the pool closes at zero
+        open_files = {'lid': len(lid_records), 'stt': 0}
+        retry_tasks: set = set()
+
+        async def lid_handler(gpu_ip: str, file_name: str) -> Any:
+            await self._ensure_present(gpu_ip, file_name)
+            return await self.mediator.call_processing_api(
+                gpu_ip, self.lid.api_endpoint, self.lid.build_payload(file_name))
+
+        async def stt_handler(gpu_ip: str, file_name: str) -> Any:
+            await self._ensure_present(gpu_ip, file_name)
+            return await self.mediator.call_processing_api(
+                gpu_ip, self.stt.api_endpoint, self.stt.build_payload(file_name))
+
+        lid_queues = {ip: GpuWorkQueue(ip, lid_handler, self.mediator._build_limiter()) for ip in lid_gpus}
+        stt_queues = {ip: GpuWorkQueue(ip, stt_handler, self.mediator._build_limiter()) for ip in stt_gpus}
+
+        def maybe_close():
+            if open_files['lid'] <= 0:
+                for queue in lid_queues.values():
+                    queue.close()
+                if open_files['stt'] <= 0:
+                    for queue in stt_queues.values():
+                        queue.close()
+
+        async def enqueue_stt(record: Dict[str, Any]):
+            # Screening writes skipped calls and sends their webhook
+            if await self.db.run(self.stt.screen_call, record) is not None:
+                return
+            file_name = record['audioName']
+            open_files['stt'] += 1
+            stt_queues[self._pick(stt_queues, home.get(file_name))].put(file_name)
+
+        async def requeue(queue: GpuWorkQueue, file_name: str, delay: float):
+            await asyncio.sleep(delay)
+            queue.put(file_name)
+
+        def schedule_retry(stage: str, queues: Dict[str, GpuWorkQueue], gpu_ip: str,
+                           file_name: str, error: Exception) -> bool:
+            key = (stage, file_name)
+            attempts[key] = attempts.get(key, 0) + 1
+            if not self.retry_policy.should_retry(error, attempts[key]):
+                return False
+            delay = self.retry_policy.backoff(attempts[key])
+            logger.warning("file_retry_scheduled", stage=stage, file=file_name, gpu=gpu_ip,
+                           attempt=attempts[key], delay=round(delay, 1), error=str(error) or type(error).__name__)
+            task = asyncio.create_task(requeue(queues[gpu_ip], file_name, delay))
+            retry_tasks.add(task)
+            task.add_done_callback(retry_tasks.discard)
+            return True
+
+        async def log_progress(stage: PipelineStage, ok: int, failed: int, total: Optional[int]):
+            done = ok + failed
+            if done % self.settings.progress_update_interval == 0:
+                await self.db.run(EventLogger.stage_progress, batch_id, stage.stage_name, processed_files=ok,
+                                  total_files=total, metadata={'files_processed': done, 'mode': 'partitioned'})
+
+        # Blocking DB persistence, run on the DB thread pool. One unit of
+        # work per file (STT is handed each file as soon as its LID result
+        # is stored, so results are not grouped); success events, completion
+        # flags and webhooks only follow a commit.
+        def persist_lid(gpu_ip: str, file_name: str, result: Any) -> Optional[Dict[str, Any]]:
+            with self.db.transaction():
+                self.lid.process_response(file_name, result, gpu_ip, batch_id)
+                self._update_call_from_lid(file_name, batch_id, result)
+                self.lid.log_complete_after_commit(batch_id, file_name, gpu_ip, result)
+                self.db.after_commit(lid_checkpointer.add, file_name)
+            return self.call_repo.get_by_audio_name(file_name, batch_id)
+
+        def persist_stt(gpu_ip: str, file_name: str, result: Any):
+            with self.db.transaction():
+                self.stt.process_response(file_name, result, gpu_ip, batch_id)
+                self.stt.log_complete_after_commit(batch_id, file_name, gpu_ip, result)
+                self.db.after_commit(stt_checkpointer.add, file_name)
+
+        async def on_lid_result(gpu_ip: str, file_name: str, result: Any):
+            if isinstance(result, Exception):
+                if schedule_retry('lid', lid_queues, gpu_ip, file_name, result):
+                    return
+                counts['lid_failed'] += 1
+                await self.db.run(EventLogger.file_error, batch_id, self.lid.stage_name, file_name, str(result), gpu_ip)
+            else:
+                try:
+                    record = await self.db.run(persist_lid, gpu_ip, file_name, result)
+                    counts['lid_ok'] += 1
+                    if record and record.get('status') == "Pending":
+                        await enqueue_stt(record)
+                except Exception as e:
+                    counts['lid_failed'] += 1
+                    logger.error("partitioned_lid_handoff_failed", file=file_name, error=str(e))
+                    await self.db.run(EventLogger.file_error, batch_id, self.lid.stage_name, file_name, str(e), gpu_ip)
+            await log_progress(self.lid, counts['lid_ok'], counts['lid_failed'], len(lid_records))
+            open_files['lid'] -= 1
+            maybe_close()
+
+        async def on_stt_result(gpu_ip: str, file_name: str, result: Any):
+            if isinstance(result, Exception):
+                if schedule_retry('stt', stt_queues, gpu_ip, file_name, result):
+                    return
+                counts['stt_failed'] += 1
+                await self.db.run(EventLogger.file_error, batch_id, self.stt.stage_name, file_name, str(result), gpu_ip)
+            else:
+                try:
+                    await self.db.run(persist_stt, gpu_ip, file_name, result)
+                    await self.stt.send_notifications()
+                    counts['stt_ok'] += 1
+                except Exception as e:
+                    counts['stt_failed'] += 1
+                    logger.error("process_response_failed", file=file_name, error=str(e))
+                    await self.db.run(EventLogger.file_error, batch_id, self.stt.stage_name, file_name, str(e), gpu_ip)
+            await log_progress(self.stt, counts['stt_ok'], counts['stt_failed'], None)
+            open_files['stt'] -= 1
+            maybe_close()
+
+        async def run_pool(stage, queue: GpuWorkQueue, on_result):
+            await self.planner.transition(queue.gpu_ip, previous_container, stage.container_name)
+            await stage.wait_for_gpu_ready(queue.gpu_ip, batch_id)
+            await queue.run(on_result)
+            if next_container:
+                self.planner.schedule(queue.gpu_ip, stage.container_name, next_container)
+
+        # Seed the queues: LID on a LID GPU (preferring the file's home GPU),
+        # STT right away for calls whose LID is already done
+        for record in lid_records:
+            lid_queues[self._pick(lid_queues, record['ip'])].put(record['file'])
+        for record in stt_ready:
+            await enqueue_stt(record)
+        maybe_close()
+
+        all_queues = {**{f"lid:{ip}": q for ip, q in lid_queues.items()},
+                      **{f"stt:{ip}": q for ip, q in stt_queues.items()}}
+        stats_task = asyncio.create_task(
+            log_queue_stats(all_queues, self.settings.gpu_queue_stats_interval, "partitioned")
+        )
+        try:
+            await asyncio.gather(
+                *[run_pool(self.lid, queue, on_lid_result) for queue in lid_queues.values()],
+                *[run_pool(self.stt, queue, on_stt_result) for queue in stt_queues.values()]
+            )
+        finally:
+            stats_task.cancel()
+            for task in list(retry_tasks):
+                task.cancel()
+            await self.db.run(lid_checkpointer.flush)
+            await self.db.run(stt_checkpointer.flush)
+
+        pool_stats = {key: queue.stats() for key, queue in all_queues.items()}
+        EventLogger.stage_complete(batch_id, self.lid.stage_name, counts['lid_ok'], counts['lid_failed'], metadata={
+            'total_files': len(lid_records), 'gpu_pool': lid_gpus, 'gpu_queues': pool_stats
+        })
+        EventLogger.stage_complete(batch_id, self.stt.stage_name, counts['stt_ok'], counts['stt_failed'], metadata={
+            'gpu_pool': stt_gpus, 'gpu_queues': pool_stats
+        })
+        logger.info("partitioned_lid_stt_completed", **counts)
@@ -23,6 +23,7 @@ class STTStage(PipelineStage):
         self.container_name = settings.stt_container
         self.wait_seconds = settings.stt_wait
         self.api_endpoint = settings.stt_api_endpoint
+        self.api_port = settings.stt_port
         self.call_repo = CallRepo(self.db)
         self.transcript_repo = TranscriptRepo(self.db)
         self.language_repo = LanguageRepo(self.db)
@@ -70,6 +71,51 @@ class STTStage(PipelineStage):
             "use_time_based": use_time_based
         }
     
+    @staticmethod
+    def extract_chunks(response: Any) -> List[Dict[str, Any]]:
+        """Transcript chunks of an STT response."""
+        # Response can be: [metadata, chunks] or just chunks or dict with data
+        if isinstance(response, list) and len(response) >= 2:
+            # Format: [metadata, chunks]
+            return response[1] if isinstance(response[1], list) else []
+        if isinstance(response, list):
+            # Format: just chunks
+            return response
+        if isinstance(response, dict):
+            # Format: {"data": {"chunks": [...]}} or similar
+            data = response.get("data", response)
+            return data.get("chunks", data.get("transcripts", []))
+        return []
+    
+    def summarize_response(self, response: Any) -> Any:
+        """
+        Transcript statistics instead of the chunks themselves (the
+        transcript is already stored in the transcript table).
+        """
+        chunks = [chunk for chunk in self.extract_chunks(response) if isinstance(chunk, dict)]
+        confidences = []
+        for chunk in chunks:
+            try:
+                confidence = float(chunk.get('confidence'))
+            except (TypeError, ValueError):
+                continue
+            if confidence == confidence:  # skip NaN
+                confidences.append(confidence)
+        summary = {
+            'chunks': len(chunks),
+            'speakers': len({str(chunk.get('speaker')) for chunk in chunks}),
+            'duration_sec': max((float(chunk.get('end_time') or 0) for chunk in chunks), default=0.0),
+            'characters': sum(len(chunk.get('transcript') or '') for chunk in chunks),
+            'avg_confidence': round(sum(confidences) / len(confidences), 3) if confidences else None
+        }
+        # Top-level status/metadata ([metadata, chunks] or dict responses)
+        metadata = response[0] if isinstance(response, list) and len(response) >= 2 else response
+        if isinstance(metadata, dict):
+            for key in ('status', 'language', 'audio_language', 'message'):
+                if key in metadata:
+                    summary[key] = metadata[key]
+        return summary
+    
     def process_response(self, file_name: str, response: Dict[str, Any], gpu_ip: str, batch_id: int):
         """
         Process STT API response and store transcripts.
@@ -103,79 +149,58 @@ class STTStage(PipelineStage):
             language_code = call_record.get('lang', 'hi')
             language_id = self.language_repo.get_id_by_code(language_code)
             
-            # Parse STT response
-            # Response can be: [metadata, chunks] or just chunks or dict with data
-            all_chunks = []
-            
-            if isinstance(response, list) and len(response) >= 2:
-                # Format: [metadata, chunks]
-                all_chunks = response[1] if isinstance(response[1], list) else []
-            elif isinstance(response, list):
-                # Format: just chunks
-                all_chunks = response
-            elif isinstance(response, dict):
-                # Format: {"data": {"chunks": [...]}} or similar
-                data = response.get("data", response)
-                all_chunks = data.get("chunks", data.get("transcripts", []))
+            all_chunks = self.extract_chunks(response)
             
-            if not all_chunks:
-                logger.warning("no_transcript_chunks", file=file_name)
-            else:
-                # Insert transcript records
-                transcript_records = []
-                for chunk in all_chunks:
-                    # Handle confidence - check for 'nan' string
-                    confidence = chunk.get('confidence')
-                    if confidence == 'nan' or confidence == 'NaN':
-                        confidence = None
-                    elif confidence is not None:
-                        try:
-                            confidence = float(confidence)
-                        except (ValueError, TypeError):
+            # Transcripts and call status are one unit of work: both or neither
+            with self.db.transaction():
+                if not all_chunks:
+                    logger.warning("no_transcript_chunks", file=file_name)
+                else:
+                    # Insert transcript records
+                    transcript_records = []
+                    for chunk in all_chunks:
+                        # Handle confidence - check for 'nan' string
+                        confidence = chunk.get('confidence')
+                        if confidence == 'nan' or confidence == 'NaN':
                             confidence = None
+                        elif confidence is not None:
+                            try:
+                                confidence = float(confidence)
+                            except (ValueError, TypeError):
+                                confidence = None
                     
-                    record = {
-                        'callId': call_id,
-                        'languageId': language_id,
-                        'startTime': float(chunk.get('start_time', 0)),
-                        'endTime': float(chunk.get('end_time', 0)),
-                        'speaker': 'Speaker ' + str(chunk.get('speaker', '0')),
-                        'text': chunk.get('transcript', ''),
-                        'confidence': confidence
-                    }
-                    transcript_records.append(record)
+                        record = {
+                            'callId': call_id,
+                            'languageId': language_id,
+                            'startTime': float(chunk.get('start_time', 0)),
+                            'endTime': float(chunk.get('end_time', 0)),
+                            'speaker': 'Speaker ' + str(chunk.get('speaker', '0')),
+                            'text': chunk.get('transcript', ''),
+                            'confidence': confidence
+                        }
+                        transcript_records.append(record)
                 
-                # Bulk insert transcripts
-                if transcript_records:
-                    inserted = self.transcript_repo.insert_many(transcript_records)
-                    logger.info("transcripts_inserted", file=file_name, count=inserted)
+                    # Bulk insert transcripts
+                    if transcript_records:
+                        inserted = self.transcript_repo.insert_many(transcript_records)
+                        logger.info("transcripts_inserted", file=file_name, count=inserted)
             
-            # Update call status
-            self.call_repo.update_status(file_name, "Pending", "TranscriptDone")
-            logger.info("stt_status_updated", file=file_name, new_status="TranscriptDone")
+                # Update call status
+                self.call_repo.update_status(file_name, "Pending", "TranscriptDone")
+                logger.info("stt_status_updated", file=file_name, new_status="TranscriptDone")
 
-            # Send webhook notification
+            # Webhook notification, sent once the writes have committed
             if file_name in self._call_cache:
-                call_id = self._call_cache[file_name]['id']
-                try:
-                    webhook_client = get_webhook_client()
-                    webhook_client.notify_call_status(call_id, "TranscriptDone")
-                except Exception as webhook_err:
-                    logger.error("webhook_failed", call_id=call_id, status="TranscriptDone", error=str(webhook_err))
+                self.notify_after_commit(self._call_cache[file_name]['id'], "TranscriptDone")
 
         except Exception as e:
             logger.error("stt_response_processing_failed", file=file_name, error=str(e))
             # Still update status to avoid reprocessing
             self.call_repo.update_status(file_name, "Pending", "TranscriptDone")
 
-            # Send webhook notification even on error
+            # Webhook notification even on error
             if file_name in self._call_cache:
-                call_id = self._call_cache[file_name]['id']
-                try:
-                    webhook_client = get_webhook_client()
-                    webhook_client.notify_call_status(call_id, "TranscriptDone")
-                except Exception as webhook_err:
-                    logger.error("webhook_failed", call_id=call_id, status="TranscriptDone", error=str(webhook_err))
+                self.notify_after_commit(self._call_cache[file_name]['id'], "TranscriptDone")
     
     def get_pending_files(self, batch_id: int) -> Dict[str, List[str]]:
         """
@@ -187,62 +212,24 @@ class STTStage(PipelineStage):
         """
         records = self.call_repo.get_by_status(batch_id, "Pending")
         
-        # Supported languages for STT
-        supported_languages = ['en', 'hi', 'hinglish']
-        
         # Cache call records and group by GPU IP
         file_gpu_mapping: Dict[str, List[str]] = {}
         short_call_count = 0
         unsupported_count = 0
         
         for record in records:
-            audio_name = record['audioName']
-            language = record.get('lang', '')
-            audio_duration = record.get('audioDuration', 0)
-            
-            # Check if call is too short (less than 5 seconds)
-            if audio_duration < 5:
-                # Mark as ShortCall and skip
-                self.call_repo.update_status(audio_name, "Pending", "ShortCall")
-                logger.info("short_call_skipped",
-                           file=audio_name,
-                           duration=audio_duration)
-
-                # Send webhook notification
-                try:
-                    webhook_client = get_webhook_client()
-                    webhook_client.notify_call_status(record['id'], "ShortCall")
-                except Exception as webhook_err:
-                    logger.error("webhook_failed", call_id=record['id'], status="ShortCall", error=str(webhook_err))
-
+            skipped_status = self.screen_call(record)
+            if skipped_status == "ShortCall":
                 short_call_count += 1
                 continue
-            
-            # Check if language is supported
-            if language not in supported_languages:
-                # Mark as UnsupportedLanguage and skip
-                self.call_repo.update_status(audio_name, "Pending", "UnsupportedLanguage")
-                logger.info("unsupported_language_skipped",
-                           file=audio_name,
-                           language=language)
-
-                # Send webhook notification
-                try:
-                    webhook_client = get_webhook_client()
-                    webhook_client.notify_call_status(record['id'], "UnsupportedLanguage")
-                except Exception as webhook_err:
-                    logger.error("webhook_failed", call_id=record['id'], status="UnsupportedLanguage", error=str(webhook_err))
-
+            if skipped_status == "UnsupportedLanguage":
                 unsupported_count += 1
                 continue
             
-            # Cache for later use
-            self._call_cache[audio_name] = record
-            
             ip = record.get('ip') or self.settings.gpu_machine_list[0]
             if ip not in file_gpu_mapping:
                 file_gpu_mapping[ip] = []
-            file_gpu_mapping[ip].append(audio_name)
+            file_gpu_mapping[ip].append(record['audioName'])
         
         if short_call_count > 0:
             logger.info("short_calls_marked", count=short_call_count)
@@ -250,3 +237,58 @@ class STTStage(PipelineStage):
             logger.info("unsupported_languages_marked", count=unsupported_count)
         
         return file_gpu_mapping
+    
+    def screen_call(self, record: Dict[str, Any]) -> Optional[str]:
+        """
+        Decide whether a pending call goes to STT, marking skipped calls.
+        
+        Args:
+            record: Call record with status 'Pending'
+        
+        Returns:
+            None if the call should be transcribed (it is cached for
+            process_response), else the status it was marked with
+            ('ShortCall' or 'UnsupportedLanguage')
+        """
+        # Supported languages for STT
+        supported_languages = ['en', 'hi', 'hinglish']
+        
+        audio_name = record['audioName']
+        language = record.get('lang', '')
+        audio_duration = record.get('audioDuration', 0)
+        
+        # Check if call is too short (less than 5 seconds)
+        if audio_duration < 5:
+            # Mark as ShortCall and skip
+            self.call_repo.update_status(audio_name, "Pending", "ShortCall")
+            logger.info("short_call_skipped",
+                       file=audio_name,
+                       duration=audio_duration)
+
+            # Send webhook notification
+            try:
+                webhook_client = get_webhook_client()
+                webhook_client.notify_call_status(record['id'], "ShortCall")
+            except Exception as webhook_err:
+                logger.error("webhook_failed", call_id=record['id'], status="ShortCall", error=str(webhook_err))
+            return "ShortCall"
+        
+        # Check if language is supported
+        if language not in supported_languages:
+            # Mark as UnsupportedLanguage and skip
+            self.call_repo.update_status(audio_name, "Pending", "UnsupportedLanguage")
+            logger.info("unsupported_language_skipped",
+                       file=audio_name,
+                       language=language)
+
+            # Send webhook notification
+            try:
+                webhook_client = get_webhook_client()
+                webhook_client.notify_call_status(record['id'], "UnsupportedLanguage")
+            except Exception as webhook_err:
+                logger.error("webhook_failed", call_id=record['id'], status="UnsupportedLanguage", error=str(webhook_err))
+            return "UnsupportedLanguage"
+        
+        # Cache for later use
+        self._call_cache[audio_name] = record
+        return None
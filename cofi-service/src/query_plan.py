@@ -0,0 +1,84 @@
+"""Startup check that the hot repository queries use indexes."""
+from typing import Any, Dict, List, Tuple
+import structlog
+
+from .config import get_settings
+from .database import (
+    Database, BatchExecutionLogRepo, CallRepo, FileDistributionRepo, FileStateRepo,
+    LidStatusRepo, TranscriptRepo, STAGE_COLUMNS
+)
+from .pipeline.llm2_custom_rules import CallConversationRepo
+from .rule_engine import TradeAudioMappingRepo
+
+logger = structlog.get_logger()
+
+# (name, query, sample params) for the per-batch / per-call statements the
+# pipeline runs thousands of times, taken from the repositories so the
+# check always sees the SQL that actually runs. Indexes for these are in
+# database/migrations/add_hot_path_indexes.sql.
+HOT_QUERIES: List[Tuple[str, str, tuple]] = [
+    *[
+        (f"fileDistribution.pending.{column}",
+         FileDistributionRepo.PENDING_QUERY.format(stage_column=column), (0,))
+        for column in STAGE_COLUMNS
+    ],
+    ("fileDistribution.mark_stage_done",
+     FileDistributionRepo.MARK_DONE_QUERY.format(stage_column=STAGE_COLUMNS[0], placeholders="%s, %s"),
+     ("a.wav", "b.wav", 0)),
+    ("call.get_by_status", CallRepo.BY_STATUS_QUERY, (0, "Pending")),
+    ("call.get_by_audio_name", CallRepo.BY_AUDIO_NAME_QUERY, ("a.wav", 0)),
+    ("lidStatus.get_by_batch", LidStatusRepo.BY_BATCH_QUERY, (0,)),
+    ("tradeAudioMapping.get_by_audio_file", TradeAudioMappingRepo.BY_AUDIO_FILE_QUERY, ("a.wav",)),
+    ("transcript.get_by_call_id", TranscriptRepo.BY_CALL_ID_QUERY, (0,)),
+    ("callConversation.get_by_call_id", CallConversationRepo.BY_CALL_ID_QUERY, (0,)),
+    ("batchExecutionLog.get_latest_events", BatchExecutionLogRepo.SINCE_QUERY, (0, 0, 100)),
+    ("batchExecutionLog.get_by_stage", BatchExecutionLogRepo.BY_STAGE_QUERY, (0, "stt", 500)),
+]
+
+# Checked when FILE_STATE_ENABLED (table from create_file_state.sql)
+FILE_STATE_QUERIES: List[Tuple[str, str, tuple]] = [
+    ("fileState.get_pending", FileStateRepo.PENDING_QUERY + " ORDER BY id LIMIT %s", (0, 2, 100)),
+]
+
+
+def explain(db: Database, query: str, params: tuple) -> List[Dict[str, Any]]:
+    """Run EXPLAIN for a query and return the plan rows."""
+    return db.execute_query(f"EXPLAIN {query}", params)
+
+
+def verify_query_plans(db: Database) -> Dict[str, List[str]]:
+    """
+    EXPLAIN every hot statement and warn about full table scans.
+
+    A plan row with access type ALL means MySQL reads the whole table,
+    which usually means a missing index migration.
+
+    Args:
+        db: Database instance
+
+    Returns:
+        Dict mapping query name to the tables it scans fully (only
+        queries with full scans are included)
+    """
+    queries = HOT_QUERIES + (FILE_STATE_QUERIES if get_settings().file_state_enabled else [])
+    full_scans: Dict[str, List[str]] = {}
+    for name, query, params in queries:
+        try:
+            plan = explain(db, query, params)
+        except Exception as e:
+            logger.warning("query_plan_check_failed", query=name, error=str(e))
+            continue
+
+        scanned = [row.get('table') for row in plan if (row.get('type') or '').upper() == 'ALL']
+        if scanned:
+            full_scans[name] = scanned
+            logger.warning(
+                "query_plan_full_scan",
+                query=name,
+                tables=scanned,
+                possible_keys=[row.get('possible_keys') for row in plan],
+                rows=[row.get('rows') for row in plan]
+            )
+
+    logger.info("query_plans_verified", checked=len(queries), full_scans=len(full_scans))
+    return full_scans
@@ -0,0 +1,188 @@
+"""Read-through, in-process cache for slowly changing reference data."""
+import copy
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import structlog
+
+from .config import get_settings
+
+logger = structlog.get_logger()
+
+
+class ReferenceCache:
+    """
+    TTL cache for reference rows (languages, processes, audit forms).
+
+    Entries are grouped by namespace (usually the table) so one kind of
+    data can be invalidated without flushing the rest. Concurrent misses
+    for the same key load it once; other keys are not blocked meanwhile.
+    Callers get copies of cached lists/dicts, so mutating a result never
+    changes what the next caller sees.
+
+    The cache is per process. With a `version_loader`, namespaces whose
+    version changed (see ReferenceCacheVersionRepo) are dropped, checked
+    at most every `version_check_interval` seconds, so an invalidation
+    made by another process (e.g. the API) reaches this one too.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 600.0,
+        enabled: bool = True,
+        version_loader: Optional[Callable[[], Dict[str, int]]] = None,
+        version_check_interval: float = 5.0
+    ):
+        self.ttl = ttl
+        self.enabled = enabled
+        self.version_loader = version_loader
+        self.version_check_interval = version_check_interval
+        self._versions: Optional[Dict[str, int]] = None
+        self._next_version_check = 0.0
+        self._entries: Dict[Tuple[str, Hashable], Tuple[float, Any]] = {}
+        self._load_locks: Dict[Tuple[str, Hashable], threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+        self._invalidations = 0
+
+    def get_or_load(self, namespace: str, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Return a cached value, loading (and caching) it on a miss or expiry.
+
+        Args:
+            namespace: Group of entries, e.g. "language"
+            key: Key within the namespace
+            loader: Loads the value from the database
+
+        Returns:
+            The cached or freshly loaded value (None results are cached too)
+        """
+        if not self.enabled:
+            return loader()
+        self._check_versions()
+
+        entry_key = (namespace, key)
+        value = self._lookup(entry_key)
+        if value is not _MISSING:
+            return value
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(entry_key, threading.Lock())
+        with load_lock:
+            # Another thread may have loaded it while we waited
+            value = self._lookup(entry_key)
+            if value is not _MISSING:
+                return value
+            with self._lock:
+                self._misses[namespace] = self._misses.get(namespace, 0) + 1
+            value = loader()
+            with self._lock:
+                self._entries[entry_key] = (time.monotonic() + self.ttl, value)
+                self._load_locks.pop(entry_key, None)
+        return copy.deepcopy(value)
+
+    def _lookup(self, entry_key: Tuple[str, Hashable]) -> Any:
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is None or entry[0] < time.monotonic():
+                return _MISSING
+            self._hits[entry_key[0]] = self._hits.get(entry_key[0], 0) + 1
+            value = entry[1]
+        return copy.deepcopy(value)
+
+    def _check_versions(self):
+        """Drop namespaces invalidated by other processes since the last check."""
+        if self.version_loader is None or self.version_check_interval <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_version_check:
+                return
+            self._next_version_check = now + self.version_check_interval
+        try:
+            versions = self.version_loader()
+        except Exception as e:
+            logger.warning("reference_cache_version_check_failed", error=str(e))
+            return
+        with self._lock:
+            previous, self._versions = self._versions, versions
+        if previous is None:
+            # First check: nothing cached before it, so just remember versions
+            return
+        changed = [namespace for namespace, version in versions.items() if previous.get(namespace) != version]
+        if "*" in changed:
+            self.invalidate()
+            return
+        for namespace in changed:
+            self.invalidate(namespace)
+
+    def invalidate(self, namespace: Optional[str] = None, key: Optional[Hashable] = None) -> int:
+        """
+        Drop cached entries.
+
+        Args:
+            namespace: Only this namespace (all namespaces if None)
+            key: Only this key within the namespace
+
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            if namespace is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+            elif key is not None:
+                dropped = 1 if self._entries.pop((namespace, key), None) is not None else 0
+            else:
+                keys = [k for k in self._entries if k[0] == namespace]
+                for k in keys:
+                    del self._entries[k]
+                dropped = len(keys)
+            self._invalidations += 1
+        logger.info("reference_cache_invalidated", namespace=namespace or "*", key=key, dropped=dropped)
+        return dropped
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counts per namespace and current size."""
+        with self._lock:
+            namespaces = sorted(set(self._hits) | set(self._misses))
+            per_namespace = {}
+            for namespace in namespaces:
+                hits = self._hits.get(namespace, 0)
+                misses = self._misses.get(namespace, 0)
+                per_namespace[namespace] = {
+                    'hits': hits,
+                    'misses': misses,
+                    'hit_rate': round(hits / (hits + misses), 3) if hits + misses else 0.0,
+                    'entries': sum(1 for k in self._entries if k[0] == namespace)
+                }
+            return {
+                'enabled': self.enabled,
+                'ttl_seconds': self.ttl,
+                'entries': len(self._entries),
+                'invalidations': self._invalidations,
+                'namespaces': per_namespace
+            }
+
+
+_MISSING = object()
+
+# Cache singleton (shared by all repositories in the process)
+_cache: Optional[ReferenceCache] = None
+
+
+def get_reference_cache() -> ReferenceCache:
+    """Get or create the reference-data cache."""
+    global _cache
+    if _cache is None:
+        # Imported here: database imports this module
+        from .database import get_database, ReferenceCacheVersionRepo
+        settings = get_settings()
+        _cache = ReferenceCache(
+            ttl=settings.ref_cache_ttl,
+            enabled=settings.ref_cache_enabled,
+            version_loader=ReferenceCacheVersionRepo(get_database()).get_versions,
+            version_check_interval=settings.ref_cache_version_check_interval
+        )
+    return _cache
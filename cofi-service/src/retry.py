@@ -0,0 +1,66 @@
+"""Retry policy with exponential backoff and jitter for transient failures."""
+import asyncio
+import random
+import aiohttp
+
+from .config import get_settings
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed request is retried and how long to wait first.
+
+    Only transient failures are retried: timeouts, connection errors and
+    HTTP 429/5xx responses. The delay doubles per attempt up to max_delay,
+    and a random fraction (jitter) is taken off so retries from many files
+    failing together do not hit the GPU again in lockstep.
+    """
+
+    RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 5.0,
+        max_delay: float = 120.0,
+        jitter: float = 0.5
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = min(max(jitter, 0.0), 1.0)
+
+    @classmethod
+    def from_settings(cls) -> "RetryPolicy":
+        """Build the policy from service settings."""
+        settings = get_settings()
+        return cls(
+            max_attempts=settings.retry_max_attempts,
+            base_delay=settings.retry_base_delay,
+            max_delay=settings.retry_max_delay,
+            jitter=settings.retry_jitter
+        )
+
+    def is_transient(self, error: BaseException) -> bool:
+        """Whether an error is worth retrying (the same request may succeed later)."""
+        if isinstance(error, aiohttp.ClientResponseError):
+            return error.status in self.RETRYABLE_STATUS
+        return isinstance(error, (
+            asyncio.TimeoutError,
+            aiohttp.ClientConnectionError,
+            aiohttp.ClientPayloadError,
+            ConnectionError
+        ))
+
+    def should_retry(self, error: BaseException, attempts: int) -> bool:
+        """
+        Args:
+            error: Error from the last attempt
+            attempts: Number of attempts made so far (including the failed one)
+        """
+        return attempts < self.max_attempts and self.is_transient(error)
+
+    def backoff(self, attempts: int) -> float:
+        """Seconds to wait before the next attempt, after `attempts` failures."""
+        delay = min(self.max_delay, self.base_delay * (2 ** max(0, attempts - 1)))
+        return delay * (1 - self.jitter * random.random())
@@ -12,6 +12,8 @@ logger = structlog.get_logger()
 class TradeAudioMappingRepo:
     """Repository for tradeAudioMapping table operations."""
     
+    BY_AUDIO_FILE_QUERY = "SELECT id FROM tradeAudioMapping WHERE audioFileName = %s"
+    
     def __init__(self, db):
         self.db = db
     
@@ -57,17 +59,13 @@ class TradeAudioMappingRepo:
         if not records:
             return 0
         
-        query = """
-            INSERT INTO tradeAudioMapping (
-                tradeMetadataId, orderId, clientCode, regNumber, alNumber,
-                tradeDate, orderPlacedTime, instType, expiryDate, optionType,
-                symbol, comScriptCode, scripName, strikePrice, tradeQuantity,
-                tradePrice, tradeValue, lotQty, voiceRecordingConfirmations,
-                audioFileName, batchId
-            ) VALUES (
-                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-            )
-        """
+        columns = [
+            'tradeMetadataId', 'orderId', 'clientCode', 'regNumber', 'alNumber',
+            'tradeDate', 'orderPlacedTime', 'instType', 'expiryDate', 'optionType',
+            'symbol', 'comScriptCode', 'scripName', 'strikePrice', 'tradeQuantity',
+            'tradePrice', 'tradeValue', 'lotQty', 'voiceRecordingConfirmations',
+            'audioFileName', 'batchId'
+        ]
         
         params_list = []
         for record in records:
@@ -96,7 +94,7 @@ class TradeAudioMappingRepo:
             )
             params_list.append(params)
         
-        return self.db.execute_many(query, params_list)
+        return self.db.bulk_insert("tradeAudioMapping", columns, params_list)
     
     def get_count_by_batch(self, batch_id: int) -> int:
         """Get count of tradeAudioMapping records for a batch."""
@@ -385,16 +383,25 @@ class RuleEngineStep1:
             logger.warning("no_call_metadata_found", batch_id=batch_id)
             return 0
         
-        # Get pending trade metadata
+        # Stream trade metadata (can be millions of rows) instead of loading
+        # the whole batch; mappings are inserted every batch_size rows
         query = "SELECT * FROM tradeMetadata WHERE batchId = %s"
-        trades = self.db.execute_query(query, (batch_id,))
-        
-        logger.info("trades_to_process", count=len(trades))
+        trades = self.db.iter_query(query, (batch_id,))
         
         total_mappings = 0
+        trade_count = 0
         rows_to_insert = []
+        batch_size = 10000
+        batch_num = 0
         
         for trade in trades:
+            trade_count += 1
+            if len(rows_to_insert) >= batch_size:
+                batch_num += 1
+                count = self.trade_audio_repo.insert_many(rows_to_insert)
+                total_mappings += count
+                logger.info("mappings_batch_inserted", batch_num=batch_num, count=count)
+                rows_to_insert = []
             trade['clientCode'] = str(trade.get('clientCode', '')).strip()
             al_number = trade.get('alNumber')
             
@@ -462,17 +469,14 @@ class RuleEngineStep1:
                         call_ref
                     )
         
-        # Bulk insert mappings
+        # Insert remaining mappings
         if rows_to_insert:
-            # Insert in batches of 10000
-            batch_size = 10000
-            for i in range(0, len(rows_to_insert), batch_size):
-                batch_rows = rows_to_insert[i:i + batch_size]
-                count = self.trade_audio_repo.insert_many(batch_rows)
-                total_mappings += count
-                logger.info("mappings_batch_inserted", batch_num=i // batch_size + 1, count=count)
+            batch_num += 1
+            count = self.trade_audio_repo.insert_many(rows_to_insert)
+            total_mappings += count
+            logger.info("mappings_batch_inserted", batch_num=batch_num, count=count)
         
-        logger.info("rule_engine_step1_completed", total_mappings=total_mappings)
+        logger.info("rule_engine_step1_completed", trades=trade_count, total_mappings=total_mappings)
         return total_mappings
     
     def is_processed(self, batch_id: int) -> bool:
@@ -490,20 +494,16 @@ class RuleEngineStep1:
         """
         logger.info("fill_audio_not_found_starting", batch_id=batch_id)
         
-        # Get all calls in this batch
-        query = "SELECT * FROM `call` WHERE batchId = %s"
-        call_records = self.db.execute_query(query, (batch_id,))
+        # Stream the calls of this batch as compact tuples (only the columns used)
+        query = "SELECT id, processId, audioName FROM `call` WHERE batchId = %s"
+        call_records = self.db.iter_query(query, (batch_id,), row_format="tuple")
         
         processed_count = 0
         
-        for call_record in call_records:
-            call_id = call_record['id']
-            process_id = call_record.get('processId', self.settings.process_id)
-            audio_name = call_record['audioName']
+        for call_id, process_id, audio_name in call_records:
             
             # Check if this call has a tradeAudioMapping record
-            query = "SELECT id FROM tradeAudioMapping WHERE audioFileName = %s"
-            trade_mapping = self.db.execute_one(query, (audio_name,))
+            trade_mapping = self.db.execute_one(TradeAudioMappingRepo.BY_AUDIO_FILE_QUERY, (audio_name,))
             
             if not trade_mapping:
                 # No trade mapping found - insert "No trade data found" for first 3 questions
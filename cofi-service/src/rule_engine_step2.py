@@ -5,6 +5,7 @@ from rapidfuzz import fuzz
 import re
 import time
 from collections import defaultdict
+from .database import get_database
 # MySQL connection configuration
 print(14)
 config = {
@@ -1632,13 +1633,15 @@ def process_rule_engine(current_date,batch_id):
     for tr1 in rows:
         tr1["orderId"] = normalize_order_id(tr1["orderId"])
         tradeMetadataData.append(tr1)
-    allTradeMetadataIds = []
-    allTradeMetadataIds = [row['id'] for row in tradeMetadataData]
+    allTradeMetadataIds = set(row['id'] for row in tradeMetadataData)
     
     print("Length of allTradeMetadataIds: ",len(allTradeMetadataIds))
     time.sleep(10)
-    cursor.execute("SELECT * FROM tradeAudioMapping WHERE  batchId = %s", (batch_id,))
-    rows_tradeAudioMappingData = cursor.fetchall()
+    # Stream the batch's mappings (only the non-observatory ones are kept)
+    # instead of loading every row of the batch into memory
+    rows_tradeAudioMappingData = get_database().iter_query(
+        "SELECT * FROM tradeAudioMapping WHERE  batchId = %s", (batch_id,)
+    )
     print('krunal 3')
     
     for tr1 in rows_tradeAudioMappingData:
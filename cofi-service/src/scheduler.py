@@ -0,0 +1,148 @@
+"""Dependency-driven scheduler for orchestrator stages."""
+import asyncio
+import inspect
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+import structlog
+
+logger = structlog.get_logger()
+
+# Resource classes
+RESOURCE_GPU = "gpu"  # Uses GPU containers; GPU nodes run one at a time
+RESOURCE_CPU = "cpu"  # CPU-bound Python work; runs in the executor
+RESOURCE_DB = "db"    # Mostly database I/O; runs in the executor
+
+
+@dataclass
+class StageNode:
+    """
+    One stage in the pipeline graph.
+
+    Attributes:
+        name: Stage name (also used in logs)
+        run: Callable doing the work; coroutine functions (or partials of
+            them) are awaited, plain functions run in the scheduler's thread pool
+        deps: Names of stages that must finish first
+        resource: RESOURCE_GPU, RESOURCE_CPU or RESOURCE_DB
+        enabled: Disabled stages are skipped and count as satisfied
+        is_complete: Resume check; if it returns True the stage is skipped
+    """
+    name: str
+    run: Callable[[], Any]
+    deps: List[str] = field(default_factory=list)
+    resource: str = RESOURCE_CPU
+    enabled: bool = True
+    is_complete: Optional[Callable[[], bool]] = None
+
+
+class StageScheduler:
+    """
+    Runs StageNodes as soon as their dependencies finish.
+
+    GPU nodes are serialized (they share the GPU containers); CPU and DB
+    nodes run concurrently in a thread pool so they never block the event
+    loop driving GPU work. If a node raises, the remaining running nodes
+    are cancelled and the error propagates, like the sequential run did.
+    """
+
+    def __init__(self, nodes: List[StageNode], max_workers: int = 4):
+        self.nodes: Dict[str, StageNode] = {node.name: node for node in nodes}
+        self.max_workers = max_workers
+        self.status: Dict[str, str] = {name: "pending" for name in self.nodes}
+        self.durations: Dict[str, float] = {}
+        self._gpu_lock = asyncio.Lock()
+        self._validate()
+
+    def _validate(self):
+        """Reject unknown dependencies and cycles."""
+        for node in self.nodes.values():
+            for dep in node.deps:
+                if dep not in self.nodes:
+                    raise ValueError(f"Stage '{node.name}' depends on unknown stage '{dep}'")
+
+        visiting, visited = set(), set()
+
+        def visit(name: str):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Stage dependency cycle through '{name}'")
+            visiting.add(name)
+            for dep in self.nodes[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.nodes:
+            visit(name)
+
+    def _ready(self) -> List[StageNode]:
+        return [
+            node for name, node in self.nodes.items()
+            if self.status[name] == "pending"
+            and all(self.status[dep] in ("done", "skipped") for dep in node.deps)
+        ]
+
+    async def _run_node(self, node: StageNode, executor: ThreadPoolExecutor):
+        if not node.enabled:
+            self.status[node.name] = "skipped"
+            logger.info("stage_node_skipped", stage=node.name, reason="disabled")
+            return
+        if node.is_complete and node.is_complete():
+            self.status[node.name] = "skipped"
+            logger.info("stage_node_skipped", stage=node.name, reason="already_complete")
+            return
+
+        self.status[node.name] = "running"
+        started = time.perf_counter()
+        logger.info("stage_node_started", stage=node.name, resource=node.resource)
+
+        if node.resource == RESOURCE_GPU:
+            async with self._gpu_lock:
+                await self._call(node, executor)
+        else:
+            await self._call(node, executor)
+
+        self.durations[node.name] = round(time.perf_counter() - started, 2)
+        self.status[node.name] = "done"
+        logger.info("stage_node_finished", stage=node.name, duration_seconds=self.durations[node.name])
+
+    async def _call(self, node: StageNode, executor: ThreadPoolExecutor):
+        if inspect.iscoroutinefunction(node.run):
+            await node.run()
+        else:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(executor, node.run)
+
+    async def run(self):
+        """Run every node in dependency order, concurrently where possible."""
+        running: Dict[asyncio.Task, str] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stage") as executor:
+            try:
+                while True:
+                    for node in self._ready():
+                        self.status[node.name] = "scheduled"
+                        running[asyncio.create_task(self._run_node(node, executor))] = node.name
+                    if not running:
+                        break
+
+                    done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        name = running.pop(task)
+                        error = task.exception()
+                        if error is not None:
+                            self.status[name] = "failed"
+                            logger.error("stage_node_failed", stage=name, error=str(error))
+                            raise error
+            finally:
+                for task in running:
+                    task.cancel()
+                if running:
+                    await asyncio.gather(*running, return_exceptions=True)
+
+        blocked = [name for name, status in self.status.items() if status == "pending"]
+        if blocked:
+            logger.warning("stage_nodes_not_run", stages=blocked)
+        logger.info("stage_graph_completed", status=self.status, durations=self.durations)
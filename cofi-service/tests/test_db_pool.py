@@ -0,0 +1,160 @@
+"""Tests for the bounded MySQL connection pool (checkout, timeout, recycle)."""
+import threading
+import time
+
+import pytest
+
+from src import db_pool
+from src.db_pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    """Stand-in for a mysql.connector connection."""
+
+    opened = 0
+
+    def __init__(self, **connect_args):
+        FakeConnection.opened += 1
+        self.number = FakeConnection.opened
+        self.closed = False
+        self.in_transaction = False
+        self.rollbacks = 0
+        self.resets = 0
+        self.fail_ping = False
+        self.fail_reset = False
+
+    def ping(self, reconnect=False):
+        if self.fail_ping:
+            raise ConnectionError("gone away")
+
+    def reset_session(self):
+        if self.fail_reset:
+            raise ConnectionError("reset failed")
+        self.resets += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def fake_connect(monkeypatch):
+    FakeConnection.opened = 0
+    monkeypatch.setattr(db_pool.mysql.connector, "connect", FakeConnection)
+
+
+def test_returned_connection_is_reused_and_reset():
+    pool = ConnectionPool(pool_size=1)
+    conn = pool.get_connection()
+    first = conn._conn
+    conn.close()
+
+    again = pool.get_connection()
+    assert again._conn is first
+    assert first.resets == 1
+    assert pool.stats()['checkouts'] == 2
+
+
+def test_double_close_returns_connection_once():
+    pool = ConnectionPool(pool_size=2)
+    conn = pool.get_connection()
+    conn.close()
+    conn.close()
+    assert pool.stats()['idle'] == 1
+    assert pool.stats()['in_use'] == 0
+
+
+def test_exhausted_pool_times_out():
+    pool = ConnectionPool(pool_size=1, timeout=0.05)
+    pool.get_connection()
+    with pytest.raises(PoolTimeoutError):
+        pool.get_connection()
+    assert pool.stats()['timeouts'] == 1
+
+
+def test_waiter_gets_connection_when_one_is_returned():
+    pool = ConnectionPool(pool_size=1, timeout=5)
+    conn = pool.get_connection()
+    threading.Timer(0.05, conn.close).start()
+
+    again = pool.get_connection()
+    assert again._conn is conn._conn
+    stats = pool.stats()
+    assert stats['waits'] == 1
+    assert stats['max_wait_ms'] > 0
+
+
+def test_overflow_connections_close_when_returned():
+    pool = ConnectionPool(pool_size=1, max_overflow=1, timeout=0.05)
+    first, overflow = pool.get_connection(), pool.get_connection()
+    with pytest.raises(PoolTimeoutError):
+        pool.get_connection()
+
+    overflow.close()
+    assert overflow._conn.closed
+    first.close()
+    assert pool.stats()['open'] == 1
+    assert pool.stats()['idle'] == 1
+
+
+def test_old_connection_is_recycled():
+    pool = ConnectionPool(pool_size=1, recycle=60)
+    conn = pool.get_connection()
+    old = conn._conn
+    conn.created_at -= 120
+    conn.close()
+
+    fresh = pool.get_connection()
+    assert fresh._conn is not old
+    assert old.closed
+    assert pool.stats()['recycled'] == 1
+
+
+def test_dead_idle_connection_is_replaced():
+    pool = ConnectionPool(pool_size=1, ping_interval=10)
+    conn = pool.get_connection()
+    dead = conn._conn
+    conn.close()
+    dead.fail_ping = True
+    conn.last_used = time.monotonic() - 60
+
+    fresh = pool.get_connection()
+    assert fresh._conn is not dead
+    assert pool.stats()['reconnects'] == 1
+
+
+def test_connection_failing_reset_is_replaced():
+    pool = ConnectionPool(pool_size=1)
+    conn = pool.get_connection()
+    broken = conn._conn
+    broken.fail_reset = True
+    conn.close()
+
+    fresh = pool.get_connection()
+    assert fresh._conn is not broken
+    assert broken.closed
+    assert pool.stats()['open'] == 1
+
+
+def test_open_transaction_is_rolled_back_on_return():
+    pool = ConnectionPool(pool_size=1)
+    conn = pool.get_connection()
+    conn._conn.in_transaction = True
+    conn.close()
+    assert conn._conn.rollbacks == 1
+
+
+def test_failed_connect_frees_its_slot(monkeypatch):
+    pool = ConnectionPool(pool_size=1, timeout=0.05)
+
+    def refuse(**connect_args):
+        raise ConnectionError("refused")
+
+    monkeypatch.setattr(db_pool.mysql.connector, "connect", refuse)
+    with pytest.raises(ConnectionError):
+        pool.get_connection()
+    monkeypatch.setattr(db_pool.mysql.connector, "connect", FakeConnection)
+    assert pool.get_connection() is not None
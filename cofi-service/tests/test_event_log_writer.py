@@ -0,0 +1,131 @@
+"""Tests for the batched batchExecutionLog writer (block/drop/close)."""
+import threading
+import time
+from typing import Any, Dict, List
+
+from src.event_log_writer import EventLogWriter
+
+
+class FakeLogRepo:
+    """Records written events; the first write can be held until released."""
+
+    def __init__(self, hold_first: bool = False):
+        self.written: List[Dict[str, Any]] = []
+        self.writing = threading.Event()
+        self.release = threading.Event()
+        if not hold_first:
+            self.release.set()
+        self._lock = threading.Lock()
+
+    def insert_events(self, events: List[Dict[str, Any]]) -> int:
+        self.writing.set()
+        self.release.wait(5)
+        with self._lock:
+            self.written.extend(events)
+        return len(events)
+
+
+def event(number: int, event_type: str = "stage_start") -> Dict[str, Any]:
+    return {'batch_id': 1, 'stage': 'stt', 'event_type': event_type, 'metadata': str(number)}
+
+
+def written_numbers(repo: FakeLogRepo) -> List[int]:
+    return sorted(int(e['metadata']) for e in repo.written)
+
+
+def test_close_writes_everything_queued():
+    repo = FakeLogRepo()
+    writer = EventLogWriter(repo, flush_size=10, flush_interval=60)
+    for number in range(25):
+        assert writer.put(event(number))
+    writer.close()
+    assert written_numbers(repo) == list(range(25))
+    assert all('timestamp' in e for e in repo.written)
+
+
+def test_flush_waits_for_queued_events():
+    repo = FakeLogRepo()
+    writer = EventLogWriter(repo, flush_size=100, flush_interval=60)
+    writer.put(event(1))
+    writer.flush(timeout=5)
+    assert written_numbers(repo) == [1]
+    writer.close()
+
+
+def test_drop_policy_discards_only_droppable_events_when_full():
+    repo = FakeLogRepo(hold_first=True)
+    writer = EventLogWriter(repo, flush_size=1, flush_interval=60, max_queue=1, policy="drop")
+    writer.put(event(0))
+    assert repo.writing.wait(5)  # flusher holds event 0
+    writer.put(event(1))         # fills the queue
+
+    assert writer.put(event(2, "file_complete")) is False
+    assert writer.stats()['dropped'] == 1
+
+    repo.release.set()
+    writer.close()
+    assert written_numbers(repo) == [0, 1]
+
+
+def test_block_policy_times_out_and_drops():
+    repo = FakeLogRepo(hold_first=True)
+    writer = EventLogWriter(repo, flush_size=1, flush_interval=60, max_queue=1, policy="block",
+                            block_timeout=0.05)
+    writer.put(event(0))
+    assert repo.writing.wait(5)
+    writer.put(event(1))
+
+    started = time.monotonic()
+    assert writer.put(event(2)) is False
+    assert time.monotonic() - started >= 0.05
+
+    repo.release.set()
+    writer.close()
+    assert written_numbers(repo) == [0, 1]
+
+
+def test_producer_blocked_during_close_still_writes_its_event():
+    repo = FakeLogRepo(hold_first=True)
+    writer = EventLogWriter(repo, flush_size=1, flush_interval=60, max_queue=1, policy="block",
+                            block_timeout=10)
+    writer.put(event(0))
+    assert repo.writing.wait(5)
+    writer.put(event(1))
+
+    results = []
+    producer = threading.Thread(target=lambda: results.append(writer.put(event(2))))
+    producer.start()
+    time.sleep(0.05)  # producer is waiting for room
+
+    threading.Timer(0.05, repo.release.set).start()
+    writer.close()
+    producer.join(5)
+
+    assert results == [True]
+    assert written_numbers(repo) == [0, 1, 2]
+
+
+def test_put_after_close_writes_directly():
+    repo = FakeLogRepo()
+    writer = EventLogWriter(repo, flush_size=10, flush_interval=60)
+    writer.close()
+    assert writer.put(event(7))
+    assert written_numbers(repo) == [7]
+
+
+def test_direct_write_after_close_does_not_hold_the_lock():
+    repo = FakeLogRepo(hold_first=True)
+    writer = EventLogWriter(repo, flush_size=10, flush_interval=60)
+    writer.close()
+    producer = threading.Thread(target=writer.put, args=(event(1),))
+    producer.start()
+    assert repo.writing.wait(5)  # the late event is being written
+
+    # Other callers are not stuck behind the slow write
+    stats_done = threading.Event()
+    threading.Thread(target=lambda: (writer.stats(), stats_done.set())).start()
+    assert stats_done.wait(1)
+
+    repo.release.set()
+    producer.join(5)
+    assert written_numbers(repo) == [1]
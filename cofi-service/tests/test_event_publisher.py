@@ -0,0 +1,91 @@
+"""Tests for pushing written events to the dashboard."""
+import threading
+from typing import List
+
+from src.event_publisher import HttpEventPublisher, InProcessEventPublisher
+
+
+def row(event_id: int, batch_id: int = 1):
+    return {'id': event_id, 'batchId': batch_id}
+
+
+class RecordingPublisher(HttpEventPublisher):
+    """HttpEventPublisher whose requests are recorded instead of sent."""
+
+    def __init__(self, fail_first: int = 0, **kwargs):
+        self.posts: List[tuple] = []
+        self.fail_first = fail_first
+        self.entered = threading.Event()
+        self.gate = threading.Event()
+        self.gate.set()
+        self.sent = threading.Event()
+        super().__init__("http://dashboard/api/events/push", **kwargs)
+
+    def _post(self, rows, gaps):
+        self.entered.set()
+        self.gate.wait(5)
+        if self.fail_first:
+            self.fail_first -= 1
+            self.failures += 1
+            return False
+        self.posts.append(([r['id'] for r in rows], gaps))
+        self.sent.set()
+        return True
+
+
+def test_rows_are_posted_in_order_in_batches():
+    publisher = RecordingPublisher(batch_size=2)
+    publisher.gate.clear()
+    publisher.publish([row(1)])
+    assert publisher.entered.wait(5)
+    publisher.publish([row(2), row(3), row(4)])
+    publisher.gate.set()
+    publisher.close(timeout=5)
+
+    assert [ids for ids, _ in publisher.posts] == [[1], [2, 3], [4]]
+    assert publisher.stats()['pushed'] == 4
+
+
+def test_failed_post_is_retried():
+    publisher = RecordingPublisher(fail_first=1, retry_interval=0.01)
+    publisher.publish([row(1), row(2)])
+    assert publisher.sent.wait(5)
+    publisher.close(timeout=5)
+
+    assert publisher.posts == [([1, 2], [])]
+    assert publisher.stats()['failures'] == 1
+
+
+def test_overflow_drops_oldest_rows_and_reports_their_batches_as_gaps():
+    publisher = RecordingPublisher(batch_size=2, max_queue=2)
+    publisher.gate.clear()
+    publisher.publish([row(1, batch_id=7)])
+    assert publisher.entered.wait(5)  # row 1 is being sent
+    publisher.publish([row(2, batch_id=8), row(3, batch_id=9), row(4, batch_id=9)])
+    publisher.gate.set()
+    publisher.close(timeout=5)
+
+    assert publisher.posts == [([1], []), ([3, 4], [7, 8])]
+    assert publisher.stats()['dropped'] == 2
+
+
+def test_rows_still_failing_at_close_are_discarded():
+    publisher = RecordingPublisher(fail_first=100, retry_interval=60)
+    publisher.publish([row(1)])
+    assert publisher.entered.wait(5)
+    publisher.close(timeout=5)
+    assert publisher.posts == []
+    assert publisher.stats()['queued'] == 0
+
+
+def test_in_process_subscriber_failure_is_isolated():
+    publisher = InProcessEventPublisher()
+    received = []
+
+    def broken(rows):
+        raise RuntimeError("subscriber down")
+
+    publisher.subscribe(broken)
+    publisher.subscribe(received.extend)
+    publisher.publish([row(1)])
+    assert received == [row(1)]
@@ -0,0 +1,108 @@
+"""Tests for per-GPU work queues, the AIMD limiter and the retry policy."""
+import asyncio
+
+import aiohttp
+
+from src.gpu_queue import AimdLimiter, GpuWorkQueue
+from src.retry import RetryPolicy
+
+
+def test_fixed_limiter_never_changes():
+    limiter = AimdLimiter(initial=4)
+    limiter.on_error()
+    limiter.on_success(1000.0)
+    assert limiter.limit == 4
+    assert limiter.maximum == 4
+
+
+def test_adaptive_limiter_grows_after_a_window_and_halves_once_per_window():
+    limiter = AimdLimiter(initial=2, maximum=8, latency_target=60, adaptive=True)
+    limiter.on_success(1.0)
+    limiter.on_success(1.0)
+    assert limiter.limit == 3
+
+    limiter.on_error()
+    assert limiter.limit == 1
+    limiter._last_decrease = 0.0  # window elapsed
+    limiter.on_success(1.0)
+    limiter.on_error()
+    limiter.on_error()  # same window: no second halving
+    assert limiter.limit == 1
+
+
+def test_slow_success_counts_as_congestion():
+    limiter = AimdLimiter(initial=4, maximum=8, latency_target=10, adaptive=True)
+    limiter.on_success(30.0)
+    assert limiter.limit == 2
+
+
+def test_queue_keeps_in_flight_requests_within_the_limit():
+    in_flight = {'now': 0, 'max': 0}
+    results = []
+
+    async def handler(gpu_ip, item):
+        in_flight['now'] += 1
+        in_flight['max'] = max(in_flight['max'], in_flight['now'])
+        await asyncio.sleep(0.01)
+        in_flight['now'] -= 1
+        if item == "bad":
+            raise RuntimeError("gpu error")
+        return item.upper()
+
+    async def scenario():
+        queue = GpuWorkQueue("10.0.0.1", handler, AimdLimiter(initial=2))
+        queue.put_many(["a", "b", "c", "bad", "d"])
+
+        async def on_result(gpu_ip, item, result):
+            results.append((item, result))
+            if len(results) == 5:
+                queue.close()
+
+        await queue.run(on_result)
+        return queue
+
+    queue = asyncio.run(scenario())
+    assert in_flight['max'] == 2
+    assert sorted(item for item, _ in results) == ["a", "b", "bad", "c", "d"]
+    assert isinstance(dict(results)["bad"], RuntimeError)
+    assert queue.stats()['completed'] == 4
+    assert queue.stats()['failed'] == 1
+
+
+def test_items_added_while_running_are_processed():
+    seen = []
+
+    async def handler(gpu_ip, item):
+        return item
+
+    async def scenario():
+        queue = GpuWorkQueue("10.0.0.1", handler, AimdLimiter(initial=1))
+        queue.put("first")
+
+        async def on_result(gpu_ip, item, result):
+            seen.append(item)
+            if item == "first":
+                queue.put("retry")  # e.g. a retried file
+            else:
+                queue.close()
+
+        await queue.run(on_result)
+
+    asyncio.run(scenario())
+    assert seen == ["first", "retry"]
+
+
+def test_retry_policy_retries_only_transient_errors():
+    policy = RetryPolicy(max_attempts=3)
+    assert policy.should_retry(asyncio.TimeoutError(), 1)
+    assert policy.should_retry(aiohttp.ClientResponseError(None, (), status=503), 2)
+    assert not policy.should_retry(asyncio.TimeoutError(), 3)
+    assert not policy.should_retry(aiohttp.ClientResponseError(None, (), status=400), 1)
+    assert not policy.should_retry(ValueError("bad response"), 1)
+
+
+def test_retry_backoff_doubles_up_to_the_cap():
+    policy = RetryPolicy(base_delay=5, max_delay=12, jitter=0)
+    assert [policy.backoff(attempt) for attempt in (1, 2, 3, 4)] == [5, 10, 12, 12]
+    jittered = RetryPolicy(base_delay=10, jitter=0.5).backoff(1)
+    assert 5 <= jittered <= 10
@@ -0,0 +1,52 @@
+"""Tests for the reference data cache and cross-process invalidation."""
+from src.ref_cache import ReferenceCache
+
+
+class Loader:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {'id': self.calls}
+
+
+def test_cached_until_invalidated():
+    cache = ReferenceCache()
+    load = Loader()
+    assert cache.get_or_load("language", "hi", load) == {'id': 1}
+    assert cache.get_or_load("language", "hi", load) == {'id': 1}
+    cache.invalidate("language")
+    assert cache.get_or_load("language", "hi", load) == {'id': 2}
+
+
+def test_results_are_copies():
+    cache = ReferenceCache()
+    cache.get_or_load("process", 1, lambda: {'auditFormId': 3})['auditFormId'] = 9
+    assert cache.get_or_load("process", 1, lambda: None) == {'auditFormId': 3}
+
+
+def test_version_change_from_another_process_drops_namespace():
+    versions = {'language': 1}
+    # Check on every access
+    cache = ReferenceCache(version_loader=lambda: dict(versions), version_check_interval=1e-9)
+    language, process = Loader(), Loader()
+    cache.get_or_load("language", "hi", language)
+    cache.get_or_load("process", 1, process)
+
+    versions['language'] = 2
+    assert cache.get_or_load("language", "hi", language) == {'id': 2}
+    assert cache.get_or_load("process", 1, process) == {'id': 1}
+
+    versions['*'] = 1
+    assert cache.get_or_load("process", 1, process) == {'id': 2}
+
+
+def test_failed_version_check_keeps_serving_cache():
+    def broken():
+        raise RuntimeError("db down")
+
+    cache = ReferenceCache(version_loader=broken, version_check_interval=1e-9)
+    load = Loader()
+    cache.get_or_load("language", "en", load)
+    assert cache.get_or_load("language", "en", load) == {'id': 1}
@@ -0,0 +1,106 @@
+"""Tests for the dependency-driven stage scheduler."""
+import asyncio
+
+import pytest
+
+from src.scheduler import StageNode, StageScheduler, RESOURCE_CPU, RESOURCE_DB, RESOURCE_GPU
+
+
+def run(scheduler: StageScheduler):
+    asyncio.run(scheduler.run())
+
+
+def test_stages_run_after_their_dependencies():
+    order = []
+
+    async def ivr():
+        order.append("ivr")
+
+    async def lid():
+        order.append("lid")
+
+    nodes = [
+        StageNode(name="lid", run=lid, deps=["ivr"], resource=RESOURCE_GPU),
+        StageNode(name="ivr", run=ivr, resource=RESOURCE_GPU),
+        StageNode(name="update", run=lambda: order.append("update"), deps=["lid"], resource=RESOURCE_DB),
+    ]
+    scheduler = StageScheduler(nodes)
+    run(scheduler)
+    assert order == ["ivr", "lid", "update"]
+    assert set(scheduler.status.values()) == {"done"}
+
+
+def test_disabled_and_complete_stages_are_skipped_but_satisfy_dependents():
+    ran = []
+    nodes = [
+        StageNode(name="denoise", run=lambda: ran.append("denoise"), enabled=False),
+        StageNode(name="ivr", run=lambda: ran.append("ivr"), deps=["denoise"], is_complete=lambda: True),
+        StageNode(name="lid", run=lambda: ran.append("lid"), deps=["ivr"]),
+    ]
+    scheduler = StageScheduler(nodes)
+    run(scheduler)
+    assert ran == ["lid"]
+    assert scheduler.status == {"denoise": "skipped", "ivr": "skipped", "lid": "done"}
+
+
+def test_is_complete_is_checked_when_the_stage_starts():
+    batch = {'sttStatus': 'Pending'}
+
+    def lid():
+        batch['sttStatus'] = 'Complete'  # e.g. partitioned LID ran STT as well
+
+    nodes = [
+        StageNode(name="lid", run=lid),
+        StageNode(name="stt", run=lambda: pytest.fail("stt should be skipped"), deps=["lid"],
+                  is_complete=lambda: batch['sttStatus'] == 'Complete'),
+    ]
+    scheduler = StageScheduler(nodes)
+    run(scheduler)
+    assert scheduler.status["stt"] == "skipped"
+
+
+def test_gpu_stages_never_overlap_but_cpu_stages_do():
+    active = {'gpu': 0, 'max_gpu': 0}
+
+    def gpu_node(name):
+        async def work():
+            active['gpu'] += 1
+            active['max_gpu'] = max(active['max_gpu'], active['gpu'])
+            await asyncio.sleep(0.02)
+            active['gpu'] -= 1
+        return StageNode(name=name, run=work, resource=RESOURCE_GPU)
+
+    cpu_started = []
+
+    def cpu_work():
+        cpu_started.append(active['gpu'])
+
+    scheduler = StageScheduler([gpu_node("a"), gpu_node("b"),
+                                StageNode(name="csv", run=cpu_work, resource=RESOURCE_CPU)])
+    run(scheduler)
+    assert active['max_gpu'] == 1
+    assert cpu_started == [1]  # ran while a GPU stage was in progress
+
+
+def test_failure_propagates_and_blocks_dependents():
+    def boom():
+        raise RuntimeError("stage failed")
+
+    nodes = [
+        StageNode(name="lid", run=boom),
+        StageNode(name="stt", run=lambda: None, deps=["lid"]),
+    ]
+    scheduler = StageScheduler(nodes)
+    with pytest.raises(RuntimeError):
+        run(scheduler)
+    assert scheduler.status == {"lid": "failed", "stt": "pending"}
+
+
+def test_invalid_graphs_are_rejected():
+    with pytest.raises(ValueError, match="unknown stage"):
+        StageScheduler([StageNode(name="a", run=lambda: None, deps=["missing"])])
+    with pytest.raises(ValueError, match="cycle"):
+        StageScheduler([
+            StageNode(name="a", run=lambda: None, deps=["b"]),
+            StageNode(name="b", run=lambda: None, deps=["a"]),
+        ])
@@ -0,0 +1,137 @@
+"""Tests for Database.transaction (savepoints) and after_commit hooks."""
+from typing import List
+
+import pytest
+
+from src.database import Database
+
+
+class FakeCursor:
+    def __init__(self, conn: "FakeConnection"):
+        self.conn = conn
+        self.rowcount = 1
+
+    def execute(self, query, params=None):
+        self.conn.log.append(" ".join(query.split()))
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, log: List[str]):
+        self.log = log
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.log.append("COMMIT")
+
+    def rollback(self):
+        self.log.append("ROLLBACK")
+
+    def close(self):
+        self.log.append("RELEASE CONNECTION")
+
+
+class FakePool:
+    def __init__(self):
+        self.log: List[str] = []
+        self.checkouts = 0
+
+    def get_connection(self, timeout=None):
+        self.checkouts += 1
+        return FakeConnection(self.log)
+
+
+@pytest.fixture
+def db():
+    database = Database()
+    database.pool = FakePool()
+    yield database
+    database.executor.shutdown(wait=False)
+
+
+def test_writes_in_a_unit_of_work_share_one_commit(db):
+    with db.transaction():
+        db.execute_update("UPDATE a SET x = 1")
+        db.execute_update("UPDATE b SET y = 2")
+    assert db.pool.log == ["UPDATE a SET x = 1", "UPDATE b SET y = 2", "COMMIT", "RELEASE CONNECTION"]
+    assert db.pool.checkouts == 1
+
+
+def test_failing_nested_block_rolls_back_to_its_savepoint_only(db):
+    with db.transaction():
+        db.execute_update("UPDATE kept")
+        with pytest.raises(RuntimeError):
+            with db.transaction():
+                db.execute_update("UPDATE dropped")
+                raise RuntimeError("file failed")
+        with db.transaction():
+            db.execute_update("UPDATE kept too")
+    assert db.pool.log == [
+        "UPDATE kept",
+        "SAVEPOINT uow_1", "UPDATE dropped", "ROLLBACK TO SAVEPOINT uow_1",
+        "SAVEPOINT uow_1", "UPDATE kept too", "RELEASE SAVEPOINT uow_1",
+        "COMMIT", "RELEASE CONNECTION"
+    ]
+
+
+def test_failing_outer_block_rolls_back_everything(db):
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.execute_update("UPDATE a")
+            raise RuntimeError("group failed")
+    assert db.pool.log == ["UPDATE a", "ROLLBACK", "RELEASE CONNECTION"]
+
+
+def test_after_commit_hooks_run_after_the_outer_commit(db):
+    ran = []
+    with db.transaction():
+        with db.transaction():
+            db.after_commit(ran.append, "file")
+            db.after_commit(lambda: db.pool.log.append("HOOK"))
+        assert ran == []
+    assert ran == ["file"]
+    assert db.pool.log.index("HOOK") > db.pool.log.index("COMMIT")
+
+
+def test_hooks_of_a_rolled_back_savepoint_are_dropped(db):
+    ran = []
+    with db.transaction():
+        db.after_commit(ran.append, "kept")
+        with pytest.raises(RuntimeError):
+            with db.transaction():
+                db.after_commit(ran.append, "dropped")
+                raise RuntimeError("file failed")
+    assert ran == ["kept"]
+
+
+def test_hooks_of_a_rolled_back_transaction_never_run(db):
+    ran = []
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.after_commit(ran.append, "dropped")
+            raise RuntimeError("group failed")
+    with db.transaction():
+        pass
+    assert ran == []
+
+
+def test_after_commit_runs_immediately_outside_a_transaction(db):
+    ran = []
+    db.after_commit(ran.append, "now")
+    assert ran == ["now"]
+
+
+def test_failing_hook_does_not_stop_the_others(db):
+    ran = []
+
+    def broken():
+        raise RuntimeError("webhook down")
+
+    with db.transaction():
+        db.after_commit(broken)
+        db.after_commit(ran.append, "next")
+    assert ran == ["next"]
@@ -0,0 +1,37 @@
+-- Migration: Add composite indexes for the orchestrator's hot queries
+-- Date: 2026-10-18
+-- Purpose: Avoid full table scans on per-batch / per-call lookups for 10K+ file batches
+-- Note: MySQL has no CREATE INDEX IF NOT EXISTS; skip statements whose index already exists.
+-- Verify with the startup query-plan check (VERIFY_QUERY_PLANS=true).
+
+-- fileDistribution: pending files per stage (batchId + stage flag)
+-- (batchId, denoiseDone) is created by add_denoise_done_column.sql
+CREATE INDEX idx_filedist_batch_ivr ON fileDistribution(batchId, ivrDone);
+CREATE INDEX idx_filedist_batch_lid ON fileDistribution(batchId, lidDone);
+CREATE INDEX idx_filedist_batch_stt ON fileDistribution(batchId, sttDone);
+CREATE INDEX idx_filedist_batch_llm1 ON fileDistribution(batchId, llm1Done);
+CREATE INDEX idx_filedist_batch_llm2 ON fileDistribution(batchId, llm2Done);
+-- fileDistribution: completion checkpoints (WHERE file IN (...) AND batchId = ?)
+CREATE INDEX idx_filedist_batch_file ON fileDistribution(batchId, file);
+
+-- call: calls per batch by status (STT / LLM1 / LLM2 selection)
+CREATE INDEX idx_call_batch_status ON `call`(batchId, status);
+-- call: per-file lookups within a batch (LID updates, STT hand-off)
+CREATE INDEX idx_call_audio_batch ON `call`(audioName, batchId);
+
+-- lidStatus: LID results per batch and file
+CREATE INDEX idx_lidstatus_batch_audio ON lidStatus(batchId, audioName);
+
+-- tradeAudioMapping: trades for an audio file (LLM1 payloads, triaging)
+CREATE INDEX idx_tam_audio_file ON tradeAudioMapping(audioFileName);
+
+-- transcript: transcript of a call in time order
+CREATE INDEX idx_transcript_call_start ON transcript(callId, startTime);
+
+-- callConversation: extracted trade details of a call (LLM2 custom rules)
+CREATE INDEX idx_callconv_call ON callConversation(callId);
+
+-- batchExecutionLog: dashboard polling / SSE (WHERE batchId = ? AND id > ? ORDER BY id)
+CREATE INDEX idx_batchlog_batch_id ON batchExecutionLog(batchId, id);
+-- batchExecutionLog: per-stage views and stats
+CREATE INDEX idx_batchlog_batch_stage_ts ON batchExecutionLog(batchId, stage, timestamp);
@@ -0,0 +1,38 @@
+-- Migration: Create batchStageCounters table (per-stage counters for dashboard stats)
+-- Date: 2026-10-18
+-- Purpose: Dashboard stats read one row per stage instead of aggregating
+--          batchExecutionLog; cofi-service updates the counters in the same
+--          transaction as the events it writes
+
+CREATE TABLE IF NOT EXISTS batchStageCounters (
+    batchId INT NOT NULL,
+    stage VARCHAR(50) NOT NULL,
+    totalFiles INT DEFAULT NULL COMMENT 'Largest totalFiles of the stage events',
+    processedFiles INT DEFAULT NULL COMMENT 'Largest processedFiles of the stage events',
+    errorCount INT NOT NULL DEFAULT 0 COMMENT 'Number of error events',
+    eventCount INT NOT NULL DEFAULT 0,
+    firstEventAt DATETIME(3) DEFAULT NULL,
+    lastEventAt DATETIME(3) DEFAULT NULL,
+
+    PRIMARY KEY (batchId, stage),
+
+    FOREIGN KEY (batchId) REFERENCES batchStatus(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='Incrementally maintained per-stage counters of batchExecutionLog';
+
+-- Backfill from existing events
+INSERT INTO batchStageCounters (
+    batchId, stage, totalFiles, processedFiles, errorCount, eventCount, firstEventAt, lastEventAt
+)
+SELECT batchId, stage, MAX(totalFiles), MAX(processedFiles),
+       SUM(CASE WHEN eventType = 'error' THEN 1 ELSE 0 END), COUNT(*),
+       MIN(timestamp), MAX(timestamp)
+FROM batchExecutionLog
+GROUP BY batchId, stage
+ON DUPLICATE KEY UPDATE
+    totalFiles = VALUES(totalFiles),
+    processedFiles = VALUES(processedFiles),
+    errorCount = VALUES(errorCount),
+    eventCount = VALUES(eventCount),
+    firstEventAt = VALUES(firstEventAt),
+    lastEventAt = VALUES(lastEventAt);
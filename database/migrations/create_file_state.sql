@@ -0,0 +1,40 @@
+-- Migration: Create fileState table (one row per file with its pipeline stage)
+-- Date: 2026-10-18
+-- Purpose: Find pending files per stage with an index range scan instead of
+--          scanning fileDistribution flags / call.status
+-- Enable with FILE_STATE_ENABLED=true after running this migration. The
+-- fileDistribution *Done flags are still written alongside fileState.
+
+CREATE TABLE IF NOT EXISTS fileState (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    batchId INT NOT NULL,
+    file VARCHAR(255) NOT NULL,
+    ip VARCHAR(50) DEFAULT NULL,
+    stage TINYINT NOT NULL DEFAULT 0 COMMENT 'Next stage to run: 0 denoise, 1 ivr, 2 lid, 3 stt, 4 llm1, 5 llm2, 6 done',
+    createdAt DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+    updatedAt DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3),
+
+    UNIQUE KEY uq_filestate_batch_file (batchId, file),
+    -- Pending files per stage (WHERE batchId = ? AND stage <= ?)
+    INDEX idx_filestate_batch_stage (batchId, stage),
+    -- Reaudit resets by file name
+    INDEX idx_filestate_file (file),
+
+    FOREIGN KEY (batchId) REFERENCES batchStatus(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='Per-file pipeline stage for the orchestrator';
+
+-- Backfill from fileDistribution: a file's stage is one past the latest
+-- stage it completed (stages only move forward)
+INSERT IGNORE INTO fileState (batchId, file, ip, stage)
+SELECT batchId, file, ip,
+       CASE
+           WHEN llm2Done = 1 THEN 6
+           WHEN llm1Done = 1 THEN 5
+           WHEN sttDone = 1 THEN 4
+           WHEN lidDone = 1 THEN 3
+           WHEN ivrDone = 1 THEN 2
+           WHEN denoiseDone = 1 THEN 1
+           ELSE 0
+       END
+FROM fileDistribution;
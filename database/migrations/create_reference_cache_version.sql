@@ -0,0 +1,15 @@
+-- Migration: Create referenceCacheVersion table (cross-process cache invalidation)
+-- Date: 2026-10-18
+-- Purpose: POST /cache/reference/invalidate bumps a namespace's version here;
+--          every cofi-service process (API and orchestrator) checks the
+--          versions every REF_CACHE_VERSION_CHECK_INTERVAL seconds and drops
+--          the namespaces that changed from its in-memory reference cache
+
+CREATE TABLE IF NOT EXISTS referenceCacheVersion (
+    namespace VARCHAR(50) NOT NULL COMMENT 'language, process, audit_form or * for all',
+    version INT NOT NULL DEFAULT 1,
+    updatedAt DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3),
+
+    PRIMARY KEY (namespace)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='Reference cache invalidations, read by every cofi-service process';